@@ -11,6 +11,9 @@ from datetime import datetime
 import time
 from sklearn.metrics import silhouette_score
 import warnings
+
+from trp_data import generate_attractions_dataset, create_enhanced_datasets, make_df
+
 warnings.filterwarnings('ignore')
 
 # Set random seed for reproducibility
@@ -32,104 +35,6 @@ def time_str_to_minutes(time_str):
     h, m = map(int, time_str.split(':'))
     return (h - 9) * 60 + m
 
-# Enhanced dataset generator for larger scale testing
-def generate_attractions_dataset(city_name, num_attractions, grid_size=3.0):
-    """Generate a larger dataset of attractions for testing"""
-    attractions = []
-    
-    # Predefined attraction types and their characteristics
-    attraction_types = {
-        'Museum': {'base_duration': 75, 'base_cost': 35000, 'open_early': True},
-        'Temple': {'base_duration': 40, 'base_cost': 10000, 'open_early': True},
-        'Park': {'base_duration': 60, 'base_cost': 0, 'open_early': False},
-        'Market': {'base_duration': 45, 'base_cost': 5000, 'open_early': True},
-        'Monument': {'base_duration': 30, 'base_cost': 15000, 'open_early': True},
-        'Beach': {'base_duration': 90, 'base_cost': 0, 'open_early': False},
-        'Shopping': {'base_duration': 80, 'base_cost': 20000, 'open_early': True},
-        'Cultural Site': {'base_duration': 55, 'base_cost': 25000, 'open_early': True},
-    }
-    
-    type_names = list(attraction_types.keys())
-    
-    for i in range(1, num_attractions + 1):
-        # Random coordinates within grid
-        x = random.uniform(-grid_size/2, grid_size/2)
-        y = random.uniform(-grid_size/2, grid_size/2)
-        
-        # Select attraction type
-        attr_type = random.choice(type_names)
-        type_data = attraction_types[attr_type]
-        
-        # Generate opening/closing times based on type
-        if type_data['open_early']:
-            open_hour = random.choice([6, 7, 8])
-            close_hour = random.choice([17, 18, 19])
-        else:
-            open_hour = random.choice([8, 9, 10])
-            close_hour = random.choice([19, 20, 21, 22])
-            
-        # Some attractions are 24/7 (parks, beaches)
-        if attr_type in ['Park', 'Beach'] and random.random() < 0.3:
-            open_time = "00:00"
-            close_time = "23:59"
-        else:
-            open_time = f"{open_hour:02d}:{random.choice([0, 30]):02d}"
-            close_time = f"{close_hour:02d}:{random.choice([0, 30]):02d}"
-        
-        # Duration and cost with some variation
-        duration = type_data['base_duration'] + random.randint(-15, 20)
-        cost = type_data['base_cost'] + random.randint(-5000, 10000)
-        cost = max(0, cost)  # Ensure non-negative cost
-        
-        attraction = {
-            'id': i,
-            'name': f"{city_name} {attr_type} {i}",
-            'coord': (x, y),
-            'open': open_time,
-            'close': close_time,
-            'duration': duration,
-            'cost': cost
-        }
-        attractions.append(attraction)
-    
-    return attractions
-
-# Create enhanced datasets
-def create_enhanced_datasets():
-    """Create larger datasets for comprehensive testing"""
-    
-    # Hanoi - 20 attractions
-    hanoi_attractions = generate_attractions_dataset("Hanoi", 20, grid_size=4.0)
-    
-    # Da Nang - 15 attractions  
-    danang_attractions = generate_attractions_dataset("Da Nang", 15, grid_size=3.5)
-    
-    # Ho Chi Minh City - 25 attractions (new dataset)
-    hcmc_attractions = generate_attractions_dataset("HCMC", 25, grid_size=5.0)
-    
-    return hanoi_attractions, danang_attractions, hcmc_attractions
-
-# Convert to DataFrame
-def make_df(attractions):
-    rows = []
-    for a in attractions:
-        oh, om = map(int, a['open'].split(':'))
-        ch, cm = map(int, a['close'].split(':'))
-        open_min = (oh - 9) * 60 + om
-        close_min = (ch - 9) * 60 + cm
-        
-        rows.append({
-            'id': a['id'], 
-            'name': a['name'], 
-            'x': a['coord'][0], 
-            'y': a['coord'][1],
-            'open_min': open_min, 
-            'close_min': close_min, 
-            'duration': a['duration'], 
-            'cost': a['cost']
-        })
-    return pd.DataFrame(rows)
-
 # Generate enhanced datasets
 print("Generating enhanced datasets...")
 hanoi_attractions, danang_attractions, hcmc_attractions = create_enhanced_datasets()
@@ -0,0 +1,26 @@
+import os
+import random
+import sys
+
+import pytest
+
+# The solver modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trp_data import generate_attractions_dataset, make_df  # noqa: E402
+from trp_instance import TRPInstance  # noqa: E402
+
+
+def random_instance(seed, n, tight=False):
+    """TRPInstance of n generated attractions; `tight` shortens the time
+    windows so that most routes arrive late somewhere"""
+    rng = random.Random(seed)
+    df = make_df(generate_attractions_dataset('Test', n, rng=rng))
+    if tight:
+        df['close_min'] = [o + rng.randint(0, 240) for o in df['open_min']]
+    return TRPInstance(df)
+
+
+@pytest.fixture
+def make_instance():
+    return random_instance
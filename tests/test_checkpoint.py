@@ -0,0 +1,112 @@
+import random
+
+import numpy as np
+import pytest
+
+from trp_alns import ALNS_TRP
+from trp_data import generate_attractions_dataset, make_df
+from trp_diversity import AdaptiveDiversity
+from trp_ga import EnhancedTRP_GA
+
+BUDGET = 400000
+
+
+@pytest.fixture(scope='module')
+def df():
+    return make_df(generate_attractions_dataset('Hanoi', 30, rng=random.Random(3)))
+
+
+def _summary(result):
+    history = result.get('fitness_history')
+    return {
+        'route': result['best_route'],
+        'fitness': result['best_details']['fitness'],
+        'generations': result.get('generations'),
+        'iterations': result.get('iterations'),
+        'evaluations': result.get('evaluations'),
+        'diversity': result.get('diversity'),
+        'history': history.tolist() if history is not None else None,
+    }
+
+
+GA_CONFIGS = {
+    'scalar': dict(generations=40, patience=None),
+    'vectorized': dict(generations=40, vectorized=True, crossover='ox'),
+    'erx': dict(generations=30, crossover='erx', history_every=4),
+    'memetic': dict(generations=20, memetic=True, ls_time_ms=None, ls_max_moves=3,
+                    patience=None),
+    'diversity': dict(generations=60, diversity=AdaptiveDiversity(cooldown=3)),
+}
+
+
+@pytest.mark.parametrize('config', sorted(GA_CONFIGS))
+def test_ga_resume_matches_uninterrupted_run(df, tmp_path, config):
+    kw = GA_CONFIGS[config]
+    full = _summary(EnhancedTRP_GA(df, 'Hanoi', BUDGET, **kw).run())
+
+    path = str(tmp_path / 'ga.trpc')
+    ga = EnhancedTRP_GA(df, 'Hanoi', BUDGET, **kw)
+    ga.start()
+    for _ in range(7):
+        assert ga.step()
+    ga.save_checkpoint(path)
+    del ga
+
+    resumed = EnhancedTRP_GA(df, 'Hanoi', BUDGET, resume_from=path, **kw).run()
+    assert _summary(resumed) == full
+
+
+def test_ga_periodic_checkpoints_resume(df, tmp_path):
+    kw = dict(generations=30, patience=None)
+    full = _summary(EnhancedTRP_GA(df, 'Hanoi', BUDGET, **kw).run())
+    path = str(tmp_path / 'ga.trpc')
+
+    class Killed(Exception):
+        pass
+
+    class Preempted(EnhancedTRP_GA):
+        def save_checkpoint(self, p):
+            super().save_checkpoint(p)
+            if self.generation == 20:
+                raise Killed
+
+    with pytest.raises(Killed):
+        Preempted(df, 'Hanoi', BUDGET, checkpoint=path, checkpoint_every=5, **kw).run()
+    resumed = EnhancedTRP_GA(df, 'Hanoi', BUDGET, checkpoint=path, checkpoint_every=5,
+                             resume_from=path, **kw).run()
+    assert _summary(resumed) == full
+
+
+def test_alns_resume_matches_uninterrupted_run(df, tmp_path):
+    full = _summary(ALNS_TRP(df, 'Hanoi', BUDGET, iters=300).run())
+    path = str(tmp_path / 'alns.trpc')
+    alns = ALNS_TRP(df, 'Hanoi', BUDGET, iters=300)
+    alns.start()
+    for _ in range(120):
+        alns.step()
+    alns.save_checkpoint(path)
+
+    resumed = ALNS_TRP(df, 'Hanoi', BUDGET, iters=300, resume_from=path).run()
+    assert _summary(resumed) == full
+
+
+def test_resume_refuses_other_problem(df, tmp_path):
+    path = str(tmp_path / 'ga.trpc')
+    ga = EnhancedTRP_GA(df, 'Hanoi', BUDGET, generations=5)
+    ga.start()
+    ga.step()
+    ga.save_checkpoint(path)
+    with pytest.raises(ValueError):
+        EnhancedTRP_GA(df, 'Hanoi', BUDGET + 1, generations=5, resume_from=path).run()
+    with pytest.raises(ValueError):
+        ALNS_TRP(df, 'Hanoi', BUDGET, iters=5, resume_from=path).run()
+
+
+def test_memetic_move_cap_is_deterministic(df):
+    kw = dict(generations=15, memetic=True, ls_time_ms=None, ls_max_moves=2)
+    a = EnhancedTRP_GA(df, 'Hanoi', BUDGET, **kw).run()
+    b = EnhancedTRP_GA(df, 'Hanoi', BUDGET, **kw).run()
+    assert a['best_route'] == b['best_route']
+    assert np.array_equal(a['fitness_history'], b['fitness_history'])
+    with pytest.raises(ValueError):
+        EnhancedTRP_GA(df, 'Hanoi', BUDGET, memetic=True, ls_max_moves=0)
@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+from trp_delta import DeltaEvaluator
+
+CASES = [(seed, n, tight) for seed in range(6) for n in (2, 7, 15) for tight in (False, True)]
+
+
+def _budgets(inst):
+    total = int(inst.cost.sum())
+    # Generous, about half the attractions, and nothing at all
+    return (10 * total + 1, total // 2, 0)
+
+
+def _check(inst, budget, ev, route, move, args, new_route):
+    expected = inst.evaluate(new_route, budget)['fitness']
+    got = getattr(ev, move)(*args)
+    assert got == pytest.approx(expected, rel=1e-9, abs=1e-6), (move, args, route)
+    # Moves never change the loaded route
+    assert ev.route == route
+
+
+@pytest.mark.parametrize('seed,n,tight', CASES)
+def test_moves_match_full_evaluation(make_instance, seed, n, tight):
+    inst = make_instance(seed, n, tight)
+    rng = random.Random(seed)
+    for budget in _budgets(inst):
+        route = list(range(1, n + 1))
+        rng.shuffle(route)
+        route = route[:rng.randint(1, n)]
+        ev = DeltaEvaluator(inst, budget, route)
+        assert ev.fitness == pytest.approx(inst.evaluate(route, budget)['fitness'])
+        m = len(route)
+        outside = [v for v in range(1, n + 1) if v not in route]
+
+        for a in range(m):
+            for b in range(m):
+                swapped = list(route)
+                swapped[a], swapped[b] = swapped[b], swapped[a]
+                _check(inst, budget, ev, route, 'swap', (a, b), swapped)
+                lo, hi = min(a, b), max(a, b)
+                reversed_ = route[:lo] + route[lo:hi + 1][::-1] + route[hi + 1:]
+                _check(inst, budget, ev, route, 'two_opt', (a, b), reversed_)
+
+        for pos in range(m):
+            _check(inst, budget, ev, route, 'remove', (pos,), route[:pos] + route[pos + 1:])
+        for node in outside:
+            for pos in range(m + 1):
+                _check(inst, budget, ev, route, 'insert', (node, pos),
+                       route[:pos] + [node] + route[pos:])
+
+        for a in range(m):
+            for length in range(1, min(3, m - a) + 1):
+                seg = route[a:a + length]
+                rest = route[:a] + route[a + length:]
+                for pos in range(len(rest) + 1):
+                    _check(inst, budget, ev, route, 'relocate', (a, length, pos),
+                           rest[:pos] + seg + rest[pos:])
+
+        for _ in range(30):
+            i = rng.randint(0, m)
+            j = rng.randint(i, m)
+            pool = [v for v in range(1, n + 1) if v not in route[:i] + route[j:]]
+            block = rng.sample(pool, rng.randint(0, len(pool)))
+            _check(inst, budget, ev, route, 'replace', (i, j, block),
+                   route[:i] + block + route[j:])
+
+
+def test_cases_cover_lateness_and_budget(make_instance):
+    late = over = False
+    for seed, n, tight in CASES:
+        inst = make_instance(seed, n, tight)
+        for budget in _budgets(inst):
+            result = inst.evaluate(list(range(1, n + 1)), budget)
+            late |= result['violations']['time'] > 0
+            over |= result['violations']['budget'] > 0
+    assert late and over
@@ -0,0 +1,66 @@
+import json
+import random
+
+import pytest
+
+from trp_data import generate_attractions_dataset, make_df
+from trp_experiments import load_results, make_grid, run_grid
+
+
+@pytest.fixture(scope='module')
+def datasets():
+    df = make_df(generate_attractions_dataset('Hanoi', 12, rng=random.Random(1)))
+    return {'Hanoi': (df, 400000)}
+
+
+def _grid(datasets, bad):
+    # The GA cell with an unknown keyword fails in the solver constructor
+    return make_grid(datasets, ['Greedy', 'GA'], seeds=[1, 2],
+                     params={'GA': {'generations': [5], 'bogus': [bad]}})
+
+
+def _lines(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.mark.parametrize('workers', [0, 1])
+def test_failing_cells_become_error_rows(datasets, tmp_path, workers):
+    path = str(tmp_path / 'grid.jsonl')
+    results = run_grid(datasets, _grid(datasets, 1), path, workers=workers, verbose=False)
+    rows = _lines(path)
+    assert len(rows) == 4
+    errors = [row for row in rows if 'Error' in row]
+    assert {(row['Algorithm'], row['Seed']) for row in errors} == {('GA', 1), ('GA', 2)}
+    assert all(row['Error'].startswith('TypeError') for row in errors)
+    # The other cells ran, and the returned frame holds only their results
+    assert sorted(results['Algorithm']) == ['Greedy', 'Greedy']
+    assert len(load_results(path, errors=True)) == 4
+
+
+def test_resume_retries_or_skips_failed_cells(datasets, tmp_path):
+    path = str(tmp_path / 'grid.jsonl')
+    cells = _grid(datasets, 1)
+    run_grid(datasets, cells, path, workers=0, verbose=False)
+
+    run_grid(datasets, cells, path, workers=0, verbose=False, retry_failed=False)
+    assert len(_lines(path)) == 4
+
+    # Still failing: one more error row per failed cell, nothing else re-run
+    run_grid(datasets, cells, path, workers=0, verbose=False)
+    rows = _lines(path)
+    assert len(rows) == 6
+    assert all('Error' in row for row in rows[4:])
+
+
+def test_resume_after_fix_records_results(datasets, tmp_path):
+    path = str(tmp_path / 'grid.jsonl')
+    cells = _grid(datasets, 1)
+    run_grid(datasets, cells, path, workers=0, verbose=False)
+    for cell in cells:
+        if cell['algorithm'] == 'GA':
+            del cell['params']['bogus']
+    # Fixed cells have different parameters, so they are new cells
+    results = run_grid(datasets, cells, path, workers=0, verbose=False)
+    assert sorted(results['Algorithm']) == ['GA', 'GA', 'Greedy', 'Greedy']
+    assert results['Fitness_Score'].notna().all()
@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+import trp_multiday
+from trp_data import generate_attractions_dataset, make_df
+from trp_multiday import MultiDayPlanner
+
+
+@pytest.fixture(scope='module')
+def df():
+    return make_df(generate_attractions_dataset('Hanoi', 30, rng=random.Random(5)))
+
+
+def test_split_budget_is_proportional_to_day_cost(df):
+    planner = MultiDayPlanner(df, 'Hanoi', 300000, days=3, workers=0)
+    routes = planner.assign()
+    budgets = planner.split_budget(routes)
+    assert sum(budgets) == pytest.approx(300000)
+    cost = planner.inst[0].cost
+    for route, budget in zip(routes, budgets):
+        assert budget == pytest.approx(300000 * cost[route].sum() / cost[1:].sum())
+    assert planner.split_budget([[], [], []]) == [100000] * 3
+
+
+def test_days_are_solved_against_their_share(df, monkeypatch):
+    seen = []
+    solve_day = trp_multiday._solve_day
+
+    def spy(task):
+        seen.append(task[2])
+        return solve_day(task)
+
+    monkeypatch.setattr(trp_multiday, '_solve_day', spy)
+    plan = MultiDayPlanner(df, 'Hanoi', 300000, days=3, params={'iters': 50},
+                           workers=0).run()
+    assert len(seen) >= 3
+    assert all(budget < 300000 for budget in seen)
+    assert sum(day['budget'] for day in plan['days']) == pytest.approx(300000)
+
+
+def test_orienteering_days_share_one_trip_budget(df):
+    plan = MultiDayPlanner(df, 'Hanoi', 200000, days=3, algorithm='OP-ALNS',
+                           params={'iters': 100}, workers=0).run()
+    assert plan['within_budget']
+    assert plan['total_cost'] <= 200000
+
+
+def test_relocate_never_worsens_the_total(df):
+    planner = MultiDayPlanner(df, 'Hanoi', 300000, days=3, workers=0)
+    routes = planner.assign()
+    planner.day_budgets = planner.split_budget(routes)
+    before = planner._total(routes)
+    changed = planner.relocate(routes)
+    assert planner._total(routes) <= before
+    assert sorted(node for route in routes for node in route) == list(range(1, 31))
+    assert planner.day_budgets == pytest.approx(planner.split_budget(routes))
+    assert changed <= {0, 1, 2}
@@ -0,0 +1,128 @@
+import random
+
+import numpy as np
+import pytest
+
+from trp_operators import (CROSSOVER_OPERATORS, _batch_cut_points, crossover_batch, erx,
+                           ox, pmx, swap_mutation_batch)
+
+SIZES = (2, 3, 8, 25)
+
+
+class _Cuts:
+    """Stand-in for random.Random that hands out preset cut points"""
+
+    def __init__(self, cx1, cx2):
+        self._values = [cx1, cx2]
+
+    def randint(self, a, b):
+        value = self._values.pop(0)
+        assert a <= value <= b
+        return value
+
+
+def _parents(rows, size, seed):
+    np_rng = np.random.default_rng(seed)
+    return (np.array([np_rng.permutation(size) + 1 for _ in range(rows)]),
+            np.array([np_rng.permutation(size) + 1 for _ in range(rows)]))
+
+
+def _is_permutation(child, size):
+    return sorted(int(v) for v in child) == list(range(1, size + 1))
+
+
+@pytest.mark.parametrize('size', SIZES)
+@pytest.mark.parametrize('name', sorted(CROSSOVER_OPERATORS))
+def test_scalar_children_are_permutations(name, size):
+    op = CROSSOVER_OPERATORS[name]
+    rng = random.Random(size)
+    P1, P2 = _parents(50, size, size)
+    for p1, p2 in zip(P1.tolist(), P2.tolist()):
+        child = op(p1, p2, rng)
+        assert _is_permutation(child, size)
+        out = np.zeros(size, dtype=np.int64)
+        assert op(p1, p2, random.Random(1), out=out) is out
+        assert _is_permutation(out, size)
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_pmx_keeps_segment_and_p2_genes(size):
+    P1, P2 = _parents(50, size, size)
+    rng = random.Random(size)
+    for p1, p2 in zip(P1.tolist(), P2.tolist()):
+        cx1 = rng.randint(0, size - 2)
+        cx2 = rng.randint(cx1 + 1, size - 1)
+        child = pmx(p1, p2, _Cuts(cx1, cx2))
+        segment = set(p1[cx1:cx2 + 1])
+        assert child[cx1:cx2 + 1] == p1[cx1:cx2 + 1]
+        for i in range(size):
+            if not cx1 <= i <= cx2 and p2[i] not in segment:
+                assert child[i] == p2[i]
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_ox_keeps_segment_and_p2_order(size):
+    P1, P2 = _parents(50, size, size + 7)
+    rng = random.Random(size)
+    for p1, p2 in zip(P1.tolist(), P2.tolist()):
+        cx1 = rng.randint(0, size - 2)
+        cx2 = rng.randint(cx1 + 1, size - 1)
+        child = ox(p1, p2, _Cuts(cx1, cx2))
+        segment = set(p1[cx1:cx2 + 1])
+        assert child[cx1:cx2 + 1] == p1[cx1:cx2 + 1]
+        # The other genes follow p2's order, both read cyclically from cx2 + 1
+        after = [child[(cx2 + 1 + k) % size] for k in range(size - len(segment))]
+        donor = [p2[(cx2 + 1 + k) % size] for k in range(size)]
+        assert after == [v for v in donor if v not in segment]
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_erx_starts_at_p1_and_avoids_forbidden_edges(size):
+    P1, P2 = _parents(50, size, size + 3)
+    rng = random.Random(size)
+    for p1, p2 in zip(P1.tolist(), P2.tolist()):
+        assert erx(p1, p2, rng)[0] == p1[0]
+        # Every node forbidden after every other one but its p1 successor:
+        # the child can only follow p1's edges
+        forbid = np.ones((size + 1, size + 1), dtype=bool)
+        for a, b in zip(p1, p1[1:]):
+            forbid[a, b] = False
+        assert erx(p1, p2, rng, forbid=forbid) == p1
+
+
+@pytest.mark.parametrize('size', SIZES)
+@pytest.mark.parametrize('kind', ['pmx', 'ox'])
+def test_batch_matches_scalar_with_same_cut_points(kind, size):
+    P1, P2 = _parents(40, size, size)
+    children = crossover_batch(P1, P2, kind, np.random.default_rng(size))
+    cx1, cx2, _ = _batch_cut_points(len(P1), size, np.random.default_rng(size))
+    assert children.dtype == P1.dtype and children.shape == P1.shape
+    op = CROSSOVER_OPERATORS[kind]
+    for i in range(len(P1)):
+        expected = op(P1[i].tolist(), P2[i].tolist(), _Cuts(int(cx1[i]), int(cx2[i])))
+        assert children[i].tolist() == expected
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_erx_batch_matches_scalar_with_same_seed(size):
+    P1, P2 = _parents(40, size, size)
+    children = crossover_batch(P1, P2, 'erx', np.random.default_rng(0), random.Random(size))
+    rng = random.Random(size)
+    for i in range(len(P1)):
+        assert children[i].tolist() == erx(P1[i].tolist(), P2[i].tolist(), rng)
+
+
+def test_batch_rejects_unknown_kind():
+    P1, P2 = _parents(2, 5, 0)
+    with pytest.raises(ValueError):
+        crossover_batch(P1, P2, 'cx', np.random.default_rng(0))
+
+
+def test_swap_mutation_batch_keeps_permutations():
+    pop, _ = _parents(30, 12, 5)
+    before = pop.copy()
+    mask = np.arange(30) % 2 == 0
+    swap_mutation_batch(pop, mask, np.random.default_rng(0))
+    assert all(_is_permutation(row, 12) for row in pop)
+    assert (pop[~mask] == before[~mask]).all()
+    assert ((pop[mask] != before[mask]).sum(axis=1) == 2).all()
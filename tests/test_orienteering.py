@@ -0,0 +1,73 @@
+import random
+
+import pandas as pd
+import pytest
+
+from trp_instance import TRPInstance
+from trp_orienteering import Orienteering, OrienteeringALNS, OrienteeringGA
+
+
+def _line_instance(stops):
+    """Attractions on the x axis: (x, open_min, close_min, duration) each;
+    travel is 30 minutes per unit"""
+    df = pd.DataFrame([{'id': i, 'name': f'S{i}', 'x': x, 'y': 0.0, 'open_min': o,
+                        'close_min': c, 'duration': d, 'cost': 0}
+                       for i, (x, o, c, d) in enumerate(stops, 1)])
+    return TRPInstance(df)
+
+
+def test_wait_does_not_hide_a_later_late_stop():
+    # Stop 1 waits 90 minutes for opening; stop 2 is then 10 minutes late.
+    # Stop 3 fits into the wait before stop 1 but cannot fix stop 2.
+    inst = _line_instance([(1, 120, 600, 10), (2, 0, 150, 10), (0.1, 0, 600, 1)])
+    op = Orienteering(inst, 400000)
+    route = [1, 2]
+    assert not op.evaluate(route)['feasible']
+    _, _, slack = op.schedule(route)
+    assert slack[0] < 0
+    _, ok = op.insertions(route, [3])
+    assert not ok[0, 0]
+    assert not op.evaluate([3, 1, 2])['feasible']
+
+
+def test_wait_does_not_hide_overtime():
+    # Both stops are on time but the return is 20 minutes past the day end;
+    # the 90-minute wait at stop 1 used to make the route look feasible
+    inst = _line_instance([(1, 120, 600, 10), (2, 0, 600, 100)])
+    op = Orienteering(inst, 400000, day_end_min=300)
+    assert op.evaluate([1, 2])['overtime'] == pytest.approx(20)
+    _, _, slack = op.schedule([1, 2])
+    assert slack[0] < 0
+    repaired = op.repair([1, 2])
+    assert repaired in ([1], [2])
+    assert op.evaluate(repaired)['feasible']
+
+
+@pytest.mark.parametrize('seed', range(12))
+def test_repair_always_returns_feasible_routes(make_instance, seed):
+    rng = random.Random(seed)
+    inst = make_instance(seed, rng.choice([10, 25, 40]), tight=seed % 2 == 1)
+    budget = rng.choice([400000, int(inst.cost.sum()) // 4, 0])
+    op = Orienteering(inst, budget, day_end_min=rng.choice([240, 480, 720]))
+    nodes = inst.nodes()
+    for _ in range(60):
+        route = rng.sample(nodes, rng.randint(0, len(nodes)))
+        repaired = op.repair(route)
+        assert op.evaluate(repaired)['feasible']
+        assert set(repaired) <= set(route)
+        # Every insertion marked feasible really is
+        cand = [c for c in nodes if c not in repaired][:8]
+        if cand:
+            _, ok = op.insertions(repaired, cand)
+            for i, c in enumerate(cand):
+                for pos in range(len(repaired) + 1):
+                    if ok[i, pos]:
+                        assert op.evaluate(repaired[:pos] + [c] + repaired[pos:])['feasible']
+
+
+@pytest.mark.parametrize('solver,kw', [(OrienteeringGA, {'generations': 10}),
+                                       (OrienteeringALNS, {'iters': 60})])
+def test_solvers_return_feasible_routes(make_instance, solver, kw):
+    inst = make_instance(3, 30, tight=True)
+    result = solver(None, 'Test', 150000, instance=inst, **kw).run()
+    assert result['best_details']['feasible']
@@ -0,0 +1,95 @@
+import random
+
+import numpy as np
+import pytest
+
+from trp_delta import DeltaEvaluator
+from trp_repair import SCALAR_ENTRIES, InsertionTable, greedy_insert, regret_insert
+
+# Small cases take the scalar path, large ones the vectorized table
+CASES = [(seed, n, tight) for seed in range(4) for n in (6, 30) for tight in (False, True)]
+
+
+def _setup(inst, seed):
+    rng = random.Random(seed)
+    nodes = list(range(1, inst.n + 1))
+    rng.shuffle(nodes)
+    k = rng.randint(0, inst.n // 2)
+    budget = int(inst.cost.sum()) // 2
+    return budget, nodes[:k], nodes[k:]
+
+
+def _brute_costs(inst, budget, route, items):
+    return np.array([[inst.evaluate(route[:c] + [a] + route[c:], budget)['fitness']
+                      for c in range(len(route) + 1)] for a in items])
+
+
+def _naive_regret(inst, budget, route, items, k):
+    """regret_insert re-scoring every insertion with a full evaluation"""
+    route, items = list(route), list(items)
+    while items:
+        fit = _brute_costs(inst, budget, route, items)
+        best_gain = None
+        for row, costs in enumerate(fit):
+            nearest = sorted(costs)[:k]
+            regret = sum(c - nearest[0] for c in nearest[1:])
+            gain = -nearest[0] + 0.01 * regret
+            if best_gain is None or gain > best_gain:
+                best_gain, choice = gain, (row, int(np.argmin(costs)))
+        row, pos = choice
+        route.insert(pos, items.pop(row))
+    return route
+
+
+@pytest.mark.parametrize('seed,n,tight', CASES)
+def test_costs_match_brute_force_after_each_insert(make_instance, seed, n, tight):
+    inst = make_instance(seed, n, tight)
+    budget, route, items = _setup(inst, seed)
+    table = InsertionTable(DeltaEvaluator(inst, budget), route, items)
+    rng = random.Random(seed)
+    vectorized = False
+    while len(table):
+        fit = table.costs()
+        vectorized |= fit.size >= SCALAR_ENTRIES
+        expected = _brute_costs(inst, budget, table.route, table.items)
+        np.testing.assert_allclose(fit, expected, rtol=1e-9, atol=1e-6)
+        # A single row is the same as the matching row of the whole table
+        row = rng.randrange(len(table))
+        np.testing.assert_allclose(table.costs(slice(row, row + 1))[0], expected[row],
+                                   rtol=1e-9, atol=1e-6)
+        table.insert(row, rng.randint(0, len(table.route)))
+    assert vectorized == (n > 6)
+
+
+@pytest.mark.parametrize('seed,n,tight', CASES)
+def test_time_window_skips_only_hide_entries(make_instance, seed, n, tight):
+    inst = make_instance(seed, n, tight)
+    budget, route, items = _setup(inst, seed)
+    table = InsertionTable(DeltaEvaluator(inst, budget), route, items, inst.time_windows())
+    while len(table):
+        fit = table.costs()
+        expected = _brute_costs(inst, budget, table.route, table.items)
+        scored = np.isfinite(fit)
+        assert scored.any(axis=1).all()
+        np.testing.assert_allclose(fit[scored], expected[scored], rtol=1e-9, atol=1e-6)
+        table.insert(0, int(np.argmin(fit[0])))
+
+
+@pytest.mark.parametrize('k', [2, 3])
+@pytest.mark.parametrize('seed,n,tight', CASES)
+def test_regret_matches_naive(make_instance, seed, n, tight, k):
+    inst = make_instance(seed, n, tight)
+    budget, route, items = _setup(inst, seed)
+    got = regret_insert(DeltaEvaluator(inst, budget), route, items, k)
+    assert got == _naive_regret(inst, budget, route, items, k)
+
+
+@pytest.mark.parametrize('seed,n,tight', CASES)
+def test_greedy_takes_cheapest_position(make_instance, seed, n, tight):
+    inst = make_instance(seed, n, tight)
+    budget, route, items = _setup(inst, seed)
+    expected = list(route)
+    for a in items:
+        costs = _brute_costs(inst, budget, expected, [a])[0]
+        expected.insert(int(np.argmin(costs)), a)
+    assert greedy_insert(DeltaEvaluator(inst, budget), route, items) == expected
@@ -0,0 +1,86 @@
+import asyncio
+import random
+
+import pytest
+
+from trp_data import generate_attractions_dataset, make_df
+from trp_service import (ATTRACTION_FIELDS, PlanningService, RequestError, call,
+                         serve, validate)
+
+
+def _attractions(n=6):
+    df = make_df(generate_attractions_dataset('Hanoi', n, rng=random.Random(0)))
+    # Plain Python numbers, as a JSON body would carry them
+    return [{f: float(row[f]) for f in ATTRACTION_FIELDS} | {'id': int(row['id'])}
+            for row in df.to_dict('records')]
+
+
+def _with(field, value):
+    attractions = _attractions()
+    attractions[0] = dict(attractions[0], **{field: value})
+    return {'attractions': attractions, 'budget': 400000}
+
+
+BAD_REQUESTS = [
+    _with('x', 'abc'),
+    _with('x', None),
+    _with('y', float('nan')),
+    _with('cost', True),
+    _with('id', 1.5),
+    {'attractions': [1, 2], 'budget': 400000},
+    {'attractions': _attractions(), 'hotel': ['a', 'b'], 'budget': 400000},
+    {'attractions': _attractions(), 'hotel': [0, None], 'budget': 400000},
+    {'attractions': _attractions(), 'budget': -1},
+    {'attractions': _attractions(), 'budget': True},
+    {'attractions': _attractions(), 'budget': float('inf')},
+    {'attractions': _attractions(), 'budget': 'lots'},
+    {'attractions': _attractions()},
+]
+
+
+@pytest.mark.parametrize('request_body', BAD_REQUESTS)
+def test_validate_rejects_bad_values(request_body):
+    with pytest.raises(RequestError) as err:
+        validate(request_body, {})
+    assert err.value.status == 400
+
+
+def test_validate_coerces_numbers():
+    request = validate({'attractions': _attractions(), 'hotel': [0, 1], 'budget': 400000}, {})
+    assert request['hotel'] == [0.0, 1.0]
+    assert request['budget'] == 400000.0
+    assert all(isinstance(a['x'], float) and isinstance(a['id'], int)
+               for a in request['attractions'])
+
+
+def test_http_bad_requests_get_400(tmp_path):
+    sock = str(tmp_path / 'trp.sock')
+
+    async def scenario():
+        service = PlanningService(workers=1)
+        ready = asyncio.Event()
+        server = asyncio.create_task(serve(service, unix_path=sock, ready=ready))
+        await ready.wait()
+        loop = asyncio.get_running_loop()
+        try:
+            statuses = []
+            for body in BAD_REQUESTS:
+                status, _ = await loop.run_in_executor(
+                    None, lambda: call('POST', '/plan', body, unix_path=sock))
+                statuses.append(status)
+            good = {'attractions': _attractions(), 'budget': 400000,
+                    'params': {'iters': 20}}
+            ok, _ = await loop.run_in_executor(
+                None, lambda: call('POST', '/plan', good, unix_path=sock))
+            _, stats = await loop.run_in_executor(
+                None, lambda: call('GET', '/stats', unix_path=sock))
+        finally:
+            server.cancel()
+            await asyncio.gather(server, return_exceptions=True)
+        return statuses, ok, stats
+
+    statuses, ok, stats = asyncio.run(scenario())
+    assert statuses == [400] * len(BAD_REQUESTS)
+    assert ok == 200
+    assert stats['failed'] == 0
+    assert stats['completed'] == 1
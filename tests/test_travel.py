@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from trp_alns import ALNS_TRP
+from trp_data import load_instance, save_instance
+from trp_delta import DeltaEvaluator
+from trp_ga import EnhancedTRP_GA
+from trp_instance import LATE_PENALTY_MIN, TRPInstance
+from trp_travel import EuclideanTravel, TimeDependentTravel, TravelProvider
+
+RUSH = TimeDependentTravel([0, 60, 180, 240], [1.5, 1.0, 1.3, 1.0])
+
+
+def _simulate(inst, route, starts, factors):
+    """Schedule of `route` with every leg scaled by its departure slot"""
+    t = 0.0
+    prev = 0
+    for node in list(route) + [0]:
+        slot = max(s for s, start in enumerate(starts) if start <= t)
+        t += inst.travel[prev, node] * factors[slot]
+        if node:
+            t = max(t, inst.open_min[node])
+            if t > inst.close_min[node]:
+                t += LATE_PENALTY_MIN
+            t += inst.dur[node]
+        prev = node
+    return t
+
+
+def test_provider_needs_matrices():
+    with pytest.raises(TypeError):
+        TravelProvider()
+
+    class Incomplete(TravelProvider):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+@pytest.mark.parametrize('starts,factors', [
+    ([], []), ([0, 60], [1.0]), ([10], [1.0]), ([0, 60, 60], [1, 1, 1]), ([0], [0.5])])
+def test_time_dependent_rejects_bad_slots(starts, factors):
+    with pytest.raises(ValueError):
+        TimeDependentTravel(starts, factors)
+
+
+def test_unit_factors_match_static_travel(make_instance):
+    base = make_instance(0, 12)
+    flat = TRPInstance(base.df, travel=TimeDependentTravel([0, 120], [1.0, 1.0]))
+    route = list(range(1, 13))
+    assert flat.evaluate(route, 400000) == base.evaluate(route, 400000)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_evaluate_scales_legs_by_departure_slot(make_instance, seed):
+    base = make_instance(seed, 10, tight=seed % 2 == 1)
+    inst = TRPInstance(base.df, travel=RUSH)
+    rng = np.random.default_rng(seed)
+    pop = np.array([rng.permutation(10) + 1 for _ in range(20)])
+    for route in pop.tolist():
+        result = inst.evaluate(route, 400000)
+        assert result['total_time'] == pytest.approx(
+            _simulate(inst, route, RUSH.starts, RUSH.factors))
+        assert result['total_time'] >= base.evaluate(route, 400000)['total_time']
+    # The vectorized sweep scores exactly like evaluate
+    expected = [inst.fitness(route, 400000) for route in pop.tolist()]
+    assert inst.evaluate_batch(pop, 400000).tolist() == expected
+
+
+def test_time_slots_survive_save_and_load(make_instance, tmp_path):
+    inst = TRPInstance(make_instance(1, 8).df, travel=RUSH)
+    route = list(range(1, 9))
+    for matrices in (True, False):
+        path = str(tmp_path / f'rush-{matrices}.trpi')
+        save_instance(path, inst, matrices=matrices)
+        loaded = load_instance(path)
+        assert loaded.time_slots == inst.time_slots
+        assert loaded.evaluate(route, 400000)['fitness'] == pytest.approx(
+            inst.evaluate(route, 400000)['fitness'])
+
+
+def test_incremental_solvers_refuse_time_dependent_instances(make_instance):
+    inst = TRPInstance(make_instance(2, 8).df, travel=TimeDependentTravel(
+        [0], [1.2], base=EuclideanTravel()))
+    with pytest.raises(ValueError):
+        DeltaEvaluator(inst, 400000)
+    with pytest.raises(ValueError):
+        ALNS_TRP(None, 'Test', 400000, instance=inst)
+    # Evaluate-based solvers plan with the time-dependent schedule
+    result = EnhancedTRP_GA(None, 'Test', 400000, instance=inst, generations=5).run()
+    assert result['best_details'] == inst.evaluate(inst.to_index(result['best_route']), 400000)
@@ -0,0 +1,237 @@
+# Adaptive Large Neighbourhood Search for tourist route planning (TRPTW)
+
+import math
+import random
+import time
+
+import numpy as np
+
+from trp_budget import SearchBudget
+from trp_checkpoint import (check_compatible, load_checkpoint, random_state,
+                            save_checkpoint, set_random_state)
+from trp_delta import DeltaEvaluator
+from trp_instance import TRPInstance
+from trp_instrument import make_instrument
+from trp_repair import greedy_insert, regret_insert
+
+
+class ALNS_TRP:
+    """
+    ALNS tối giản cho TRP với time windows và budget.
+    - Biểu diễn nghiệm: permutation toàn bộ điểm
+    - Destroy: random removal, worst-removal (gia tăng chi phí), shaw removal (tương tự về không gian)
+    - Repair: greedy insertion, regret-k insertion (bảng chi phí chèn, cập nhật tăng dần)
+    - Adaptive weights: cập nhật trọng số operator theo kết quả cải thiện
+    """
+    def __init__(self, df, city_name, budget, hotel=(0,0),
+                 iters=2000, init_method='nn', rnd_seed=42,
+                 w_scores=(6,3,1), decay=0.8, destroy_rate=(0.1,0.4),
+                 instance=None, cache=None, regret_k=(2,),
+                 time_limit_ms=None, max_evaluations=None, on_incumbent=None,
+                 prune=True, instrument=None, checkpoint=None, checkpoint_every=100,
+                 resume_from=None):
+        self.df = df; self.city = city_name; self.hotel = hotel; self.budget = budget
+        self.iters = iters; self.rng = random.Random(rnd_seed)
+        self.w1, self.w2, self.w3 = w_scores; self.decay = decay
+        self.destroy_rate = destroy_rate
+        # shared matrices; routes are node indices (hotel = 0)
+        self.inst = instance if instance is not None else TRPInstance(df, hotel)
+        self.ids = self.inst.nodes()
+        # incremental evaluator for trial insertions (O(1) per position)
+        self.delta = DeltaEvaluator(self.inst, budget)
+        # optional FitnessCache, shareable with the GA on the same instance/budget
+        self.cache = cache.bind(self.inst, budget) if cache is not None else None
+        # time-window pre-filter: skip insertions/successors certain to be late
+        self.windows = self.inst.time_windows() if prune else None
+        # counters / phase timers (see trp_instrument)
+        self.instrument = make_instrument(instrument)
+        # operators
+        self.destroy_ops = ['random','worst','shaw']
+        self.repair_ops  = ['greedy'] + [f'regret{k}' for k in regret_k]
+        self.w_destroy = {op: 1.0 for op in self.destroy_ops}
+        self.w_repair  = {op: 1.0 for op in self.repair_ops}
+        # anytime limits; iters=None runs until one of them is reached and
+        # the annealing temperature then follows the time / evaluation share
+        self.limits = SearchBudget(time_limit_ms, max_evaluations, on_incumbent)
+        if iters is None and not self.limits.limited:
+            raise ValueError("iters=None needs time_limit_ms or max_evaluations")
+        # checkpoint every checkpoint_every iterations / resume a saved run
+        # (see trp_checkpoint)
+        if checkpoint_every < 1:
+            raise ValueError("checkpoint_every must be at least 1")
+        self.checkpoint = checkpoint; self.checkpoint_every = checkpoint_every
+        self.resume_from = resume_from
+
+    def dist(self, a, b):
+        return self.inst.dist[a, b]
+
+    def eval(self, perm):
+        det = self.inst.evaluate(perm, self.budget, detailed=False)
+        return det['fitness'], det
+
+    def fitness(self, perm):
+        if self.cache is None:
+            return self.inst.fitness(perm, self.budget)
+        return self.cache.fitness(perm, lambda r: self.inst.fitness(r, self.budget))
+
+    # Initialization
+    def initial_solution(self, method='nn'):
+        if method=='nn':
+            unv=self.inst.spatial_index().unvisited()
+            w=self.windows
+            cur=self.rng.choice(w.compatible(0, self.ids) if w else self.ids); route=[cur]; unv.remove(cur)
+            while unv:
+                cand=unv.nearest(cur, 3)
+                if w: cand=w.compatible(cur, cand)
+                cur=cand[self.rng.randint(0,len(cand)-1)]
+                route.append(cur); unv.remove(cur)
+            return route
+        else:
+            route=self.ids.copy(); self.rng.shuffle(route); return route
+
+    # Destroy operators
+    def op_random_remove(self, route, q):
+        r=route.copy(); rem=self.rng.sample(r, q)
+        for x in rem: r.remove(x)
+        return r, rem
+
+    def op_worst_remove(self, route, q):
+        d=self.inst.dist
+        scores=[]
+        for i,aid in enumerate(route):
+            prev = 0 if i==0 else route[i-1]
+            nxt  = 0 if i==len(route)-1 else route[i+1]
+            inc = d[prev,aid]+d[aid,nxt]-d[prev,nxt]
+            scores.append((inc, aid))
+        scores.sort(reverse=True)
+        remove=[aid for _,aid in scores[:q]]
+        r=[x for x in route if x not in remove]
+        return r, remove
+
+    def op_shaw_remove(self, route, q):
+        if not route: return route, []
+        seed=self.rng.choice(route); removed=[seed]
+        # relatedness to the seed, ranked once (stable: ties keep route order)
+        rest=np.array([x for x in route if x!=seed], dtype=np.int64)
+        cand=rest[np.argsort(self.inst.dist[seed, rest], kind='stable')].tolist()
+        while len(removed)<q and cand:
+            idx=int(len(cand)**(self.rng.random()))
+            removed.append(cand.pop(idx))
+        gone=set(removed)
+        return [x for x in route if x not in gone], removed
+
+    # Repair operators
+    def op_greedy_insert(self, partial, removed):
+        return greedy_insert(self.delta, partial, removed, self.windows)
+
+    def op_regret_insert(self, partial, removed, k=2):
+        return regret_insert(self.delta, partial, removed, k, self.windows)
+
+    def op_regret2_insert(self, partial, removed):
+        return self.op_regret_insert(partial, removed, 2)
+
+    # Adaptive selection
+    def select_op(self, weights):
+        ops=list(weights.keys()); vals=[weights[o] for o in ops]
+        s=sum(vals); probs=[v/s for v in vals]
+        x=self.rng.random(); c=0
+        for op,p in zip(ops,probs):
+            c+=p
+            if x<=c: return op
+        return ops[-1]
+
+    def update_weights(self, w, op, outcome):
+        reward = {1:self.w1, 2:self.w2, 3:self.w3}.get(outcome, 0)
+        w[op] = self.decay*w[op] + (1-self.decay)*reward
+
+    # Run state: start() or load_checkpoint(), then step() until done
+    def start(self):
+        self._start_time=time.time(); limits=self.limits; limits.start()
+        ins=self.instrument; ins.start()
+        self.cur = self.initial_solution('nn')
+        self.cur_fit = self.fitness(self.cur); limits.count(); ins.lap('initialization')
+        self.best=self.cur.copy(); self.best_fit=self.cur_fit
+        limits.improved(self.best_fit, self.inst.to_ids(self.best))
+        self.it = 0; self.temperature = 1.0
+
+    def step(self):
+        """One destroy / repair / acceptance iteration"""
+        limits=self.limits; ins=self.instrument; cur=self.cur; cur_fit=self.cur_fit
+        ins.resume()
+        q = max(1, int(len(cur)* self.rng.uniform(self.destroy_rate[0], self.destroy_rate[1])))
+        d_op = self.select_op(self.w_destroy)
+        if d_op=='random': partial, removed = self.op_random_remove(cur, q)
+        elif d_op=='worst': partial, removed = self.op_worst_remove(cur, q)
+        else: partial, removed = self.op_shaw_remove(cur, q)
+        ins.lap('destroy'); ins.count(f'destroy.{d_op}')
+        r_op = self.select_op(self.w_repair)
+        if r_op=='greedy': cand = self.op_greedy_insert(partial, removed)
+        else: cand = self.op_regret_insert(partial, removed, int(r_op[len('regret'):]))
+        ins.lap('repair'); ins.count(f'repair.{r_op}')
+        cand_fit = self.fitness(cand); limits.count()
+        ins.lap('evaluation'); ins.count('evaluations')
+        accept=False
+        if cand_fit < cur_fit:
+            accept=True; outcome=2
+        else:
+            T = self.temperature = max(0.01, 1.0 - limits.progress(self.it, self.iters))
+            if self.rng.random() < math.exp(-(cand_fit-cur_fit)/(1e-6+T)):
+                accept=True; outcome=3
+        if accept:
+            self.cur,self.cur_fit=cand,cand_fit
+            self.update_weights(self.w_destroy, d_op, outcome)
+            self.update_weights(self.w_repair,  r_op, outcome)
+            if cand_fit < self.best_fit:
+                self.best, self.best_fit = cand.copy(), cand_fit
+                self.update_weights(self.w_destroy, d_op, 1)
+                self.update_weights(self.w_repair,  r_op, 1)
+                limits.improved(self.best_fit, self.inst.to_ids(self.best))
+                ins.count('new_best')
+        ins.count('accept.improve' if accept and outcome==2 else 'accept.worse' if accept else 'reject')
+        ins.lap('acceptance')
+        self.it += 1
+
+    def save_checkpoint(self, path):
+        """Write the state between two iterations to `path`"""
+        rng_meta, rng_words = random_state(self.rng)
+        state = {'n': len(self.ids), 'budget': self.budget, 'it': self.it,
+                 'cur_fit': float(self.cur_fit), 'best_fit': float(self.best_fit),
+                 'temperature': self.temperature,
+                 'w_destroy': self.w_destroy, 'w_repair': self.w_repair,
+                 'rng': rng_meta, 'limits': self.limits.state(),
+                 'execution_time': time.time()-self._start_time}
+        arrays = {'cur': np.array(self.cur, dtype=np.int64), 'best': np.array(self.best, dtype=np.int64),
+                  'rng': rng_words}
+        return save_checkpoint(path, 'ALNS', state, arrays)
+
+    def load_checkpoint(self, path):
+        """Restore the run state saved by save_checkpoint (instead of start())"""
+        state, arrays = load_checkpoint(path, 'ALNS')
+        check_compatible(state, path, n=len(self.ids), budget=self.budget)
+        if set(state['w_destroy']) != set(self.w_destroy) or set(state['w_repair']) != set(self.w_repair):
+            raise ValueError(f"Checkpoint {path} was written with other ALNS operators")
+        self._start_time=time.time()-state['execution_time']
+        self.limits.restore(state['limits']); self.instrument.start()
+        self.cur = arrays['cur'].tolist(); self.cur_fit = state['cur_fit']
+        self.best = arrays['best'].tolist(); self.best_fit = state['best_fit']
+        self.it = state['it']; self.temperature = state['temperature']
+        self.w_destroy.update(state['w_destroy']); self.w_repair.update(state['w_repair'])
+        set_random_state(self.rng, state['rng'], arrays['rng'])
+
+    def result(self):
+        best_det = self.inst.evaluate(self.best, self.budget)
+        return {'best_route':self.inst.to_ids(self.best),'best_details':best_det,'execution_time':time.time()-self._start_time,
+                'cache_stats':self.cache.stats() if self.cache is not None else None,
+                'iterations':self.it,'evaluations':self.limits.evaluations,'budget_exhausted':self.limits.exhausted(),
+                'instrumentation':self.instrument.finish(cache=self.cache.stats() if self.cache is not None else None,
+                                                         delta_evaluations=self.delta.delta_evaluations,
+                                                         delta_walks=self.delta.full_evaluations)}
+
+    def run(self):
+        if self.resume_from is not None: self.load_checkpoint(self.resume_from)
+        else: self.start()
+        while (self.iters is None or self.it < self.iters) and not self.limits.exhausted():
+            self.step()
+            if self.checkpoint is not None and self.it % self.checkpoint_every == 0:
+                self.save_checkpoint(self.checkpoint)
+        return self.result()
@@ -0,0 +1,220 @@
+# Comparison methods for tourist route planning: Greedy and Random search
+
+import random
+import time
+
+import numpy as np
+
+from trp_budget import SearchBudget
+from trp_instance import TRPInstance
+from trp_instrument import make_instrument
+
+# Upper bound on pop_size * n for one batch of random routes
+MAX_BATCH_GENES = 1 << 22
+
+
+class GreedyTRP:
+    """Greedy algorithm for tourist route planning.
+
+    Under a time limit the construction stops early and the route built so
+    far is returned.
+    """
+
+    def __init__(self, df, city_name, budget, hotel=(0,0), instance=None,
+                 time_limit_ms=None, max_evaluations=None, on_incumbent=None,
+                 instrument=None):
+        self.df = df
+        self.city_name = city_name
+        self.hotel = hotel
+        self.budget = budget
+        self.limits = SearchBudget(time_limit_ms, max_evaluations, on_incumbent)
+        self.instrument = make_instrument(instrument)
+
+        self.inst = instance if instance is not None else TRPInstance(df, hotel)
+        self.attraction_ids = self.inst.ids
+
+    def run(self):
+        """Greedy nearest neighbor algorithm"""
+        start_time = time.time()
+        self.limits.start()
+        ins = self.instrument
+        ins.start()
+
+        cost = self.inst.cost
+        unvisited = self.inst.spatial_index().unvisited()
+        route = []
+        current = 0  # hotel
+        total_cost = 0
+
+        while unvisited and not self.limits.exhausted():
+            # Choose nearest feasible attraction (budget constraint). Spending
+            # only grows, so an attraction that no longer fits never will again
+            nearest = unvisited.nearest(current)[0]
+            ins.count('nearest_queries')
+            if total_cost + cost[nearest] > self.budget:
+                unvisited.retain(total_cost + cost <= self.budget)
+                ins.count('budget_prunes')
+                continue
+
+            current = nearest
+            route.append(current)
+            unvisited.remove(current)
+            total_cost += cost[current]
+
+        ins.lap('construction')
+
+        # Evaluate the route
+        if route:
+            eval_result = self._evaluate_route(route)
+            self.limits.count()
+            ins.count('evaluations')
+            self.limits.improved(eval_result['fitness'], self.inst.to_ids(route))
+        else:
+            eval_result = {
+                'fitness': float('inf'),
+                'total_dist': 0,
+                'total_cost': 0,
+                'total_time': 0,
+                'feasible': False,
+                'route_times': []
+            }
+
+        execution_time = time.time() - start_time
+
+        return {
+            'best_route': self.inst.to_ids(route),
+            'best_details': eval_result,
+            'execution_time': execution_time,
+            'attractions_visited': len(route),
+            'budget_exhausted': self.limits.exhausted(),
+            'instrumentation': ins.finish()
+        }
+
+    def _evaluate_route(self, perm):
+        """Evaluate route quality - same as GA evaluation"""
+        return self.inst.evaluate(perm, self.budget)
+
+
+class RandomTRP:
+    """Random search algorithm for comparison.
+
+    With batch_size=None routes are shuffled and scored one at a time;
+    otherwise `batch_size` permutations are drawn at once and scored with
+    `TRPInstance.evaluate_batch`. Both modes are seeded per instance.
+    iterations=None samples until time_limit_ms or max_evaluations is hit.
+    """
+
+    def __init__(self, df, city_name, budget, hotel=(0,0), iterations=1000,
+                 instance=None, seed=42, batch_size=None, time_limit_ms=None,
+                 max_evaluations=None, on_incumbent=None, instrument=None):
+        self.df = df
+        self.city_name = city_name
+        self.hotel = hotel
+        self.budget = budget
+        self.iterations = iterations
+        self.instrument = make_instrument(instrument)
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
+        self.limits = SearchBudget(time_limit_ms, max_evaluations, on_incumbent)
+        if iterations is None and not self.limits.limited:
+            raise ValueError("iterations=None needs time_limit_ms or max_evaluations")
+
+        self.inst = instance if instance is not None else TRPInstance(df, hotel)
+        self.attraction_ids = self.inst.ids
+
+    def run(self):
+        """Random search with multiple iterations"""
+        start_time = time.time()
+        self.limits.start()
+        self.instrument.start()
+
+        if self.batch_size:
+            best_route, best_score = self._search_batched()
+        else:
+            best_route, best_score = self._search()
+
+        self.instrument.resume()
+        best_details = self._evaluate_route(best_route) if best_route else None
+        self.instrument.lap('final_evaluation')
+        execution_time = time.time() - start_time
+
+        return {
+            'best_route': self.inst.to_ids(best_route) if best_route else None,
+            'best_details': best_details,
+            'execution_time': execution_time,
+            'iterations': self.limits.evaluations,
+            'budget_exhausted': self.limits.exhausted(),
+            'instrumentation': self.instrument.finish()
+        }
+
+    def _search(self):
+        best_route = None
+        best_score = float('inf')
+        nodes = self.inst.nodes()
+        limits = self.limits
+        ins = self.instrument
+
+        while self.iterations is None or limits.evaluations < self.iterations:
+            if limits.exhausted():
+                break
+            ins.resume()
+            # Generate random route
+            route = nodes.copy()
+            self.rng.shuffle(route)
+            ins.lap('sampling')
+
+            # Evaluate route (schedule only for the final best)
+            score = self.inst.fitness(route, self.budget)
+            limits.count()
+            ins.lap('evaluation')
+            ins.count('evaluations')
+
+            if score < best_score:
+                best_score = score
+                best_route = route.copy()
+                limits.improved(best_score, self.inst.to_ids(best_route))
+                ins.count('improvements')
+
+        return best_route, best_score
+
+    def _search_batched(self):
+        best_route = None
+        best_score = float('inf')
+        n = self.inst.n
+        if n == 0:
+            return best_route, best_score
+
+        # Bound the batch to a few million genes on large instances
+        rows = max(1, min(self.batch_size, MAX_BATCH_GENES // n))
+        dtype = np.int16 if n < np.iinfo(np.int16).max else np.int32
+        base = np.tile(np.arange(1, n + 1, dtype=dtype), (rows, 1))
+        genes = np.empty_like(base)
+
+        limits = self.limits
+        ins = self.instrument
+        left = self.iterations if self.iterations is not None else float('inf')
+        while left > 0 and not limits.exhausted():
+            remaining = limits.remaining_evaluations()
+            b = int(min(rows, left, remaining if remaining is not None else rows))
+            ins.resume()
+            # Independent shuffle of every row
+            batch = self.np_rng.permuted(base[:b], axis=1, out=genes[:b])
+            ins.lap('sampling')
+            scores = self.inst.evaluate_batch(batch, self.budget)
+            limits.count(b)
+            ins.lap('evaluation')
+            ins.count('evaluations', b)
+            i = int(np.argmin(scores))
+            if scores[i] < best_score:
+                best_score = float(scores[i])
+                best_route = batch[i].tolist()
+                limits.improved(best_score, self.inst.to_ids(best_route))
+                ins.count('improvements')
+            left -= b
+
+        return best_route, best_score
+
+    def _evaluate_route(self, perm):
+        """Same evaluation as GA"""
+        return self.inst.evaluate(perm, self.budget)
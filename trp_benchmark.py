@@ -0,0 +1,257 @@
+# Scalability benchmark: synthetic instances from 10 to 10,000 attractions
+#
+# Every (size, algorithm) run happens in a fresh spawned process so that its
+# peak RSS is its own. Instances come from generate_attractions_dataset with a
+# fixed seed per size, so two runs of the suite measure the same problems.
+# Results are written as JSON and can be checked against a stored baseline:
+#
+#   python trp_benchmark.py --sizes 10 100 1000 --out bench.json
+#   python trp_benchmark.py --sizes 10 100 1000 --baseline bench.json --max-drop 10
+#
+# The second call exits with status 1 if evaluations/sec of any run dropped by
+# more than 10% against the baseline.
+
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+from trp_data import generate_attractions_dataset, make_df
+from trp_experiments import ALGORITHMS
+from trp_instance import TRPInstance
+
+SIZES = (10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+# Per-algorithm settings: fixed work budgets (so throughput is comparable
+# across sizes) and the largest size worth running
+SUITE = {
+    'GA': {'params': {'population_size': 50, 'generations': 50, 'patience': None},
+           'max_n': 10000},
+    'Greedy': {'params': {}, 'max_n': 10000},
+    'Random': {'params': {'iterations': 500}, 'max_n': 10000},
+    'ALNS': {'params': {'iters': 30, 'destroy_rate': (0.02, 0.05)}, 'max_n': 1000}
+}
+
+# Budget per attraction (Hanoi: 400,000 VND for 20 attractions)
+BUDGET_PER_ATTRACTION = 20000
+
+
+class _CountingInstance(TRPInstance):
+    """TRPInstance over the same arrays that counts full evaluations and
+    records the best fitness seen over time"""
+
+    def reset(self):
+        self.evaluations = 0
+        self.best = math.inf
+        self.trajectory = []
+        self.t0 = time.perf_counter()
+
+    def _seen(self, fitness):
+        if fitness < self.best:
+            self.best = fitness
+            self.trajectory.append((time.perf_counter() - self.t0, fitness))
+
+    def evaluate(self, route, budget, detailed=True):
+        res = super().evaluate(route, budget, detailed)
+        self.evaluations += 1
+        self._seen(res['fitness'])
+        return res
+
+    def evaluate_batch(self, pop, budget, full=False):
+        res = super().evaluate_batch(pop, budget, full)
+        fit = res[0] if full else res
+        self.evaluations += len(fit)
+        if len(fit):
+            self._seen(float(fit.min()))
+        return res
+
+
+def benchmark_instance(n, seed=42):
+    """(df, budget) of the benchmark instance with n attractions"""
+    rng = random.Random(seed * 1_000_003 + n)
+    # Keep the attraction density of the Hanoi dataset (20 in a 4x4 grid)
+    grid = 4.0 * math.sqrt(n / 20)
+    df = make_df(generate_attractions_dataset(f"Bench{n}", n, grid_size=grid, rng=rng))
+    return df, BUDGET_PER_ATTRACTION * n
+
+
+def _peak_rss_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def _bench_one(n, algorithm, seed, params, repeats):
+    """Child process: build the instance, run the solver `repeats` times and
+    report the fastest run (runs are seeded, so they do identical work)"""
+    t = time.perf_counter()
+    df, budget = benchmark_instance(n, seed)
+    base = TRPInstance(df)
+    inst = _CountingInstance.from_arrays(base.ids, base.arrays(), base.hotel,
+                                         base.minutes_per_unit, euclidean=base.euclidean,
+                                         time_slots=base.time_slots)
+    build_time = time.perf_counter() - t
+    del base
+
+    best = None
+    for _ in range(repeats):
+        solver = ALGORITHMS[algorithm](inst, f"Bench{n}", budget, seed, dict(params))
+        inst.reset()
+        result = solver.run()
+        wall = time.perf_counter() - inst.t0
+        if best is not None and wall >= best['wall_time']:
+            continue
+
+        delta = getattr(solver, 'delta', None)
+        delta_evals = delta.delta_evaluations if delta is not None else 0
+        best = {
+            'n': n,
+            'algorithm': algorithm,
+            'seed': seed,
+            'params': params,
+            'final_fitness': float(result['best_details']['fitness']),
+            'evaluations': inst.evaluations,
+            'delta_evaluations': delta_evals,
+            'evals_per_sec': (inst.evaluations + delta_evals) / wall if wall > 0 else 0.0,
+            'wall_time': wall,
+            'build_time': build_time,
+            'trajectory': inst.trajectory
+        }
+    best['peak_rss_mb'] = _peak_rss_mb()
+    return best
+
+
+def _time_to_target(trajectory, target):
+    for t, fit in trajectory:
+        if fit <= target:
+            return t
+    return None
+
+
+def run_suite(sizes=SIZES, algorithms=tuple(SUITE), seed=42, repeats=3,
+              target_gap=0.05, verbose=True):
+    """Run the suite; returns {'meta': ..., 'results': [row, ...]}.
+
+    Each run is timed `repeats` times and the fastest repetition is kept.
+    time_to_target is the time at which a run first reached a fitness within
+    `target_gap` of the best final fitness any algorithm found for that size
+    (None if it never did).
+    """
+    if repeats < 1:
+        raise ValueError("repeats must be at least 1")
+    ctx = get_context('spawn')
+    rows = []
+    for n in sizes:
+        size_rows = []
+        for alg in algorithms:
+            if n > SUITE[alg]['max_n']:
+                continue
+            # One task per fresh process keeps peak RSS per run
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                row = pool.submit(_bench_one, n, alg, seed, SUITE[alg]['params'], repeats).result()
+            size_rows.append(row)
+            if verbose:
+                print(f"   n={n:6d} | {alg:7s} | fitness={row['final_fitness']:12.1f} | "
+                      f"{row['evals_per_sec']:11.0f} evals/s | {row['wall_time']:7.2f}s | "
+                      f"{row['peak_rss_mb']:7.1f} MB")
+
+        if size_rows:
+            target = min(r['final_fitness'] for r in size_rows) * (1 + target_gap)
+            for r in size_rows:
+                r['target'] = target
+                r['time_to_target'] = _time_to_target(r['trajectory'], target)
+        rows.extend(size_rows)
+
+    meta = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'seed': seed,
+        'repeats': repeats,
+        'sizes': list(sizes),
+        'target_gap': target_gap,
+        'suite': SUITE
+    }
+    return {'meta': meta, 'results': rows}
+
+
+def save(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=1)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(report, baseline, max_drop=0.10, min_time=0.2):
+    """Throughput regressions of `report` against `baseline`.
+
+    Runs are matched on (n, algorithm); runs shorter than `min_time` seconds
+    in either report are too noisy to judge and are skipped. Returns a list
+    of dicts for every run whose evals/sec fell by more than `max_drop`.
+    """
+    base = {(r['n'], r['algorithm']): r for r in baseline['results']}
+    regressions = []
+    for r in report['results']:
+        b = base.get((r['n'], r['algorithm']))
+        if b is None or b['evals_per_sec'] <= 0:
+            continue
+        if min(r['wall_time'], b['wall_time']) < min_time:
+            continue
+        change = r['evals_per_sec'] / b['evals_per_sec'] - 1
+        if change < -max_drop:
+            regressions.append({
+                'n': r['n'],
+                'algorithm': r['algorithm'],
+                'baseline_evals_per_sec': b['evals_per_sec'],
+                'evals_per_sec': r['evals_per_sec'],
+                'change': change
+            })
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TRP scalability benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES))
+    parser.add_argument('--algorithms', nargs='+', default=list(SUITE), choices=list(SUITE))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--out', default='benchmark_results.json')
+    parser.add_argument('--baseline', help="baseline JSON to compare against")
+    parser.add_argument('--max-drop', type=float, default=10.0,
+                        help="allowed evals/sec drop against the baseline, in percent")
+    args = parser.parse_args(argv)
+    if args.repeats < 1:
+        parser.error("--repeats must be at least 1")
+
+    print(f"📏 Benchmarking {', '.join(args.algorithms)} on n = {args.sizes}")
+    report = run_suite(args.sizes, args.algorithms, args.seed, args.repeats)
+    save(report, args.out)
+    print(f"✅ Results written to {args.out}")
+
+    if args.baseline:
+        regressions = compare(report, load(args.baseline), args.max_drop / 100)
+        if regressions:
+            print(f"❌ Throughput regressions (> {args.max_drop:.0f}% drop):")
+            for r in regressions:
+                print(f"   n={r['n']:6d} | {r['algorithm']:7s} | "
+                      f"{r['baseline_evals_per_sec']:.0f} -> {r['evals_per_sec']:.0f} evals/s "
+                      f"({r['change']:+.1%})")
+            return 1
+        print("✅ No throughput regressions against the baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
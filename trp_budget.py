@@ -0,0 +1,109 @@
+# Anytime solving: wall-clock / evaluation budgets and incumbent reporting
+#
+# Every solver accepts time_limit_ms, max_evaluations and on_incumbent and
+# keeps one SearchBudget per run. The solver polls `exhausted()` between
+# units of work (a GA generation, an ALNS iteration, a batch of random
+# routes) and stops with its best-so-far route once either limit is hit.
+# `on_incumbent` is called with every new best route, so a caller can serve
+# the first incumbent right away while the search keeps refining it.
+
+import time
+
+
+class SearchBudget:
+    """Limits of one solver run; None means unlimited"""
+
+    def __init__(self, time_limit_ms=None, max_evaluations=None, on_incumbent=None):
+        if time_limit_ms is not None and time_limit_ms <= 0:
+            raise ValueError("time_limit_ms must be positive")
+        if max_evaluations is not None and max_evaluations <= 0:
+            raise ValueError("max_evaluations must be positive")
+        self.time_limit_ms = time_limit_ms
+        self.max_evaluations = max_evaluations
+        self.on_incumbent = on_incumbent
+        self.start()
+
+    @property
+    def limited(self):
+        return self.time_limit_ms is not None or self.max_evaluations is not None
+
+    def start(self):
+        """Reset the clock and the evaluation counter (call at the start of run)"""
+        self.t0 = time.perf_counter()
+        self.deadline = (self.t0 + self.time_limit_ms / 1000.0
+                         if self.time_limit_ms is not None else None)
+        self.evaluations = 0
+        self.incumbents = 0
+
+    def state(self):
+        """Progress to carry over into a resumed run (see trp_checkpoint)"""
+        return {
+            'elapsed_ms': self.elapsed_ms(),
+            'evaluations': self.evaluations,
+            'incumbents': self.incumbents
+        }
+
+    def restore(self, state):
+        """Continue from `state`: the clock resumes at the saved elapsed time"""
+        self.start()
+        self.t0 -= state['elapsed_ms'] / 1000.0
+        if self.deadline is not None:
+            self.deadline -= state['elapsed_ms'] / 1000.0
+        self.evaluations = state['evaluations']
+        self.incumbents = state['incumbents']
+
+    def count(self, evaluations=1):
+        self.evaluations += evaluations
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.t0) * 1000.0
+
+    def remaining_evaluations(self):
+        if self.max_evaluations is None:
+            return None
+        return max(0, self.max_evaluations - self.evaluations)
+
+    def exhausted(self):
+        """True once the time or evaluation limit has been reached"""
+        if self.max_evaluations is not None and self.evaluations >= self.max_evaluations:
+            return True
+        return self.deadline is not None and time.perf_counter() >= self.deadline
+
+    def progress(self, it, iters=None):
+        """Fraction of the run used so far: the largest of the iteration,
+        time and evaluation fractions that apply"""
+        fractions = []
+        if iters:
+            fractions.append(it / iters)
+        if self.time_limit_ms is not None:
+            fractions.append(self.elapsed_ms() / self.time_limit_ms)
+        if self.max_evaluations is not None:
+            fractions.append(self.evaluations / self.max_evaluations)
+        return min(1.0, max(fractions)) if fractions else 0.0
+
+    def deadline_before(self, deadline):
+        """The earlier of `deadline` (perf_counter seconds or None) and ours"""
+        if self.deadline is None:
+            return deadline
+        if deadline is None:
+            return self.deadline
+        return min(deadline, self.deadline)
+
+    def improved(self, fitness, route):
+        """Report a new best route (attraction ids) to the callback"""
+        self.incumbents += 1
+        if self.on_incumbent is not None:
+            self.on_incumbent({
+                'fitness': float(fitness),
+                'route': route,
+                'elapsed_ms': self.elapsed_ms(),
+                'evaluations': self.evaluations
+            })
+
+    def stats(self):
+        return {
+            'evaluations': self.evaluations,
+            'incumbents': self.incumbents,
+            'elapsed_ms': self.elapsed_ms(),
+            'budget_exhausted': self.exhausted()
+        }
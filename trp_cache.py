@@ -0,0 +1,112 @@
+# Fitness memoization shared between solvers
+#
+# GA elitism and non-crossed parents put identical genomes back into the
+# population, and the ALNS annealing walk revisits the same routes; caching
+# their fitness avoids re-scoring them.
+
+from collections import OrderedDict
+
+import numpy as np
+
+
+def route_key(route):
+    """Fast hashable key for a route: the raw bytes of an int32 copy"""
+    return np.asarray(route, dtype=np.int32).tobytes()
+
+
+class FitnessCache:
+    """Bounded LRU map from route key -> fitness.
+
+    A cache may be shared by several solvers as long as they score routes on
+    the same instance with the same budget; `bind` enforces that.
+    """
+
+    def __init__(self, max_size=100_000):
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        self.max_size = max_size
+        self._data = OrderedDict()
+        # The bound instance is held (not its id, which a new object can
+        # reuse once the old one is collected) together with the budget
+        self._inst = None
+        self._budget = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def bind(self, inst, budget):
+        """Attach the cache to one (instance, budget) pair"""
+        if self._inst is None:
+            self._inst, self._budget = inst, budget
+        elif self._inst is not inst or self._budget != budget:
+            raise ValueError("FitnessCache is already bound to a different instance/budget")
+        return self
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        """Cached fitness or None; counts a hit or a miss"""
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, fitness):
+        self._data[key] = fitness
+        self._data.move_to_end(key)
+        if len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def fitness(self, route, compute):
+        """Cached fitness of `route`, calling compute(route) on a miss"""
+        key = route_key(route)
+        value = self.get(key)
+        if value is None:
+            value = compute(route)
+            self.put(key, value)
+        return value
+
+    def fitness_batch(self, genes, compute_batch):
+        """Cached fitness for each row of `genes`; misses are scored with
+        one compute_batch(rows) call"""
+        genes = np.asarray(genes)
+        keys = [row.tobytes() for row in genes.astype(np.int32, copy=False)]
+        scores = np.empty(len(keys))
+        missing = {}
+        for i, key in enumerate(keys):
+            value = self.get(key)
+            if value is None:
+                missing.setdefault(key, []).append(i)
+            else:
+                scores[i] = value
+
+        if missing:
+            rows = [idx[0] for idx in missing.values()]
+            fresh = compute_batch(genes[rows])
+            for (key, idx), value in zip(missing.items(), fresh.tolist()):
+                scores[idx] = value
+                self.put(key, value)
+                # Duplicates within the batch count as hits
+                self.misses -= len(idx) - 1
+                self.hits += len(idx) - 1
+        return scores
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self._data),
+            'max_size': self.max_size,
+            'evictions': self.evictions
+        }
+
+    def clear(self):
+        self._data.clear()
+        self.hits = self.misses = self.evictions = 0
@@ -0,0 +1,90 @@
+# Solver checkpoints: save a run's state and resume it bit-for-bit
+#
+# EnhancedTRP_GA and ALNS_TRP take `checkpoint=path` (written every
+# `checkpoint_every` generations / iterations) and `resume_from=path`.
+# A checkpoint holds everything the rest of the run depends on:
+#
+#   GA    population, best-so-far, counters, both RNG states, the
+#         convergence history, the diversity control and memetic
+#         local-optima set
+#   ALNS  current and best routes, operator weights, temperature,
+#         iteration count and the RNG state
+#
+# plus the time / evaluation budget already used. A run resumed with the
+# same solver arguments continues exactly as the uninterrupted run would
+# have, so on preemptible nodes a killed job loses at most
+# `checkpoint_every` units of work:
+#
+#   ga = EnhancedTRP_GA(df, 'Hanoi', 400000, checkpoint='hanoi.trpc')
+#   ga = EnhancedTRP_GA(df, 'Hanoi', 400000, checkpoint='hanoi.trpc',
+#                       resume_from='hanoi.trpc')   # after a crash
+#
+# Files use the binary container of trp_data (JSON header, aligned
+# little-endian arrays) and are replaced atomically. Fitness caches and
+# instrumentation are not saved: they do not change the search.
+#
+# Anything decided by the wall clock is only as reproducible as the clock.
+# Time-limited runs resume with the elapsed time restored, and the memetic
+# GA's local search stops after ls_time_ms per generation, so a resumed
+# memetic run matches the uninterrupted one only if that deadline is never
+# hit. For identical results pass ls_time_ms=None and cap the work with
+# ls_max_moves (improving moves per route) instead:
+#
+#   ga = EnhancedTRP_GA(df, 'Hanoi', 400000, memetic=True, ls_time_ms=None,
+#                       ls_max_moves=20, checkpoint='hanoi.trpc')
+
+import numpy as np
+
+from trp_data import read_container, write_container
+from trp_history import HISTORY_DTYPE
+
+CHECKPOINT_MAGIC = b'TRPC'
+CHECKPOINT_VERSION = 1
+
+
+def save_checkpoint(path, solver, state, arrays):
+    """Write a `solver` ('GA' or 'ALNS') checkpoint; `state` is JSON"""
+    return write_container(path, CHECKPOINT_MAGIC, CHECKPOINT_VERSION,
+                           {'solver': solver, 'state': state}, arrays)
+
+
+def load_checkpoint(path, solver):
+    """(state, arrays) of a checkpoint written for `solver`; the arrays are
+    read into memory, so the file can be replaced by the next checkpoint"""
+    header, arrays = read_container(path, CHECKPOINT_MAGIC, CHECKPOINT_VERSION,
+                                    'solver checkpoint', mmap=False)
+    if header['solver'] != solver:
+        raise ValueError(f"{path} is a {header['solver']} checkpoint, not {solver}")
+    return header['state'], arrays
+
+
+def check_compatible(state, path, **expected):
+    """Refuse to resume a checkpoint of a different problem / configuration"""
+    for name, value in expected.items():
+        if state[name] != value:
+            raise ValueError(f"Checkpoint {path} has {name}={state[name]!r}, "
+                             f"this solver {name}={value!r}")
+
+
+def random_state(rng):
+    """random.Random state as (JSON part, uint32 array of the MT words)"""
+    version, internal, gauss_next = rng.getstate()
+    return {'version': version, 'gauss_next': gauss_next}, np.array(internal, dtype=np.uint32)
+
+
+def set_random_state(rng, meta, internal):
+    rng.setstate((meta['version'], tuple(int(x) for x in internal), meta['gauss_next']))
+
+
+def history_arrays(history):
+    """Convergence history as one array per column"""
+    records = history.to_records()
+    return {f'history.{name}': records[name] for name in records.dtype.names}
+
+
+def restore_history(history, arrays):
+    records = np.zeros(len(arrays['history.generation']), dtype=HISTORY_DTYPE)
+    for name in HISTORY_DTYPE.names:
+        records[name] = arrays[f'history.{name}']
+    history.reset()
+    history.extend(records)
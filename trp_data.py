@@ -0,0 +1,449 @@
+# Synthetic attraction datasets and their DataFrame form
+#
+# Attractions are dicts with 'HH:MM' opening hours; make_df converts them to
+# the rows the solvers consume (times in minutes from 09:00).
+#
+# For very large cities the columnar generator draws the same distribution
+# directly as NumPy arrays, and write_dataset streams it chunk by chunk to
+# .npz (or Parquet, with pyarrow installed) in bounded memory:
+#
+#   write_dataset('city_1m.npz', 1_000_000, grid_size=900.0, seed=7)
+#   df = columns_to_df(read_dataset('city_1m.npz'), 'Stress')
+#
+# Solver instances persist with save_instance / load_instance in a small
+# versioned binary format: a JSON header followed by raw little-endian
+# arrays at 64-byte aligned offsets. Loading maps the arrays with np.memmap,
+# so nothing is copied and worker processes that load the same file share
+# its pages through the OS page cache. Solver checkpoints (trp_checkpoint)
+# use the same container with their own magic.
+
+import json
+import os
+import struct
+import random
+import shutil
+import tempfile
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from trp_instance import MINUTES_PER_UNIT, TRPInstance
+from trp_travel import TimeDependentTravel
+
+# Predefined attraction types and their characteristics; the position of a
+# type is its code in the columnar format
+ATTRACTION_TYPES = {
+    'Museum': {'base_duration': 75, 'base_cost': 35000, 'open_early': True},
+    'Temple': {'base_duration': 40, 'base_cost': 10000, 'open_early': True},
+    'Park': {'base_duration': 60, 'base_cost': 0, 'open_early': False},
+    'Market': {'base_duration': 45, 'base_cost': 5000, 'open_early': True},
+    'Monument': {'base_duration': 30, 'base_cost': 15000, 'open_early': True},
+    'Beach': {'base_duration': 90, 'base_cost': 0, 'open_early': False},
+    'Shopping': {'base_duration': 80, 'base_cost': 20000, 'open_early': True},
+    'Cultural Site': {'base_duration': 55, 'base_cost': 25000, 'open_early': True},
+}
+
+# Types that are open around the clock 30% of the time
+ALL_DAY_TYPES = ('Park', 'Beach')
+
+# Columns of the columnar format and their dtypes
+COLUMNS = {
+    'id': np.int64,
+    'x': np.float64,
+    'y': np.float64,
+    'open_min': np.int16,
+    'close_min': np.int16,
+    'duration': np.int16,
+    'cost': np.int32,
+    'type': np.int8,
+}
+
+# Attractions generated per chunk when streaming to disk
+CHUNK_SIZE = 100_000
+
+# Binary instance format: magic, version (uint32), header length (uint64)
+INSTANCE_MAGIC = b'TRPI'
+INSTANCE_VERSION = 1
+_PREAMBLE = struct.Struct('<4sIQ')
+_ALIGN = 64
+
+# Per-node arrays (hotel at row 0) and the optional matrices
+_NODE_FIELDS = ('xy', 'open_min', 'close_min', 'dur', 'cost')
+_MATRIX_FIELDS = ('dist', 'travel')
+
+
+def generate_attractions_dataset(city_name, num_attractions, grid_size=3.0, rng=None):
+    """Generate a larger dataset of attractions for testing.
+
+    Draws from the module-level `random` unless a random.Random is given.
+    """
+    rng = rng or random
+    attractions = []
+    attraction_types = ATTRACTION_TYPES
+    type_names = list(attraction_types.keys())
+    
+    for i in range(1, num_attractions + 1):
+        # Random coordinates within grid
+        x = rng.uniform(-grid_size/2, grid_size/2)
+        y = rng.uniform(-grid_size/2, grid_size/2)
+        
+        # Select attraction type
+        attr_type = rng.choice(type_names)
+        type_data = attraction_types[attr_type]
+        
+        # Generate opening/closing times based on type
+        if type_data['open_early']:
+            open_hour = rng.choice([6, 7, 8])
+            close_hour = rng.choice([17, 18, 19])
+        else:
+            open_hour = rng.choice([8, 9, 10])
+            close_hour = rng.choice([19, 20, 21, 22])
+            
+        # Some attractions are 24/7 (parks, beaches)
+        if attr_type in ALL_DAY_TYPES and rng.random() < 0.3:
+            open_time = "00:00"
+            close_time = "23:59"
+        else:
+            open_time = f"{open_hour:02d}:{rng.choice([0, 30]):02d}"
+            close_time = f"{close_hour:02d}:{rng.choice([0, 30]):02d}"
+        
+        # Duration and cost with some variation
+        duration = type_data['base_duration'] + rng.randint(-15, 20)
+        cost = type_data['base_cost'] + rng.randint(-5000, 10000)
+        cost = max(0, cost)  # Ensure non-negative cost
+        
+        attraction = {
+            'id': i,
+            'name': f"{city_name} {attr_type} {i}",
+            'coord': (x, y),
+            'open': open_time,
+            'close': close_time,
+            'duration': duration,
+            'cost': cost
+        }
+        attractions.append(attraction)
+    
+    return attractions
+
+# Create enhanced datasets
+def create_enhanced_datasets():
+    """Create larger datasets for comprehensive testing"""
+    
+    # Hanoi - 20 attractions
+    hanoi_attractions = generate_attractions_dataset("Hanoi", 20, grid_size=4.0)
+    
+    # Da Nang - 15 attractions  
+    danang_attractions = generate_attractions_dataset("Da Nang", 15, grid_size=3.5)
+    
+    # Ho Chi Minh City - 25 attractions (new dataset)
+    hcmc_attractions = generate_attractions_dataset("HCMC", 25, grid_size=5.0)
+    
+    return hanoi_attractions, danang_attractions, hcmc_attractions
+
+# Convert to DataFrame
+def make_df(attractions):
+    rows = []
+    for a in attractions:
+        oh, om = map(int, a['open'].split(':'))
+        ch, cm = map(int, a['close'].split(':'))
+        open_min = (oh - 9) * 60 + om
+        close_min = (ch - 9) * 60 + cm
+        
+        rows.append({
+            'id': a['id'], 
+            'name': a['name'], 
+            'x': a['coord'][0], 
+            'y': a['coord'][1],
+            'open_min': open_min, 
+            'close_min': close_min, 
+            'duration': a['duration'], 
+            'cost': a['cost']
+        })
+    return pd.DataFrame(rows)
+
+
+def save_instance(path, inst, matrices=True, meta=None):
+    """Write a TRPInstance to `path` in the binary instance format.
+
+    matrices=False leaves out the distance / travel-time matrices (they are
+    rebuilt from the coordinates on load), which keeps the file O(n); only
+    instances with Euclidean matrices can be saved that way.
+    `meta` is any JSON-serialisable dict (city, budget, ...) stored in the
+    header and returned by instance_meta.
+    """
+    if not matrices and not inst.euclidean:
+        raise ValueError("Non-Euclidean travel matrices cannot be rebuilt on load; "
+                         "save them with matrices=True")
+    try:
+        ids = np.asarray(inst.ids, dtype=np.int64)
+    except (TypeError, ValueError):
+        raise ValueError("The binary instance format needs integer attraction ids") from None
+    arrays = {'ids': ids}
+    fields = _NODE_FIELDS + (_MATRIX_FIELDS if matrices else ())
+    arrays.update((name, getattr(inst, name)) for name in fields)
+    header = {
+        'n': inst.n,
+        'hotel': [float(c) for c in inst.hotel],
+        'minutes_per_unit': inst.minutes_per_unit,
+        'euclidean': inst.euclidean,
+        'time_slots': inst.time_slots,
+        'meta': meta or {}
+    }
+    return write_container(path, INSTANCE_MAGIC, INSTANCE_VERSION, header, arrays)
+
+
+def write_container(path, magic, version, header, arrays):
+    """Write `header` (a JSON-serialisable dict) and named arrays in the
+    binary container format shared by instances and solver checkpoints.
+
+    The file is written next to `path` and renamed over it, so a reader (or
+    a process killed mid-write) never sees a partial file.
+    """
+    arrays = {name: np.ascontiguousarray(arr, dtype=np.asarray(arr).dtype.newbyteorder('<'))
+              for name, arr in arrays.items()}
+
+    # Lay the arrays out after the header; offsets are relative to the
+    # aligned start of the data section
+    layout = {}
+    offset = 0
+    for name, arr in arrays.items():
+        layout[name] = {'dtype': arr.dtype.str, 'shape': list(arr.shape), 'offset': offset}
+        offset += -(-arr.nbytes // _ALIGN) * _ALIGN
+    header = json.dumps(dict(header, arrays=layout)).encode()
+
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(_PREAMBLE.pack(magic, version, len(header)))
+        f.write(header)
+        start = _data_start(len(header))
+        for name, arr in arrays.items():
+            f.write(b'\0' * (start + layout[name]['offset'] - f.tell()))
+            arr.tofile(f)
+        f.write(b'\0' * (start + offset - f.tell()))
+    os.replace(tmp, path)
+    return path
+
+
+def _data_start(header_len):
+    end = _PREAMBLE.size + header_len
+    return -(-end // _ALIGN) * _ALIGN
+
+
+def _read_header(path, magic=INSTANCE_MAGIC, version=INSTANCE_VERSION, kind='TRP instance'):
+    with open(path, 'rb') as f:
+        found, found_version, header_len = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if found != magic:
+            raise ValueError(f"{path} is not a {kind} file")
+        if found_version != version:
+            raise ValueError(f"Unsupported {kind} format version {found_version} "
+                             f"(expected {version})")
+        header = json.loads(f.read(header_len))
+    header['version'] = found_version
+    header['data_start'] = _data_start(header_len)
+    return header
+
+
+def read_container(path, magic, version, kind, mmap=True):
+    """Header and arrays of a file written by write_container.
+
+    With mmap=True every array is a read-only np.memmap over the file;
+    with mmap=False the arrays are read into memory.
+    """
+    header = _read_header(path, magic, version, kind)
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        dtype = np.dtype(spec['dtype'])
+        shape = tuple(spec['shape'])
+        offset = header['data_start'] + spec['offset']
+        if mmap and dtype.itemsize * int(np.prod(shape)) > 0:
+            arrays[name] = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape)
+        else:
+            arrays[name] = np.fromfile(path, dtype=dtype, count=int(np.prod(shape)),
+                                       offset=offset).reshape(shape)
+    return header, arrays
+
+
+def instance_meta(path):
+    """Header of an instance file: n, hotel, version, stored arrays and meta"""
+    return _read_header(path)
+
+
+def load_instance(path, mmap=True):
+    """Load a TRPInstance written by save_instance.
+
+    With mmap=True (the default) every array is a read-only np.memmap over
+    the file; with mmap=False the arrays are read into memory. Files saved
+    without matrices get them rebuilt from the coordinates.
+    """
+    header, arrays = read_container(path, INSTANCE_MAGIC, INSTANCE_VERSION,
+                                    'TRP instance', mmap)
+
+    ids = arrays.pop('ids').tolist()
+    hotel = tuple(header['hotel'])
+    minutes_per_unit = header.get('minutes_per_unit', MINUTES_PER_UNIT)
+    if all(name in arrays for name in _MATRIX_FIELDS):
+        return TRPInstance.from_arrays(ids, arrays, hotel, minutes_per_unit,
+                                       euclidean=header.get('euclidean', True),
+                                       time_slots=header.get('time_slots'))
+
+    df = pd.DataFrame({
+        'id': ids,
+        'x': arrays['xy'][1:, 0],
+        'y': arrays['xy'][1:, 1],
+        'open_min': arrays['open_min'][1:],
+        'close_min': arrays['close_min'][1:],
+        'duration': arrays['dur'][1:],
+        'cost': arrays['cost'][1:]
+    })
+    slots = header.get('time_slots')
+    travel = TimeDependentTravel(*slots) if slots is not None else None
+    return TRPInstance(df, hotel, minutes_per_unit, travel)
+
+
+def _minutes(hour, half):
+    """Minutes from 09:00 of hour:00 or hour:30"""
+    return (hour - 9) * 60 + 30 * half
+
+
+# Per-type lookup tables for the vectorized generator
+_TYPE_NAMES = list(ATTRACTION_TYPES)
+_EARLY = np.array([t['open_early'] for t in ATTRACTION_TYPES.values()])
+_ALL_DAY = np.array([name in ALL_DAY_TYPES for name in _TYPE_NAMES])
+_BASE_DURATION = np.array([t['base_duration'] for t in ATTRACTION_TYPES.values()])
+_BASE_COST = np.array([t['base_cost'] for t in ATTRACTION_TYPES.values()])
+
+
+def generate_columns(num_attractions, grid_size=3.0, rng=None, start_id=1):
+    """Columnar, vectorized counterpart of generate_attractions_dataset.
+
+    Returns {column: array} (see COLUMNS) with times already in minutes from
+    09:00. Types, opening hours, durations and costs follow the same
+    distributions as the dict generator, but the draws come from a NumPy
+    Generator (`rng`, a seed or None), so individual values differ.
+    """
+    rng = np.random.default_rng(rng)
+    n = int(num_attractions)
+    half = grid_size / 2
+
+    x = rng.uniform(-half, half, n)
+    y = rng.uniform(-half, half, n)
+    code = rng.integers(0, len(_TYPE_NAMES), n)
+    early = _EARLY[code]
+
+    # Early types open 06-08 and close 17-19, the others 08-10 and 19-22
+    open_hour = np.where(early, 6, 8) + rng.integers(0, 3, n)
+    close_hour = np.where(early, 17 + rng.integers(0, 3, n), 19 + rng.integers(0, 4, n))
+    open_min = _minutes(open_hour, rng.integers(0, 2, n))
+    close_min = _minutes(close_hour, rng.integers(0, 2, n))
+
+    # Some attractions are 24/7 (parks, beaches): 00:00 - 23:59
+    all_day = _ALL_DAY[code] & (rng.random(n) < 0.3)
+    open_min[all_day] = -9 * 60
+    close_min[all_day] = 14 * 60 + 59
+
+    duration = _BASE_DURATION[code] + rng.integers(-15, 21, n)
+    cost = np.maximum(0, _BASE_COST[code] + rng.integers(-5000, 10001, n))
+
+    cols = {
+        'id': np.arange(start_id, start_id + n),
+        'x': x,
+        'y': y,
+        'open_min': open_min,
+        'close_min': close_min,
+        'duration': duration,
+        'cost': cost,
+        'type': code,
+    }
+    return {name: cols[name].astype(dtype, copy=False) for name, dtype in COLUMNS.items()}
+
+
+def iter_chunks(num_attractions, grid_size=3.0, seed=None, chunk_size=CHUNK_SIZE):
+    """Yield the columns of a dataset `chunk_size` attractions at a time.
+
+    All chunks draw from one Generator, so a (seed, chunk_size) pair always
+    yields the same dataset.
+    """
+    rng = np.random.default_rng(seed)
+    for start in range(0, num_attractions, chunk_size):
+        size = min(chunk_size, num_attractions - start)
+        yield generate_columns(size, grid_size, rng, start_id=start + 1)
+
+
+def columns_to_df(cols, city_name):
+    """DataFrame with the same columns as make_df (plus the type name)"""
+    types = np.asarray(_TYPE_NAMES, dtype=object)[cols['type']]
+    ids = cols['id']
+    df = pd.DataFrame({
+        'id': ids,
+        'name': [f"{city_name} {t} {i}" for t, i in zip(types, ids.tolist())],
+        'x': cols['x'],
+        'y': cols['y'],
+        'open_min': cols['open_min'].astype(np.int64),
+        'close_min': cols['close_min'].astype(np.int64),
+        'duration': cols['duration'].astype(np.int64),
+        'cost': cols['cost'].astype(np.int64),
+    })
+    df['type'] = types
+    return df
+
+
+def write_dataset(path, num_attractions, grid_size=3.0, seed=None, chunk_size=CHUNK_SIZE):
+    """Generate a dataset and stream it to `path` (.npz or .parquet).
+
+    Only one chunk is held in memory. For .npz every column is first spooled
+    to a raw temporary file next to `path`, then copied into the archive.
+    Parquet needs pyarrow and writes one row group per chunk. Returns `path`.
+    """
+    chunks = iter_chunks(num_attractions, grid_size, seed, chunk_size)
+    if path.endswith('.parquet'):
+        _write_parquet(path, chunks)
+    elif path.endswith('.npz'):
+        _write_npz(path, chunks, num_attractions)
+    else:
+        raise ValueError(f"Unsupported dataset format: {path}")
+    return path
+
+
+def _write_npz(path, chunks, n):
+    spool = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        files = {name: open(os.path.join(spool, name), 'wb') for name in COLUMNS}
+        try:
+            for cols in chunks:
+                for name, f in files.items():
+                    cols[name].tofile(f)
+        finally:
+            for f in files.values():
+                f.close()
+
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED, allowZip64=True) as zf:
+            for name, dtype in COLUMNS.items():
+                header = {'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                          'fortran_order': False, 'shape': (n,)}
+                with zf.open(name + '.npy', 'w', force_zip64=True) as out, \
+                        open(os.path.join(spool, name), 'rb') as src:
+                    np.lib.format.write_array_header_1_0(out, header)
+                    shutil.copyfileobj(src, out, 1 << 20)
+    finally:
+        shutil.rmtree(spool, ignore_errors=True)
+
+
+def _write_parquet(path, chunks):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Writing Parquet datasets requires pyarrow") from None
+    schema = pa.schema([(name, pa.from_numpy_dtype(dtype)) for name, dtype in COLUMNS.items()])
+    with pq.ParquetWriter(path, schema) as writer:
+        for cols in chunks:
+            writer.write_table(pa.table(cols, schema=schema))
+
+
+def read_dataset(path):
+    """Columns of a dataset written by write_dataset"""
+    if path.endswith('.parquet'):
+        return {name: col.to_numpy() for name, col in pd.read_parquet(path).items()}
+    with np.load(path) as data:
+        return {name: data[name] for name in COLUMNS}
@@ -0,0 +1,221 @@
+# Incremental (delta) route evaluation for local moves
+#
+# A move replaces one contiguous block of the route and leaves the prefix
+# before it and the suffix after it untouched. The prefix is read from cached
+# arrays, the new block is simulated (O(k) for a block of k nodes), and the
+# suffix is shifted in O(1) using its waiting time and time-window slack.
+# When the shift would make a suffix node late (or on time again), the suffix
+# is simulated node by node only until the remaining shift can be applied in
+# O(1) again.
+
+from trp_instance import LATE_PENALTY_MIN
+
+INF = float('inf')
+
+
+class DeltaEvaluator:
+    """Cached schedule of one route that scores swap / insert / remove /
+    2-opt / relocate moves without re-simulating the whole route.
+
+    Call `load(route)` once (O(n)); the move methods then return the fitness
+    the modified route would have, without changing the loaded route.
+    """
+
+    def __init__(self, inst, budget, route=None):
+        if inst.time_slots is not None:
+            raise ValueError("DeltaEvaluator needs static travel times; "
+                             "time-dependent instances are scored by TRPInstance.evaluate")
+        self.inst = inst
+        self.budget = budget
+        self._dist = inst.dist.tolist() if inst.n <= 2000 else inst.dist
+        self._travel = inst.travel.tolist() if inst.n <= 2000 else inst.travel
+        self.full_evaluations = 0
+        self.delta_evaluations = 0
+        if route is not None:
+            self.load(route)
+
+    def load(self, route):
+        """Simulate the route once and cache prefix / suffix arrays"""
+        inst = self.inst
+        open_, close, dur, cost = inst._open, inst._close, inst._dur, inst._cost
+        dist, travel = self._dist, self._travel
+        route = list(route)
+        m = len(route)
+        self.route = route
+
+        # Prefix state before position k: clock, distance, violations, cost
+        T = [0.0] * (m + 1)
+        D = [0.0] * (m + 1)
+        V = [0] * (m + 1)
+        C = [0] * (m + 1)
+        arrival = [0.0] * m
+        wait = [0.0] * m
+        late = [False] * m
+        start = [0.0] * m
+
+        t = 0.0
+        d = 0.0
+        prev = 0
+        for k, node in enumerate(route):
+            d += dist[prev][node]
+            t += travel[prev][node]
+            arrival[k] = t
+            if t < open_[node]:
+                wait[k] = open_[node] - t
+                t = open_[node]
+            start[k] = t
+            V[k + 1] = V[k]
+            if t > close[node]:
+                late[k] = True
+                V[k + 1] += 1
+                t += LATE_PENALTY_MIN
+            t += dur[node]
+            C[k + 1] = C[k] + cost[node]
+            T[k + 1] = t
+            D[k + 1] = d
+            prev = node
+
+        self.end_dist = d + dist[prev][0]
+        self.end_time = t + travel[prev][0]
+
+        # Suffix from position k: total wait, slack before a new late arrival,
+        # how far the clock can be pulled earlier, and the margin of late nodes
+        W = [0.0] * (m + 1)
+        S = [INF] * (m + 1)
+        E = [INF] * (m + 1)
+        L = [INF] * (m + 1)
+        for k in range(m - 1, -1, -1):
+            node = route[k]
+            W[k] = wait[k] + W[k + 1]
+            if late[k]:
+                S[k] = wait[k] + S[k + 1]
+                L[k] = min(arrival[k] - close[node], L[k + 1])
+            else:
+                S[k] = min(close[node] - start[k] + wait[k], wait[k] + S[k + 1])
+                L[k] = L[k + 1]
+            early = 0.0 if wait[k] > 0 else arrival[k] - open_[node]
+            E[k] = min(early, E[k + 1])
+
+        self.T, self.D, self.V, self.C = T, D, V, C
+        self.arrival = arrival
+        self.W, self.S, self.E, self.L = W, S, E, L
+        self.fitness = self._fitness(self.end_dist, self.end_time, V[m], C[m])
+        return self.fitness
+
+    def _fitness(self, total_dist, total_time, time_violations, total_cost):
+        """Same penalty formula as TRPInstance.evaluate"""
+        fitness_score = total_dist + total_time / 60.0
+        over_budget = total_cost - self.budget
+        if time_violations or over_budget > 0:
+            fitness_score += 5000
+            fitness_score += time_violations * 1000
+            fitness_score += max(0, over_budget) * 0.01
+        return fitness_score
+
+    def replace(self, i, j, block):
+        """Fitness after replacing route[i:j] with `block` (O(len(block)),
+        plus any suffix nodes whose time-window status changes)"""
+        inst = self.inst
+        open_, close, dur, cost = inst._open, inst._close, inst._dur, inst._cost
+        dist, travel = self._dist, self._travel
+        route = self.route
+        m = len(route)
+        arrival, S, W, E, L = self.arrival, self.S, self.W, self.E, self.L
+
+        t = self.T[i]
+        d = self.D[i]
+        viol = self.V[i]
+        total_cost = self.C[i]
+        prev = route[i - 1] if i > 0 else 0
+        for node in block:
+            d += dist[prev][node]
+            t += travel[prev][node]
+            if t < open_[node]:
+                t = open_[node]
+            if t > close[node]:
+                viol += 1
+                t += LATE_PENALTY_MIN
+            t += dur[node]
+            total_cost += cost[node]
+            prev = node
+
+        walked = False
+        while j < m:
+            # Shift the untouched suffix route[j:] by the change in arrival time
+            nxt = route[j]
+            delta = t + travel[prev][nxt] - arrival[j]
+            if delta > 0:
+                ok = delta <= S[j]
+                shift = max(0.0, delta - W[j])
+            elif delta < 0:
+                ok = -delta < L[j]
+                shift = max(delta, -E[j])
+            else:
+                ok, shift = True, 0.0
+            if ok:
+                self._count(walked)
+                d += dist[prev][nxt] + (self.end_dist - self.D[j + 1])
+                viol += self.V[m] - self.V[j]
+                total_cost += self.C[m] - self.C[j]
+                return self._fitness(d, self.end_time + shift, viol, total_cost)
+
+            # A suffix node changes time-window status: simulate it and retry
+            walked = True
+            d += dist[prev][nxt]
+            t += travel[prev][nxt]
+            if t < open_[nxt]:
+                t = open_[nxt]
+            if t > close[nxt]:
+                viol += 1
+                t += LATE_PENALTY_MIN
+            t += dur[nxt]
+            total_cost += cost[nxt]
+            prev = nxt
+            j += 1
+
+        self._count(walked)
+        return self._fitness(d + dist[prev][0], t + travel[prev][0],
+                             viol, total_cost)
+
+    def _count(self, walked):
+        """Moves that had to walk part of the suffix count as full evaluations"""
+        if walked:
+            self.full_evaluations += 1
+        else:
+            self.delta_evaluations += 1
+
+    # Moves -----------------------------------------------------------------
+
+    def swap(self, a, b):
+        """Exchange the nodes at positions a and b"""
+        if a > b:
+            a, b = b, a
+        if a == b:
+            return self.fitness
+        block = self.route[a:b + 1]
+        block[0], block[-1] = block[-1], block[0]
+        return self.replace(a, b + 1, block)
+
+    def insert(self, node, pos):
+        """Insert a new node before position pos (pos == len(route) appends)"""
+        return self.replace(pos, pos, (node,))
+
+    def remove(self, pos):
+        """Drop the node at position pos"""
+        return self.replace(pos, pos + 1, ())
+
+    def two_opt(self, a, b):
+        """Reverse the segment route[a..b]"""
+        if a > b:
+            a, b = b, a
+        return self.replace(a, b + 1, self.route[b:a - 1 if a > 0 else None:-1])
+
+    def relocate(self, a, length, pos):
+        """Move route[a:a+length] so that it starts before position pos
+        of the remaining route (Or-opt)"""
+        seg = self.route[a:a + length]
+        if pos <= a:
+            return self.replace(pos, a + length, seg + self.route[pos:a])
+        # pos counts positions in the route without the segment
+        end = pos + length
+        return self.replace(a, end, self.route[a + length:end] + seg)
@@ -0,0 +1,136 @@
+# Diversity-driven mutation rate and partial restarts for the GA
+#
+# Each generation a small random sample of the population is measured:
+#
+#   entropy   normalised Shannon entropy of the edge frequencies in the
+#             sample (hotel edges included): 1 when no edge is shared,
+#             0 when every sampled route is the same tour
+#   hamming   mean share of positions where a sampled route differs from
+#             the best route
+#
+# Entropy drives the control. Below `low` the mutation rate rises linearly
+# from the configured rate to `max_mutation`. A partial restart overwrites
+# `restart_fraction` of the non-elite offspring with fresh nearest-neighbour
+# and cost-based constructions. It happens when entropy is below `critical`
+# and the best route has not improved for `cooldown` generations, or when
+# the patience rule would otherwise stop the run.
+# Restarts are at least `cooldown` generations apart and at most
+# `max_restarts` per run, so patience still ends a run that keeps stalling.
+#
+#   ga = EnhancedTRP_GA(df, 'Hanoi', 400000, diversity=True)
+#   ga = EnhancedTRP_GA(df, 'Hanoi', 400000,
+#                       diversity=AdaptiveDiversity(low=0.4, max_restarts=3))
+
+import copy
+import math
+
+import numpy as np
+
+from trp_history import hamming_diversity
+
+
+def edge_entropy(genes):
+    """Normalised edge-frequency entropy of a set of routes (rows of node
+    indices; the hotel 0 closes every route)"""
+    k, m = genes.shape
+    if k < 2 or m == 0:
+        return 0.0
+    n1 = int(genes.max()) + 1
+    routes = genes.astype(np.int64)
+    prev = np.concatenate((np.zeros((k, 1), dtype=np.int64), routes), axis=1)
+    nxt = np.concatenate((routes, np.zeros((k, 1), dtype=np.int64)), axis=1)
+    _, counts = np.unique((prev * n1 + nxt).ravel(), return_counts=True)
+    p = counts / counts.sum()
+    h = float(-(p * np.log(p)).sum())
+    # Identical routes: m + 1 distinct edges; all different: k * (m + 1)
+    h_min = math.log(m + 1)
+    h_max = math.log(k * (m + 1))
+    return min(1.0, max(0.0, (h - h_min) / (h_max - h_min)))
+
+
+class AdaptiveDiversity:
+    """Diversity measurement and the mutation / restart policy built on it"""
+
+    def __init__(self, low=0.3, critical=0.1, max_mutation=0.5,
+                 restart_fraction=0.5, cooldown=10, max_restarts=5, sample=16):
+        if not 0.0 <= critical <= low <= 1.0:
+            raise ValueError("Expected 0 <= critical <= low <= 1")
+        if not 0.0 < restart_fraction <= 1.0:
+            raise ValueError("restart_fraction must be in (0, 1]")
+        self.low = low
+        self.critical = critical
+        self.max_mutation = max_mutation
+        self.restart_fraction = restart_fraction
+        self.cooldown = cooldown
+        self.max_restarts = max_restarts
+        self.sample = sample
+        self.reset()
+
+    def reset(self):
+        """Forget the previous run"""
+        self.entropy = 1.0
+        self.hamming = 1.0
+        self.restarts = 0
+        self.restart_generations = []
+        self._since_restart = self.cooldown
+
+    def measure(self, genes, best, np_rng):
+        """Entropy and Hamming distance on a sample of the population"""
+        size = len(genes)
+        rows = (np_rng.choice(size, self.sample, replace=False)
+                if self.sample < size else slice(None))
+        sample = genes[rows]
+        self.entropy = edge_entropy(sample)
+        self.hamming = hamming_diversity(sample, best)
+        self._since_restart += 1
+        return self.entropy
+
+    def mutation_rate(self, base):
+        """`base`, raised linearly towards max_mutation as entropy drops below `low`"""
+        if self.entropy >= self.low or self.max_mutation <= base:
+            return base
+        pressure = (self.low - self.entropy) / self.low if self.low > 0 else 1.0
+        return base + (self.max_mutation - base) * pressure
+
+    def wants_restart(self, stale, stalled):
+        """Restart instead of a patience stop, or when entropy is below
+        `critical` and the best has not improved for `cooldown` generations"""
+        if self.restarts >= self.max_restarts or self._since_restart < self.cooldown:
+            return False
+        return stalled or (self.entropy < self.critical and stale >= self.cooldown)
+
+    def restarted(self, generation):
+        self.restarts += 1
+        self.restart_generations.append(generation)
+        self._since_restart = 0
+
+    def state(self):
+        """Run state for a checkpoint"""
+        return dict(self.stats(), since_restart=self._since_restart)
+
+    def restore(self, state):
+        self.entropy = state['entropy']
+        self.hamming = state['hamming']
+        self.restarts = state['restarts']
+        self.restart_generations = list(state['restart_generations'])
+        self._since_restart = state['since_restart']
+
+    def stats(self):
+        return {
+            'entropy': self.entropy,
+            'hamming': self.hamming,
+            'restarts': self.restarts,
+            'restart_generations': list(self.restart_generations)
+        }
+
+
+def make_diversity(diversity):
+    """Resolve a GA's `diversity=` argument"""
+    if diversity is None or diversity is False:
+        return None
+    if diversity is True:
+        return AdaptiveDiversity()
+    if isinstance(diversity, AdaptiveDiversity):
+        # A copy per GA: island models pass the same settings to every island
+        return copy.copy(diversity)
+    raise ValueError(f"Unknown diversity setting: {diversity!r}")
@@ -0,0 +1,315 @@
+# Parallel experiment runner: datasets x algorithms x seeds x hyperparameters
+#
+# Every grid cell is one independent solver run. Cells are scheduled across a
+# process pool; each worker builds the TRPInstance of a dataset once and reuses
+# it for all the cells it receives. Finished cells are appended to a JSONL file
+# as they complete, so an interrupted grid can be resumed and partial results
+# can be inspected while the rest is still running. With `checkpoint_dir`,
+# GA and ALNS cells also checkpoint their own progress there (see
+# trp_checkpoint), so a resumed grid continues interrupted cells mid-run
+# instead of restarting them. A cell whose solver raises is recorded as an
+# error row ({"Error": ...} instead of the result columns) and the grid
+# carries on; resuming runs failed cells again unless retry_failed=False.
+#
+#   datasets = {'Hanoi': (hanoi_df, 400000), 'Da Nang': (danang_df, 350000)}
+#   cells = make_grid(datasets, ['GA', 'Greedy', 'Random', 'ALNS'],
+#                     seeds=range(30),
+#                     params={'GA': {'population_size': [60, 80]},
+#                             'ALNS': {'iters': [500]}})
+#   results = run_grid(datasets, cells, 'experiment_results.jsonl')
+#   print(summarize(results))
+
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from trp_alns import ALNS_TRP
+from trp_baselines import GreedyTRP, RandomTRP
+from trp_ga import EnhancedTRP_GA
+from trp_instance import TRPInstance
+from trp_islands import IslandTRP_GA
+from trp_orienteering import OrienteeringALNS, OrienteeringGA
+
+
+def _ga(inst, city, budget, seed, params):
+    return EnhancedTRP_GA(None, city, budget, hotel=inst.hotel, seed=seed,
+                          instance=inst, **params)
+
+
+def _greedy(inst, city, budget, seed, params):
+    return GreedyTRP(None, city, budget, inst.hotel, instance=inst, **params)
+
+
+def _random(inst, city, budget, seed, params):
+    return RandomTRP(None, city, budget, inst.hotel, instance=inst, seed=seed,
+                     **params)
+
+
+def _alns(inst, city, budget, seed, params):
+    return ALNS_TRP(None, city, budget, inst.hotel, rnd_seed=seed,
+                    instance=inst, **params)
+
+
+def _islands(inst, city, budget, seed, params):
+    # Pool workers are daemonic and cannot start island processes of their own
+    params = {'processes': False, **params}
+    return IslandTRP_GA(None, city, budget, inst.hotel, seed=seed,
+                        instance=inst, **params)
+
+
+def _op_ga(inst, city, budget, seed, params):
+    return OrienteeringGA(None, city, budget, inst.hotel, seed=seed, instance=inst,
+                          **params)
+
+
+def _op_alns(inst, city, budget, seed, params):
+    return OrienteeringALNS(None, city, budget, inst.hotel, rnd_seed=seed,
+                            instance=inst, **params)
+
+
+# name -> factory(instance, city, budget, seed, params) returning a solver
+# with a run() method
+ALGORITHMS = {
+    'GA': _ga,
+    'Greedy': _greedy,
+    'Random': _random,
+    'ALNS': _alns,
+    'IslandGA': _islands,
+    'OP-GA': _op_ga,
+    'OP-ALNS': _op_alns
+}
+
+# Algorithms whose solvers accept checkpoint= / resume_from=
+CHECKPOINTING = ('GA', 'ALNS')
+
+
+def make_grid(datasets, algorithms, seeds=(42,), params=None):
+    """Expand the grid into a list of cells.
+
+    `params` maps an algorithm name to {hyperparameter: [values, ...]}; every
+    combination of values becomes its own cell. Algorithms without an entry
+    run with their defaults.
+    """
+    params = params or {}
+    cells = []
+    for city in datasets:
+        for alg in algorithms:
+            if alg not in ALGORITHMS:
+                raise ValueError(f"Unknown algorithm: {alg}")
+            space = params.get(alg, {})
+            names = sorted(space)
+            for values in itertools.product(*(space[k] for k in names)):
+                for seed in seeds:
+                    cells.append({
+                        'city': city,
+                        'algorithm': alg,
+                        'seed': int(seed),
+                        'params': dict(zip(names, values))
+                    })
+    return cells
+
+
+def cell_key(cell):
+    """Identity of a cell, used to skip cells already on disk"""
+    return (cell['city'], cell['algorithm'], cell['seed'],
+            json.dumps(cell['params'], sort_keys=True))
+
+
+def _row(cell, result):
+    """Flatten a solver result into the columns of the comparison CSV"""
+    details = result['best_details'] or {}
+    route = result['best_route'] or []
+    violations = details.get('violations', {})
+    visited = len(route)
+    return {
+        'City': cell['city'],
+        'Algorithm': cell['algorithm'],
+        'Seed': cell['seed'],
+        'Params': json.dumps(cell['params'], sort_keys=True),
+        'Fitness_Score': float(details.get('fitness', float('inf'))),
+        'Total_Distance': float(details.get('total_dist', 0)),
+        'Total_Cost': float(details.get('total_cost', 0)),
+        'Total_Time_Hours': float(details.get('total_time', 0)) / 60,
+        'Execution_Time': float(result['execution_time']),
+        'Attractions_Visited': visited,
+        'Feasible': bool(details.get('feasible', False)),
+        'Distance_Efficiency': float(details.get('total_dist', 0)) / max(visited, 1),
+        'Cost_Efficiency': float(details.get('total_cost', 0)) / max(visited, 1),
+        'Time_Violations': int(violations.get('time', 0)),
+        'Budget_Violation': float(violations.get('budget', 0)),
+        'Route': [int(a) for a in route]
+    }
+
+
+def _error_row(cell, exc):
+    """Row recording a cell whose run raised `exc`"""
+    return {
+        'City': cell['city'],
+        'Algorithm': cell['algorithm'],
+        'Seed': cell['seed'],
+        'Params': json.dumps(cell['params'], sort_keys=True),
+        'Error': f"{type(exc).__name__}: {exc}"
+    }
+
+
+# Per-process state: datasets sent once by the pool initializer, instances
+# built lazily on first use
+_DATASETS = {}
+_INSTANCES = {}
+
+
+def _init_worker(datasets, hotel, checkpoint_dir=None):
+    _DATASETS.clear()
+    _INSTANCES.clear()
+    _DATASETS.update(datasets)
+    _DATASETS['__hotel__'] = hotel
+    _DATASETS['__checkpoints__'] = checkpoint_dir
+
+
+def _instance(city):
+    inst = _INSTANCES.get(city)
+    if inst is None:
+        df, _ = _DATASETS[city]
+        inst = _INSTANCES[city] = TRPInstance(df, _DATASETS['__hotel__'])
+    return inst
+
+
+def _checkpoint_path(cell):
+    """Checkpoint file of a cell in the grid's checkpoint directory, or None"""
+    directory = _DATASETS.get('__checkpoints__')
+    if directory is None or cell['algorithm'] not in CHECKPOINTING:
+        return None
+    digest = hashlib.sha1(repr(cell_key(cell)).encode()).hexdigest()[:16]
+    return os.path.join(directory, f"{cell['algorithm']}-{digest}.trpc")
+
+
+def _run_cell(cell):
+    """Worker entry point: run one cell and return its result row, or its
+    error row if the solver raised (a checkpoint is then kept for a retry)"""
+    try:
+        _, budget = _DATASETS[cell['city']]
+        params = cell['params']
+        checkpoint = _checkpoint_path(cell)
+        if checkpoint is not None:
+            params = dict(params, checkpoint=checkpoint,
+                          resume_from=checkpoint if os.path.exists(checkpoint) else None)
+        solver = ALGORITHMS[cell['algorithm']](_instance(cell['city']), cell['city'],
+                                               budget, cell['seed'], params)
+        row = _row(cell, solver.run())
+    except Exception as exc:
+        return _error_row(cell, exc)
+    if checkpoint is not None and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    return row
+
+
+def load_results(path, errors=False):
+    """Read a results file written by run_grid into a DataFrame; error rows
+    of failed cells are left out unless errors=True"""
+    rows = []
+    if os.path.exists(path):
+        with open(path) as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    if not errors:
+        rows = [row for row in rows if 'Error' not in row]
+    return pd.DataFrame(rows)
+
+
+def _done_keys(path, failed=True):
+    """Keys of the cells in `path`; failed=False leaves out cells that only
+    have error rows"""
+    keys = set()
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    if failed or 'Error' not in row:
+                        keys.add((row['City'], row['Algorithm'], row['Seed'], row['Params']))
+    return keys
+
+
+def run_grid(datasets, cells, out_path='experiment_results.jsonl', workers=None,
+             hotel=(0,0), resume=True, verbose=True, checkpoint_dir=None,
+             retry_failed=True):
+    """Run all cells and stream one JSON line per finished cell to `out_path`.
+
+    `datasets` maps city -> (df, budget) as in the experiment scripts.
+    workers=None uses one process per core; workers=0 runs the cells in this
+    process (handy for debugging). With resume=True, cells already present in
+    `out_path` are skipped; otherwise the file is overwritten. Returns every
+    result row in `out_path` as a DataFrame.
+    A cell that raises is written as an error row and the grid continues.
+    On resume, failed cells run again; retry_failed=False skips them too.
+    checkpoint_dir: directory for per-cell GA / ALNS checkpoints; a cell
+    that finds its checkpoint there resumes from it, and the file is
+    removed once the cell has finished.
+    """
+    if checkpoint_dir is not None:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+    done = _done_keys(out_path, failed=not retry_failed) if resume else set()
+    todo = [c for c in cells if cell_key(c) not in done]
+    total = len(todo)
+    if verbose:
+        print(f"🧪 {len(cells)} cells, {len(cells) - total} already done, "
+              f"{total} to run")
+
+    start = time.time()
+    failures = 0
+    mode = 'a' if resume else 'w'
+    with open(out_path, mode) as out:
+        def record(i, row):
+            nonlocal failures
+            out.write(json.dumps(row) + '\n')
+            out.flush()
+            failures += 'Error' in row
+            if verbose:
+                elapsed = time.time() - start
+                eta = elapsed / i * (total - i)
+                if 'Error' in row:
+                    outcome = f"FAILED {row['Error']}"
+                else:
+                    outcome = (f"fitness={row['Fitness_Score']:.1f} | "
+                               f"{row['Execution_Time']:.2f}s")
+                print(f"   [{i}/{total}] {row['City']} | {row['Algorithm']} | "
+                      f"seed={row['Seed']} | {outcome} | ETA {eta:.0f}s")
+
+        if workers == 0:
+            _init_worker(datasets, hotel, checkpoint_dir)
+            for i, cell in enumerate(todo, 1):
+                record(i, _run_cell(cell))
+        elif todo:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(datasets, hotel, checkpoint_dir)) as pool:
+                futures = {pool.submit(_run_cell, cell): cell for cell in todo}
+                for i, fut in enumerate(as_completed(futures), 1):
+                    # Solver errors come back as rows; this catches the rest
+                    # (a worker that died, a result that did not pickle)
+                    try:
+                        row = fut.result()
+                    except Exception as exc:
+                        row = _error_row(futures[fut], exc)
+                    record(i, row)
+
+    if verbose:
+        print(f"✅ Grid finished in {time.time() - start:.1f}s -> {out_path}")
+        if failures:
+            print(f"⚠️  {failures} cells failed (error rows in {out_path})")
+    return load_results(out_path)
+
+
+def summarize(results):
+    """Per city/algorithm statistics over seeds"""
+    return results.groupby(['City', 'Algorithm']).agg(
+        Runs=('Fitness_Score', 'size'),
+        Fitness_Mean=('Fitness_Score', 'mean'),
+        Fitness_Std=('Fitness_Score', 'std'),
+        Fitness_Min=('Fitness_Score', 'min'),
+        Feasible_Rate=('Feasible', 'mean'),
+        Time_Mean=('Execution_Time', 'mean')
+    ).round(3)
@@ -0,0 +1,540 @@
+# Enhanced Genetic Algorithm for tourist route planning (TRPTW)
+
+import random
+import time
+
+import numpy as np
+
+from trp_budget import SearchBudget
+from trp_checkpoint import (check_compatible, history_arrays, load_checkpoint,
+                            random_state, restore_history, save_checkpoint,
+                            set_random_state)
+from trp_delta import DeltaEvaluator
+from trp_diversity import make_diversity
+from trp_history import ConvergenceHistory, hamming_diversity
+from trp_instance import TRPInstance
+from trp_instrument import make_instrument
+from trp_local_search import improve
+from trp_operators import (CROSSOVER_OPERATORS, crossover_batch,
+                           swap_mutation, swap_mutation_batch)
+
+
+class Population:
+    """GA population stored as one contiguous int array, double-buffered.
+
+    `genes` holds the current generation (one route of node indices per
+    row) and `next` receives the offspring; `swap()` flips the two buffers
+    so no per-individual lists are allocated between generations.
+    """
+
+    def __init__(self, size, n):
+        dtype = np.int16 if n < np.iinfo(np.int16).max else np.int32
+        self.size = size
+        self.genes = np.empty((size, n), dtype=dtype)
+        self.next = np.empty_like(self.genes)
+        self.spare = np.empty(n, dtype=dtype)  # scratch row for a surplus child
+
+    @classmethod
+    def from_routes(cls, routes, n):
+        pop = cls(len(routes), n)
+        pop.genes[:] = routes
+        return pop
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, i):
+        return self.genes[i]
+
+    def swap(self):
+        """Make the offspring buffer the current generation"""
+        self.genes, self.next = self.next, self.genes
+
+
+class EnhancedTRP_GA:
+    def __init__(self, df, city_name, budget, hotel=(0,0),
+                 population_size=100, generations=150,
+                 crossover_p=0.85, mutation_p=0.15, seed=42,
+                 instance=None, crossover='pmx', vectorized=False,
+                 memetic=False, ls_fraction=0.1, ls_time_ms=20, ls_max_moves=None,
+                 cache=None, patience=30, time_limit_ms=None,
+                 max_evaluations=None, on_incumbent=None, prune=True,
+                 instrument=None, history_every=1, history_ring=None,
+                 diversity=None, checkpoint=None, checkpoint_every=10,
+                 resume_from=None):
+        self.df = df
+        self.city_name = city_name
+        self.hotel = hotel
+        self.budget = budget
+        self.pop_size = population_size
+        self.generations = generations
+        self.cx_p = crossover_p
+        self.mut_p = mutation_p
+        self.patience = patience  # stop after this many generations without improvement
+        self.rng = random.Random(seed)
+
+        # Anytime limits: stop with the best-so-far route when either runs
+        # out; on_incumbent(dict) is called with every new best route
+        self.limits = SearchBudget(time_limit_ms, max_evaluations, on_incumbent)
+        if generations is None and patience is None and not self.limits.limited:
+            raise ValueError("generations=None needs patience, time_limit_ms or max_evaluations")
+
+        # Crossover operator ('pmx', 'ox' or 'erx'); vectorized=True breeds
+        # each generation with the batch operators and a NumPy generator
+        if crossover not in CROSSOVER_OPERATORS:
+            raise ValueError(f"Unknown crossover operator: {crossover}")
+        self.crossover_kind = crossover
+        self.crossover_op = CROSSOVER_OPERATORS[crossover]
+        self.vectorized = vectorized
+        self.np_rng = np.random.default_rng(seed)
+
+        # Shared distance/travel-time matrices; individuals are node indices
+        self.inst = instance if instance is not None else TRPInstance(df, hotel)
+        self.attraction_ids = self.inst.ids
+        self.nodes = self.inst.nodes()
+
+        # Time-window pre-filter: NN seeding, swap mutation and ERX avoid
+        # successors that are certain to arrive late (see trp_windows)
+        windows = self.inst.time_windows() if prune else None
+        self.windows = windows if windows is not None and windows.active else None
+
+        # Memetic mode: 2-opt / Or-opt on the elites and a fraction of the
+        # offspring each generation, within ls_time_ms of wall-clock time and
+        # at most ls_max_moves improving moves per route. ls_time_ms=None
+        # drops the clock, so the run is reproducible (and resumable from a
+        # checkpoint) independent of machine load
+        if ls_max_moves is not None and ls_max_moves < 1:
+            raise ValueError("ls_max_moves must be at least 1")
+        self.memetic = memetic
+        self.ls_fraction = ls_fraction
+        self.ls_time_ms = ls_time_ms
+        self.ls_max_moves = ls_max_moves
+        self.delta = DeltaEvaluator(self.inst, budget) if memetic else None
+        self._local_optima = set()
+
+        # Optional FitnessCache (may be shared with ALNS on the same instance)
+        self.cache = cache.bind(self.inst, budget) if cache is not None else None
+
+        # Performance tracking; `instrument` adds counters and phase timers
+        # (see trp_instrument)
+        self.instrument = make_instrument(instrument)
+        self.convergence_gen = 0
+        self.execution_time = 0
+
+        # Convergence history: one record per generation (every
+        # history_every-th and every improving one; the last history_ring
+        # only if set), see trp_history
+        self.history = ConvergenceHistory(
+            capacity=generations + 1 if generations else 256,
+            every=history_every, ring=history_ring)
+
+        # Diversity control: sampled edge entropy raises the mutation rate
+        # and triggers partial restarts from the construction heuristics
+        # (see trp_diversity); None keeps the fixed rate and patience stop
+        self.diversity = make_diversity(diversity)
+
+        # Checkpointing: the run state is written to `checkpoint` every
+        # checkpoint_every generations; resume_from continues a saved run
+        # (see trp_checkpoint)
+        if checkpoint_every < 1:
+            raise ValueError("checkpoint_every must be at least 1")
+        self.checkpoint = checkpoint
+        self.checkpoint_every = checkpoint_every
+        self.resume_from = resume_from
+
+    def eval_route(self, perm):
+        """Enhanced route evaluation with detailed metrics"""
+        return self.inst.evaluate(perm, self.budget)
+
+    def evaluate_population(self, genes):
+        """Fitness vector for the population, through the cache if enabled"""
+        if self.cache is None:
+            return self.inst.evaluate_batch(genes, self.budget)
+        return self.cache.fitness_batch(
+            genes, lambda rows: self.inst.evaluate_batch(rows, self.budget))
+
+    def initial_pop(self):
+        """Generate initial population with diversity"""
+        pop = []
+
+        # 50% random permutations
+        for _ in range(self.pop_size // 2):
+            perm = self.nodes.copy()
+            self.rng.shuffle(perm)
+            pop.append(perm)
+
+        # 25% nearest neighbor heuristic variations
+        for _ in range(self.pop_size // 4):
+            perm = self.nearest_neighbor_heuristic()
+            pop.append(perm)
+
+        # 25% cost-based heuristic
+        for _ in range(self.pop_size // 4):
+            perm = self.cost_based_heuristic()
+            pop.append(perm)
+
+        # Top up with random permutations when pop_size isn't a multiple of 4
+        while len(pop) < self.pop_size:
+            perm = self.nodes.copy()
+            self.rng.shuffle(perm)
+            pop.append(perm)
+
+        return pop
+
+    def nearest_neighbor_heuristic(self):
+        """Generate route using nearest neighbor with random start"""
+        unvisited = self.inst.spatial_index().unvisited()
+        route = []
+
+        # Random starting point
+        windows = self.windows
+        current = self.rng.choice(windows.compatible(0, self.nodes) if windows else self.nodes)
+        route.append(current)
+        unvisited.remove(current)
+
+        while unvisited:
+            # Select from top 3 nearest unvisited with randomness
+            nearest = unvisited.nearest(current, 3)
+            if windows:
+                nearest = windows.compatible(current, nearest)
+            current = nearest[self.rng.randint(0, len(nearest)-1)]
+
+            route.append(current)
+            unvisited.remove(current)
+
+        return route
+
+    def cost_based_heuristic(self):
+        """Generate route prioritizing low-cost attractions first"""
+        cost = self.inst.cost
+        attractions_by_cost = sorted(self.nodes, key=lambda x: cost[x])
+
+        # Add some randomness
+        route = []
+        remaining = attractions_by_cost.copy()
+
+        while remaining:
+            # Select from cheapest 30% with randomness
+            candidates = remaining[:max(1, len(remaining)//3)]
+            selected = self.rng.choice(candidates)
+            route.append(selected)
+            remaining.remove(selected)
+
+        return route
+
+    def crossover(self, p1, p2, out=None):
+        """Apply the configured crossover operator (O(n) per child)"""
+        if self.windows and self.crossover_kind == 'erx':
+            return self.crossover_op(p1, p2, self.rng, out=out, forbid=self.windows.forbid)
+        return self.crossover_op(p1, p2, self.rng, out=out)
+
+    def pmx_crossover(self, p1, p2, out=None):
+        """Partially Mapped Crossover for permutation encoding"""
+        return CROSSOVER_OPERATORS['pmx'](p1, p2, self.rng, out=out)
+
+    def swap_mutation(self, individual, tries=3):
+        """Swap mutation operator; with the time-window filter, up to `tries`
+        swaps are drawn and the first that adds no forbidden adjacency wins"""
+        if self.windows is None or len(individual) < 2:
+            swap_mutation(individual, self.rng)
+            return
+        for _ in range(tries):
+            a, b = self.rng.sample(range(len(individual)), 2)
+            if self.windows.swap_delta(individual, a, b) <= 0:
+                break
+        individual[a], individual[b] = individual[b], individual[a]
+
+    def tournament_selection(self, pop, scores, k=3):
+        """Tournament selection (returns a row view for array populations)"""
+        chosen = self.rng.sample(range(len(pop)), k)
+        best = min(chosen, key=lambda i: scores[i])
+        return pop[best]
+
+    def breed_batch(self, pop, scores, new_pop, start):
+        """Fill new_pop[start:] with one vectorized selection/crossover/mutation pass"""
+        count = self.pop_size - start
+        pairs = (count + 1) // 2
+
+        # Tournament selection (k=3) for all parents at once
+        cand = self.np_rng.integers(0, len(pop), size=(2 * pairs, 3))
+        winners = cand[np.arange(2 * pairs), np.argmin(scores[cand], axis=1)]
+        first, second = pop.genes[winners[:pairs]], pop.genes[winners[pairs:]]
+        parents = np.concatenate((first, second))
+        mates = np.concatenate((second, first))
+
+        # Crossover decided per pair, mutation per child
+        do_cx = np.tile(self.np_rng.random(pairs) < self.cx_p, 2)
+        children = crossover_batch(parents, mates, self.crossover_kind,
+                                   self.np_rng, self.rng)
+        children = np.where(do_cx[:, None], children, parents)
+        swap_mutation_batch(children, self.np_rng.random(2 * pairs) < self.mutation_rate,
+                            self.np_rng)
+
+        new_pop[start:] = children[:count]
+
+    def local_search(self, genes):
+        """Improve the two elites and a random share of offspring in place"""
+        deadline = (time.perf_counter() + self.ls_time_ms / 1000.0
+                    if self.ls_time_ms is not None else None)
+        deadline = self.limits.deadline_before(deadline)
+        offspring = range(2, self.pop_size)
+        rows = [0, 1] + self.rng.sample(offspring, int(self.ls_fraction * len(offspring)))
+
+        for i in rows:
+            key = genes[i].tobytes()
+            if key in self._local_optima:
+                continue
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            route, _, local_optimum = improve(self.delta, genes[i].tolist(), deadline,
+                                              self.ls_max_moves)
+            genes[i] = route
+            if local_optimum:
+                self._local_optima.add(genes[i].tobytes())
+
+    def start(self):
+        """Initialise the run state: population, best-so-far and counters"""
+        self._start_time = time.time()
+        self.limits.start()
+        self.instrument.start()
+        self.history.reset()
+        if self.diversity is not None:
+            self.diversity.reset()
+        self.mutation_rate = self.mut_p
+        self.pop = Population.from_routes(self.initial_pop(), len(self.nodes))
+        self.instrument.lap('initialization')
+        self._local_optima.clear()
+        self.best = None
+        self.best_score = float('inf')
+        self.generation = 0
+        self.generations_without_improvement = 0
+        self.last_order = None
+
+    def step(self):
+        """Evaluate the current generation and breed the next one.
+
+        Returns False (without breeding) once the no-improvement patience is
+        exhausted. After a successful step the evaluated generation sits in
+        `pop.next`, ranked by `last_order`.
+        """
+        pop = self.pop
+        g = self.generation
+        ins = self.instrument
+        ins.resume()
+
+        # Evaluate population (vectorized, fitness only)
+        scores = self.evaluate_population(pop.genes)
+        self.limits.count(len(scores))
+        ins.lap('evaluation')
+        ins.count('evaluations', len(scores))
+        ins.count('generations')
+
+        # Track best solution
+        min_idx = np.argmin(scores)
+        improved = scores[min_idx] < self.best_score
+        if improved:
+            self.best_score = scores[min_idx]
+            self.best = pop.genes[min_idx].copy()
+            self.convergence_gen = g
+            self.generations_without_improvement = 0
+            self.limits.improved(self.best_score, self.inst.to_ids(self.best.tolist()))
+            ins.count('improvements')
+        else:
+            self.generations_without_improvement += 1
+
+        # Track fitness progress
+        if self.history.wants(g, improved):
+            self.history.record(g, self.best_score, scores.mean(), scores.max(),
+                                hamming_diversity(pop.genes, self.best), improved)
+        self.generation += 1
+
+        # Early stopping if no improvement for too long, unless the
+        # diversity control restarts part of the population instead
+        stalled = self.patience is not None and self.generations_without_improvement > self.patience
+        restart = False
+        if self.diversity is not None:
+            self.diversity.measure(pop.genes, self.best, self.np_rng)
+            self.mutation_rate = self.diversity.mutation_rate(self.mut_p)
+            restart = self.diversity.wants_restart(self.generations_without_improvement, stalled)
+        if stalled and not restart:
+            return False
+
+        # Offspring are written straight into the next buffer
+        new_pop = pop.next
+
+        # Elitism - keep best 2
+        sorted_indices = np.argsort(scores)
+        self.last_order = sorted_indices
+        new_pop[0] = pop.genes[sorted_indices[0]]
+        new_pop[1] = pop.genes[sorted_indices[1]]
+        filled = 2
+        ins.lap('bookkeeping')
+
+        # Generate offspring
+        if self.vectorized:
+            self.breed_batch(pop, scores, new_pop, filled)
+            filled = self.pop_size
+            ins.lap('breeding')
+
+        while filled < self.pop_size:
+            ins.resume()
+            p1 = self.tournament_selection(pop, scores)
+            p2 = self.tournament_selection(pop, scores)
+            c1 = new_pop[filled]
+            c2 = new_pop[filled + 1] if filled + 1 < self.pop_size else pop.spare
+            ins.lap('selection')
+
+            # Crossover
+            if self.rng.random() < self.cx_p:
+                self.crossover(p1, p2, out=c1)
+                self.crossover(p2, p1, out=c2)
+                ins.count('crossovers', 2)
+            else:
+                c1[:] = p1
+                c2[:] = p2
+            ins.lap('crossover')
+
+            # Mutation
+            if self.rng.random() < self.mutation_rate:
+                self.swap_mutation(c1)
+                ins.count('mutations')
+            if self.rng.random() < self.mutation_rate:
+                self.swap_mutation(c2)
+                ins.count('mutations')
+            ins.lap('mutation')
+
+            filled += 2
+
+        # Memetic step on the new generation
+        if self.memetic:
+            ins.resume()
+            self.local_search(new_pop)
+            ins.lap('local_search')
+
+        if restart:
+            ins.resume()
+            self.reseed(new_pop)
+            self.diversity.restarted(g)
+            self.generations_without_improvement = 0
+            ins.lap('restart')
+            ins.count('restarts')
+
+        pop.swap()
+        return True
+
+    def reseed(self, genes):
+        """Partial restart: overwrite a share of the non-elite rows with new
+        nearest-neighbour and cost-based constructions (alternating)"""
+        offspring = range(2, self.pop_size)
+        count = max(1, int(self.diversity.restart_fraction * len(offspring)))
+        rows = self.rng.sample(offspring, min(count, len(offspring)))
+        for k, row in enumerate(rows):
+            genes[row] = (self.nearest_neighbor_heuristic() if k % 2 == 0
+                          else self.cost_based_heuristic())
+
+    def emigrants(self, k):
+        """Copies of the k best individuals of the last evaluated generation"""
+        return self.pop.next[self.last_order[:k]].copy()
+
+    def immigrate(self, routes):
+        """Overwrite random non-elite rows of the next generation with migrants"""
+        rows = self.rng.sample(range(2, self.pop_size), min(len(routes), self.pop_size - 2))
+        for row, route in zip(rows, routes):
+            self.pop.genes[row] = route
+
+    def save_checkpoint(self, path):
+        """Write the state between two generations to `path`"""
+        rng_meta, rng_words = random_state(self.rng)
+        state = {
+            'n': len(self.nodes),
+            'pop_size': self.pop_size,
+            'budget': self.budget,
+            'generation': self.generation,
+            'best_score': float(self.best_score),
+            'convergence_gen': self.convergence_gen,
+            'generations_without_improvement': self.generations_without_improvement,
+            'mutation_rate': self.mutation_rate,
+            'rng': rng_meta,
+            'np_rng': self.np_rng.bit_generator.state,
+            'limits': self.limits.state(),
+            'execution_time': time.time() - self._start_time,
+            'diversity': self.diversity.state() if self.diversity is not None else None
+        }
+        arrays = {
+            'genes': self.pop.genes,
+            'best': self.best,
+            'rng': rng_words,
+            'local_optima': np.array([np.frombuffer(key, dtype=self.pop.genes.dtype)
+                                      for key in self._local_optima],
+                                     dtype=self.pop.genes.dtype).reshape(-1, len(self.nodes))
+        }
+        arrays.update(history_arrays(self.history))
+        return save_checkpoint(path, 'GA', state, arrays)
+
+    def load_checkpoint(self, path):
+        """Restore the run state saved by save_checkpoint (instead of start())"""
+        state, arrays = load_checkpoint(path, 'GA')
+        check_compatible(state, path, n=len(self.nodes), pop_size=self.pop_size,
+                         budget=self.budget)
+        self._start_time = time.time() - state['execution_time']
+        self.limits.restore(state['limits'])
+        self.instrument.start()
+        restore_history(self.history, arrays)
+        self.pop = Population.from_routes(arrays['genes'], len(self.nodes))
+        self.best = arrays['best'].astype(self.pop.genes.dtype)
+        self.best_score = state['best_score']
+        self.generation = state['generation']
+        self.convergence_gen = state['convergence_gen']
+        self.generations_without_improvement = state['generations_without_improvement']
+        self.mutation_rate = state['mutation_rate']
+        self.last_order = None
+        set_random_state(self.rng, state['rng'], arrays['rng'])
+        self.np_rng.bit_generator.state = state['np_rng']
+        self._local_optima = {row.astype(self.pop.genes.dtype).tobytes()
+                              for row in arrays['local_optima']}
+        if self.diversity is not None:
+            self.diversity.reset()
+            if state['diversity'] is not None:
+                self.diversity.restore(state['diversity'])
+
+    def result(self):
+        """Best route (as attraction ids) with its detailed schedule"""
+        # Detailed schedule only for the final best route
+        best = self.best.tolist()
+        best_details = self.eval_route(best)
+
+        self.execution_time = time.time() - self._start_time
+
+        return {
+            'best_route': self.inst.to_ids(best),
+            'best_details': best_details,
+            'fitness_history': self.history.to_records(),
+            'convergence_generation': self.convergence_gen,
+            'execution_time': self.execution_time,
+            'cache_stats': self.cache.stats() if self.cache is not None else None,
+            'generations': self.generation,
+            'evaluations': self.limits.evaluations,
+            'budget_exhausted': self.limits.exhausted(),
+            'diversity': self.diversity.stats() if self.diversity is not None else None,
+            'instrumentation': self.instrument.finish(
+                cache=self.cache.stats() if self.cache is not None else None,
+                delta_evaluations=self.delta.delta_evaluations if self.delta is not None else None)
+        }
+
+    def run(self):
+        """Enhanced GA execution with performance tracking.
+
+        Stops after `generations`, on the patience rule, or when the time /
+        evaluation budget runs out; the first generation is always scored,
+        so a best route exists even under a very tight limit.
+        """
+        if self.resume_from is not None:
+            self.load_checkpoint(self.resume_from)
+        else:
+            self.start()
+        while self.generations is None or self.generation < self.generations:
+            if not self.step() or self.limits.exhausted():
+                break
+            if self.checkpoint is not None and self.generation % self.checkpoint_every == 0:
+                self.save_checkpoint(self.checkpoint)
+        return self.result()
@@ -0,0 +1,98 @@
+# Columnar convergence history of a GA run
+#
+# One fixed-dtype record per kept generation in a preallocated NumPy array
+# (grown by doubling), instead of a dict per generation. `every=k` keeps
+# every k-th generation plus every generation that improved the best
+# fitness, so the convergence curve keeps its exact steps; `ring=m` keeps
+# only the last m records. The whole history exports as one record array,
+# which pandas, the plotting scripts and np.save take as is:
+#
+#   hist = ga.run()['fitness_history']          # np.recarray
+#   plt.plot(hist.generation, hist.best_fitness)
+#   ga.history.save('convergence.parquet')
+
+import numpy as np
+
+HISTORY_DTYPE = np.dtype([
+    ('generation', np.int64),
+    ('best_fitness', np.float64),
+    ('avg_fitness', np.float64),
+    ('worst_fitness', np.float64),
+    ('diversity', np.float64),
+])
+
+
+class ConvergenceHistory:
+    """Best / average / worst fitness and diversity per generation"""
+
+    def __init__(self, capacity=256, every=1, ring=None):
+        if every < 1:
+            raise ValueError("every must be at least 1")
+        if ring is not None and ring < 1:
+            raise ValueError("ring must be at least 1")
+        self.every = every
+        self.ring = ring
+        self._capacity = ring if ring is not None else max(1, capacity)
+        self.reset()
+
+    def reset(self):
+        """Forget all records (called at the start of every run)"""
+        self._data = np.zeros(self._capacity, dtype=HISTORY_DTYPE)
+        self._size = 0       # records held
+        self._next = 0       # write position (ring mode wraps around)
+
+    def __len__(self):
+        return self._size
+
+    def wants(self, generation, improved=False):
+        """Whether `record` would keep this generation (decimation)"""
+        return improved or generation % self.every == 0
+
+    def record(self, generation, best, avg, worst, diversity=np.nan, improved=False):
+        """Add one generation; returns False when decimation skipped it"""
+        if not self.wants(generation, improved):
+            return False
+        if self._next == len(self._data):
+            if self.ring is not None:
+                self._next = 0
+            else:
+                grown = np.zeros(2 * len(self._data), dtype=HISTORY_DTYPE)
+                grown[:self._size] = self._data
+                self._data = grown
+        self._data[self._next] = (generation, best, avg, worst, diversity)
+        self._next += 1
+        self._size = min(self._size + 1, len(self._data))
+        return True
+
+    def extend(self, records):
+        """Append records as they are (no decimation), e.g. from a checkpoint"""
+        for row in records:
+            self.record(row['generation'], row['best_fitness'], row['avg_fitness'],
+                        row['worst_fitness'], row['diversity'], improved=True)
+
+    def to_records(self):
+        """Copy of the history in generation order, as a NumPy record array"""
+        if self.ring is not None and self._size == len(self._data):
+            data = np.concatenate((self._data[self._next:], self._data[:self._next]))
+        else:
+            data = self._data[:self._size].copy()
+        return data.view(np.recarray)
+
+    def to_frame(self):
+        import pandas as pd
+        return pd.DataFrame(self.to_records())
+
+    def save(self, path):
+        """Write the history as Parquet (.parquet, needs pyarrow) or .npy"""
+        if path.endswith('.parquet'):
+            self.to_frame().to_parquet(path, index=False)
+        else:
+            np.save(path, self.to_records())
+        return path
+
+
+def hamming_diversity(genes, best):
+    """Mean share of route positions where individuals differ from `best`"""
+    if genes.size == 0:
+        return 0.0
+    return float((genes != best).mean())
@@ -0,0 +1,273 @@
+# Shared problem instance for all TRPTW solvers
+#
+# Builds the distance and travel-time matrices once from a `make_df` DataFrame
+# so that GA, Greedy, Random search and ALNS only do table lookups when they
+# evaluate a route. Where the matrices come from is up to a travel provider
+# (see trp_travel); the default is Euclidean distance x 30 minutes per unit.
+
+import numpy as np
+
+from trp_spatial import SpatialIndex
+from trp_travel import MINUTES_PER_UNIT, EuclideanTravel, slot_factor
+
+LATE_PENALTY_MIN = 300  # 5-hour penalty added to the clock on a late arrival
+
+# Per-node / per-pair arrays that make up an instance
+ARRAY_FIELDS = ('xy', 'dist', 'travel', 'open_min', 'close_min', 'dur', 'cost')
+
+
+class TRPInstance:
+    """Dense (n+1)x(n+1) distance / travel-time matrices for one city.
+
+    Node 0 is the hotel, attractions are remapped to contiguous indices 1..n
+    in DataFrame order. Routes handed to `evaluate` are lists of node indices;
+    use `to_index` / `to_ids` to convert from and to attraction ids.
+
+    `travel` is a trp_travel provider for the matrices (Euclidean by
+    default); they may be asymmetric and are always indexed [from, to].
+    A time-dependent provider sets `time_slots`: evaluate scales every leg
+    by the factor of its departure slot (see TimeDependentTravel).
+    """
+
+    def __init__(self, df, hotel=(0, 0), minutes_per_unit=MINUTES_PER_UNIT, travel=None):
+        # Coordinates with the hotel at row 0
+        n = len(df)
+        xy = np.empty((n + 1, 2))
+        xy[0] = hotel
+        xy[1:, 0] = df['x'].to_numpy(dtype=float)
+        xy[1:, 1] = df['y'].to_numpy(dtype=float)
+
+        ids = list(df['id'])
+        provider = travel if travel is not None else EuclideanTravel()
+        dist, travel_min = provider.matrices(xy, ids, minutes_per_unit)
+
+        # Node attributes (the hotel is always open, free and takes no time)
+        arrays = {
+            'xy': xy,
+            'dist': dist,
+            'travel': travel_min,
+            'open_min': np.concatenate(([0.0], df['open_min'].to_numpy(dtype=float))),
+            'close_min': np.concatenate(([np.inf], df['close_min'].to_numpy(dtype=float))),
+            'dur': np.concatenate(([0.0], df['duration'].to_numpy(dtype=float))),
+            'cost': np.concatenate(([0], df['cost'].to_numpy(dtype=np.int64))),
+        }
+        self._setup(ids, arrays, hotel, minutes_per_unit, df, provider.euclidean,
+                    provider.time_slots())
+
+    @classmethod
+    def from_arrays(cls, ids, arrays, hotel=(0, 0), minutes_per_unit=MINUTES_PER_UNIT, df=None,
+                    euclidean=True, time_slots=None):
+        """Wrap existing arrays without copying them (e.g. views on shared memory)"""
+        inst = cls.__new__(cls)
+        inst._setup(list(ids), arrays, hotel, minutes_per_unit, df, euclidean, time_slots)
+        return inst
+
+    def _setup(self, ids, arrays, hotel, minutes_per_unit, df, euclidean=True,
+               time_slots=None):
+        self.df = df
+        self.hotel = hotel
+        self.minutes_per_unit = minutes_per_unit
+        # True when dist is the straight-line distance of xy
+        self.euclidean = euclidean
+        # (slot starts, factors) of time-dependent travel; None when static
+        self.time_slots = (None if time_slots is None
+                           else ([float(x) for x in time_slots[0]],
+                                 [float(x) for x in time_slots[1]]))
+
+        self.ids = ids
+        self.n = len(ids)
+        self.index_of = {aid: i + 1 for i, aid in enumerate(ids)}
+        for name in ARRAY_FIELDS:
+            setattr(self, name, arrays[name])
+
+        # Plain-list copies for the scalar evaluation loop (faster than ndarray indexing)
+        self._open = self.open_min.tolist()
+        self._close = self.close_min.tolist()
+        self._dur = self.dur.tolist()
+        self._cost = self.cost.tolist()
+        self._spatial = None
+        self._windows = None
+
+    def spatial_index(self):
+        """Grid index for nearest-neighbour queries, shared by all solvers"""
+        if self._spatial is None:
+            self._spatial = SpatialIndex(self)
+        return self._spatial
+
+    def time_windows(self):
+        """Time-window incompatibility table, shared by all solvers"""
+        if self._windows is None:
+            # trp_windows needs this module's constants, so import on use
+            from trp_windows import TimeWindowTable
+            self._windows = TimeWindowTable(self)
+        return self._windows
+
+    def arrays(self):
+        """The instance arrays by name (see ARRAY_FIELDS)"""
+        return {name: getattr(self, name) for name in ARRAY_FIELDS}
+
+    def __len__(self):
+        return self.n
+
+    def nodes(self):
+        """All attraction node indices (1..n)"""
+        return list(range(1, self.n + 1))
+
+    def to_index(self, route):
+        """Attraction ids -> node indices"""
+        return [self.index_of[aid] for aid in route]
+
+    def to_ids(self, route):
+        """Node indices -> attraction ids"""
+        return [self.ids[node - 1] for node in route]
+
+    def evaluate(self, route, budget, detailed=True):
+        """Evaluate a route of node indices starting and ending at the hotel.
+
+        Same schedule and penalty rules as the original `eval_route`: wait for
+        opening, +300 min and a time violation on late arrival, and a fitness
+        of distance + hours with 5000 base, 1000 per time violation and 0.01
+        per VND over budget when infeasible.
+        """
+        prev = [0]
+        prev.extend(route)
+        nxt = list(route)
+        nxt.append(0)
+        legs_dist = self.dist[prev, nxt].tolist()
+        legs_time = self.travel[prev, nxt].tolist()
+
+        open_, close, dur, cost = self._open, self._close, self._dur, self._cost
+        ids = self.ids
+        slots = self.time_slots
+        t = 0
+        total_cost = 0
+        time_violations = 0
+        route_times = []
+
+        for node, travel in zip(route, legs_time):
+            if slots is not None:
+                travel *= slot_factor(slots, t)
+            t += travel
+
+            # Wait if arrive before opening
+            if t < open_[node]:
+                t = open_[node]
+
+            # Late arrival
+            if t > close[node]:
+                time_violations += 1
+                t += LATE_PENALTY_MIN
+
+            if detailed:
+                route_times.append((ids[node - 1], t, t + dur[node]))
+            t += dur[node]
+            total_cost += cost[node]
+
+        # Return to hotel
+        if slots is not None:
+            legs_time[-1] *= slot_factor(slots, t)
+        t += legs_time[-1]
+        total_dist = 0.0
+        for d in legs_dist:
+            total_dist += d
+
+        violations = {'time': time_violations, 'budget': 0}
+        feasible = time_violations == 0
+        if total_cost > budget:
+            feasible = False
+            violations['budget'] = total_cost - budget
+
+        fitness_score = total_dist + t / 60.0
+        if not feasible:
+            fitness_score += 5000
+            fitness_score += violations['time'] * 1000
+            fitness_score += max(0, violations['budget']) * 0.01
+
+        result = {
+            'fitness': fitness_score,
+            'total_dist': total_dist,
+            'total_cost': total_cost,
+            'total_time': t,
+            'feasible': feasible,
+            'violations': violations
+        }
+        if detailed:
+            result['route_times'] = route_times
+        return result
+
+    def fitness(self, route, budget):
+        """Fitness only, for inner loops that don't need the schedule"""
+        return self.evaluate(route, budget, detailed=False)['fitness']
+
+    def evaluate_batch(self, pop, budget, full=False):
+        """Vectorized fitness for a whole population.
+
+        `pop` is a 2-D int array (pop_size x route length) of node indices.
+        The schedule is swept column by column over route position, so the
+        Python loop runs n times instead of pop_size * n times. Fitness is
+        bit-identical to `evaluate`. With `full=True` the per-individual
+        metrics are returned as well, as a dict of arrays.
+        """
+        pop = np.asarray(pop)
+        size = pop.shape[0]
+        prev = np.zeros(size, dtype=np.intp)
+        t = np.zeros(size)
+        total_dist = np.zeros(size)
+        total_wait = np.zeros(size)
+        total_cost = np.zeros(size, dtype=np.int64)
+        time_violations = np.zeros(size, dtype=np.int64)
+
+        for k in range(pop.shape[1]):
+            node = pop[:, k]
+            total_dist += self.dist[prev, node]
+            t += self._leg_times(prev, node, t)
+
+            # Wait if arrive before opening
+            opening = self.open_min[node]
+            early = t < opening
+            total_wait += np.where(early, opening - t, 0.0)
+            t = np.where(early, opening, t)
+
+            # Late arrival
+            late = t > self.close_min[node]
+            time_violations += late
+            t[late] += LATE_PENALTY_MIN
+
+            t += self.dur[node]
+            total_cost += self.cost[node]
+            prev = node
+
+        # Return to hotel
+        total_dist += self.dist[prev, 0]
+        t += self._leg_times(prev, 0, t)
+
+        over_budget = np.maximum(total_cost - budget, 0)
+        feasible = (time_violations == 0) & (over_budget == 0)
+
+        fitness = total_dist + t / 60.0
+        infeasible = ~feasible
+        # Same order of additions as `evaluate` so the floats match exactly
+        fitness[infeasible] += 5000
+        fitness[infeasible] += time_violations[infeasible] * 1000
+        fitness[infeasible] += over_budget[infeasible] * 0.01
+
+        if not full:
+            return fitness
+        return fitness, {
+            'total_dist': total_dist,
+            'total_cost': total_cost,
+            'total_time': t,
+            'total_wait': total_wait,
+            'time_violations': time_violations,
+            'budget_violation': over_budget,
+            'feasible': feasible
+        }
+
+    def _leg_times(self, prev, nxt, depart):
+        """Travel times of legs prev -> nxt departing at `depart` (arrays)"""
+        travel = self.travel[prev, nxt]
+        if self.time_slots is None:
+            return travel
+        starts, factors = self.time_slots
+        slot = np.maximum(np.searchsorted(starts, depart, side='right') - 1, 0)
+        return travel * np.asarray(factors)[slot]
@@ -0,0 +1,237 @@
+# Island-model GA: K sub-populations evolving in parallel processes
+#
+# Each island is an EnhancedTRP_GA living in its own long-running worker
+# process (one island per core). Every `migration_interval` generations the
+# islands send their best individuals to their neighbours on a ring or a
+# random topology. The instance matrices reach the workers once through
+# shared memory; per epoch only the migrants travel over the pipes.
+
+import multiprocessing as mp
+import random
+import time
+
+import numpy as np
+
+from trp_budget import SearchBudget
+from trp_ga import EnhancedTRP_GA
+from trp_instance import TRPInstance
+from trp_shared import attach_instance, release, share_instance
+
+TOPOLOGIES = ('ring', 'random')
+
+
+def island_seeds(seed, islands):
+    """Deterministic, statistically independent per-island seeds"""
+    return [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(islands)]
+
+
+class _Island:
+    """One GA island driven epoch by epoch"""
+
+    def __init__(self, inst, budget, seed, migrants, ga_kwargs):
+        self.ga = EnhancedTRP_GA(None, None, budget, hotel=inst.hotel, seed=seed,
+                                 instance=inst, **ga_kwargs)
+        self.ga.start()
+        self.migrants = migrants
+        self.active = True
+
+    def evolve(self, generations, immigrants, deadline=None):
+        """Run up to `generations` steps, or until the wall-clock `deadline`
+        (time.time() seconds); returns (emigrants, best, active, evaluations,
+        best route)"""
+        ga = self.ga
+        if immigrants is not None and self.active:
+            ga.immigrate(immigrants)
+        for _ in range(generations):
+            if not self.active or not ga.step():
+                self.active = False
+                break
+            if deadline is not None and time.time() >= deadline:
+                break
+        emigrants = ga.emigrants(self.migrants) if ga.last_order is not None else None
+        return (emigrants, float(ga.best_score), self.active, ga.limits.evaluations,
+                ga.best)
+
+    def handle(self, cmd, payload):
+        if cmd == 'evolve':
+            return self.evolve(*payload)
+        if cmd == 'result':
+            return self.ga.result()
+        raise ValueError(f"Unknown island command: {cmd}")
+
+
+class _LocalConn:
+    """Pipe-like stand-in that runs an island inside this process"""
+
+    def __init__(self, island):
+        self.island = island
+        self._reply = None
+
+    def send(self, message):
+        cmd, payload = message
+        if cmd != 'stop':
+            self._reply = self.island.handle(cmd, payload)
+
+    def recv(self):
+        return self._reply
+
+
+def _island_worker(conn, spec, budget, seed, migrants, ga_kwargs):
+    """Worker process: attach the shared instance once, then serve commands"""
+    inst, _handles = attach_instance(spec)
+    island = _Island(inst, budget, seed, migrants, ga_kwargs)
+    while True:
+        cmd, payload = conn.recv()
+        if cmd == 'stop':
+            break
+        conn.send(island.handle(cmd, payload))
+    conn.close()
+
+
+class IslandTRP_GA:
+    """Island-model variant of EnhancedTRP_GA.
+
+    `generations` is the per-island generation budget, split into epochs of
+    `migration_interval` generations. After each epoch every island sends its
+    `migrants` best individuals to one neighbour ('ring': i -> i+1, 'random':
+    a fresh random permutation of islands each epoch). Islands run in worker
+    processes unless processes=False, which runs them sequentially in this
+    process with identical results. Extra keyword arguments go to every
+    island's EnhancedTRP_GA (population_size, crossover, memetic, ...).
+
+    time_limit_ms / max_evaluations bound the whole run (evaluations summed
+    over islands); the evaluation budget is checked between epochs, so keep
+    `migration_interval` small when it must be tight. on_incumbent is called
+    whenever an epoch ends with a new overall best.
+    """
+
+    def __init__(self, df, city_name, budget, hotel=(0,0), islands=4,
+                 generations=150, migration_interval=10, migrants=2,
+                 topology='ring', seed=42, processes=True, instance=None,
+                 time_limit_ms=None, max_evaluations=None, on_incumbent=None,
+                 **ga_kwargs):
+        if topology not in TOPOLOGIES:
+            raise ValueError(f"Unknown topology: {topology}")
+        self.df = df
+        self.city_name = city_name
+        self.budget = budget
+        self.hotel = hotel
+        self.islands = islands
+        self.generations = generations
+        self.migration_interval = migration_interval
+        self.migrants = migrants
+        self.topology = topology
+        self.seed = seed
+        self.processes = processes
+        self.inst = instance if instance is not None else TRPInstance(df, hotel)
+        # The per-island no-improvement stop would freeze islands that
+        # migration could still revive; islands run their full budget
+        ga_kwargs.setdefault('patience', None)
+        self.ga_kwargs = ga_kwargs
+        self.seeds = island_seeds(seed, islands)
+        self.rng = random.Random(seed)
+        self.limits = SearchBudget(time_limit_ms, max_evaluations, on_incumbent)
+        if generations is None and not self.limits.limited:
+            raise ValueError("generations=None needs time_limit_ms or max_evaluations")
+
+    def _targets(self):
+        if self.topology == 'ring':
+            return [(i + 1) % self.islands for i in range(self.islands)]
+        order = list(range(self.islands))
+        self.rng.shuffle(order)
+        return order
+
+    def _start_local(self):
+        conns = [_LocalConn(_Island(self.inst, self.budget, seed, self.migrants, self.ga_kwargs))
+                 for seed in self.seeds]
+        return conns, lambda: None
+
+    def _start_processes(self):
+        spec, handles = share_instance(self.inst)
+        ctx = mp.get_context()
+        conns, procs = [], []
+        for seed in self.seeds:
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_island_worker,
+                               args=(child, spec, self.budget, seed,
+                                     self.migrants, self.ga_kwargs),
+                               daemon=True)
+            proc.start()
+            child.close()
+            conns.append(parent)
+            procs.append(proc)
+
+        def shutdown():
+            for conn in conns:
+                try:
+                    conn.send(('stop', None))
+                except (BrokenPipeError, OSError):
+                    pass
+            for proc in procs:
+                proc.join(timeout=5)
+            release(handles, unlink=True)
+
+        return conns, shutdown
+
+    def run(self):
+        start_time = time.time()
+        self.limits.start()
+        deadline = (start_time + self.limits.time_limit_ms / 1000.0
+                    if self.limits.time_limit_ms is not None else None)
+        best_fit = float('inf')
+        conns, shutdown = (self._start_processes() if self.processes
+                           else self._start_local())
+        inbox = [None] * self.islands
+        epochs = 0
+        migrations = 0
+        try:
+            done = 0
+            total = self.generations if self.generations is not None else float('inf')
+            while done < total:
+                gens = int(min(self.migration_interval, total - done))
+                # All islands evolve concurrently, then we collect in order
+                for conn, immigrants in zip(conns, inbox):
+                    conn.send(('evolve', (gens, immigrants, deadline)))
+                replies = [conn.recv() for conn in conns]
+                done += gens
+                epochs += 1
+                self.limits.evaluations = sum(r[3] for r in replies)
+
+                i = min(range(self.islands), key=lambda k: replies[k][1])
+                if replies[i][1] < best_fit:
+                    best_fit = replies[i][1]
+                    self.limits.improved(best_fit, self.inst.to_ids(replies[i][4].tolist()))
+
+                if not any(r[2] for r in replies) or self.limits.exhausted():
+                    break
+
+                # Migration
+                inbox = [None] * self.islands
+                if done < total:
+                    for i, target in enumerate(self._targets()):
+                        emigrants = replies[i][0]
+                        if target != i and emigrants is not None:
+                            inbox[target] = emigrants
+                            migrations += 1
+
+            for conn in conns:
+                conn.send(('result', None))
+            island_results = [conn.recv() for conn in conns]
+        finally:
+            shutdown()
+
+        best_island = min(range(self.islands),
+                          key=lambda i: island_results[i]['best_details']['fitness'])
+        best = island_results[best_island]
+        return {
+            'best_route': best['best_route'],
+            'best_details': best['best_details'],
+            'best_island': best_island,
+            'island_fitness': [r['best_details']['fitness'] for r in island_results],
+            'island_results': island_results,
+            'epochs': epochs,
+            'migrations': migrations,
+            'evaluations': self.limits.evaluations,
+            'budget_exhausted': self.limits.exhausted(),
+            'execution_time': time.time() - start_time
+        }
@@ -0,0 +1,68 @@
+# Time-window-aware local search (2-opt / Or-opt) on top of DeltaEvaluator
+#
+# Used by the GA's memetic mode; every trial move is scored incrementally, so
+# a full neighbourhood scan costs far less than re-evaluating each neighbour.
+
+import time
+
+EPS = 1e-9
+
+
+def _expired(deadline):
+    return deadline is not None and time.perf_counter() >= deadline
+
+
+def two_opt_pass(ev, deadline=None):
+    """Apply the first improving segment reversal; True if one was found"""
+    fit = ev.fitness
+    m = len(ev.route)
+    for a in range(m - 1):
+        if _expired(deadline):
+            return False
+        for b in range(a + 1, m):
+            if ev.two_opt(a, b) < fit - EPS:
+                route = ev.route
+                ev.load(route[:a] + route[a:b + 1][::-1] + route[b + 1:])
+                return True
+    return False
+
+
+def or_opt_pass(ev, max_segment=3, deadline=None):
+    """Apply the first improving relocation of a 1..max_segment block"""
+    fit = ev.fitness
+    m = len(ev.route)
+    for length in range(1, min(max_segment, m - 1) + 1):
+        for a in range(m - length + 1):
+            if _expired(deadline):
+                return False
+            for pos in range(m - length + 1):
+                if pos == a:
+                    continue
+                if ev.relocate(a, length, pos) < fit - EPS:
+                    route = ev.route
+                    seg = route[a:a + length]
+                    rest = route[:a] + route[a + length:]
+                    ev.load(rest[:pos] + seg + rest[pos:])
+                    return True
+    return False
+
+
+def improve(ev, route, deadline=None, max_moves=None):
+    """2-opt then Or-opt first-improvement descent from `route`.
+
+    Stops at a local optimum, after `max_moves` applied moves, or when
+    `time.perf_counter()` passes `deadline`. Returns (route, fitness,
+    local_optimum); without a deadline the result does not depend on timing.
+    """
+    ev.load(route)
+    moves = 0
+    while max_moves is None or moves < max_moves:
+        if _expired(deadline):
+            break
+        if two_opt_pass(ev, deadline) or or_opt_pass(ev, deadline=deadline):
+            moves += 1
+        elif not _expired(deadline):
+            return ev.route, ev.fitness, True
+        else:
+            break
+    return ev.route, ev.fitness, False
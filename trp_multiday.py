@@ -0,0 +1,289 @@
+# Multi-day itinerary planning: split the trip into days, solve days in parallel
+#
+# A D-day trip assigns every attraction to one day (optionally with its own
+# hotel), then solves each day as an ordinary TRPTW with any solver of the
+# experiment runner. Days are independent, so they are solved concurrently
+# in a process pool. The trip budget is split across the days in proportion
+# to the cost of the attractions each day holds, and re-split whenever
+# attractions change days, so the days together never plan for more than
+# the trip budget. Between solve rounds, attractions are relocated from
+# day to day wherever that lowers the summed day fitness; the cost of every
+# relocation is read from insertion tables and delta evaluations on
+# per-hotel instances covering the whole trip, so a full pass over all
+# (attraction, target day, position) triples is a handful of NumPy sweeps.
+#
+#   planner = MultiDayPlanner(df, 'Hanoi', 2000000, days=7)
+#   plan = planner.run()
+#   for day in plan['days']:
+#       print(day['day'], day['route'], day['details']['feasible'])
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from trp_delta import DeltaEvaluator
+from trp_instance import TRPInstance
+from trp_repair import InsertionTable
+
+EPS = 1e-9
+
+
+def _solve_day(task):
+    """Worker entry point: solve one day's TRPTW, returns attraction ids"""
+    from trp_experiments import ALGORITHMS
+
+    df, hotel, budget, algorithm, params, seed = task
+    if len(df) == 0:
+        return []
+    inst = TRPInstance(df, hotel)
+    result = ALGORITHMS[algorithm](inst, None, budget, seed, dict(params)).run()
+    return list(result['best_route'])
+
+
+def balanced_clusters(xy, days, rng, iters=20):
+    """Split points into `days` spatial clusters of near-equal size
+    (k-means with a capacity of ceil(n / days) per cluster)"""
+    n = len(xy)
+    cap = -(-n // days)
+    centers = xy[rng.choice(n, size=days, replace=False)] if n >= days else xy[:days]
+    labels = np.zeros(n, dtype=np.int64)
+    for _ in range(iters):
+        d = np.hypot(xy[:, None, 0] - centers[None, :, 0], xy[:, None, 1] - centers[None, :, 1])
+        # Closest (point, center) pairs first, skipping full clusters
+        load = np.zeros(len(centers), dtype=np.int64)
+        new = np.full(n, -1, dtype=np.int64)
+        for flat in np.argsort(d, axis=None, kind='stable'):
+            p, c = divmod(int(flat), len(centers))
+            if new[p] < 0 and load[c] < cap:
+                new[p] = c
+                load[c] += 1
+        if np.array_equal(new, labels) and _ > 0:
+            break
+        labels = new
+        centers = np.array([xy[labels == c].mean(axis=0) if (labels == c).any() else centers[c]
+                            for c in range(len(centers))])
+    return labels, centers
+
+
+class MultiDayPlanner:
+    """Plan a `days`-day trip over all attractions of `df`.
+
+    hotels: one (x, y) for every day, or a single hotel for the whole trip.
+    split='cluster' groups attractions into balanced spatial clusters
+    (matched to the nearest free hotel); split='tour' cuts one greedy
+    nearest-neighbour tour into days of equal visit + travel time.
+    Each day is solved by `algorithm` (an ALGORITHMS name, e.g. 'ALNS' or
+    'GA') with `params`, each day against its share of the trip budget
+    (see split_budget). Up to `rounds` rounds of relocation moves and
+    re-solving of the changed days follow. workers=0 solves days in this
+    process.
+    """
+
+    def __init__(self, df, city_name, budget, days, hotels=(0,0), split='cluster',
+                 algorithm='ALNS', params=None, rounds=3, max_moves=50,
+                 workers=None, seed=42):
+        if days < 1:
+            raise ValueError("days must be at least 1")
+        if split not in ('cluster', 'tour'):
+            raise ValueError(f"Unknown split: {split}")
+        self.df = df.reset_index(drop=True)
+        self.city_name = city_name
+        self.budget = budget
+        self.days = days
+        if np.ndim(hotels) == 1:
+            hotels = [tuple(hotels)] * days
+        if len(hotels) != days:
+            raise ValueError(f"Expected {days} hotels, got {len(hotels)}")
+        self.hotels = [tuple(h) for h in hotels]
+        self.split = split
+        self.algorithm = algorithm
+        self.params = params if params is not None else {'iters': 300}
+        self.rounds = rounds
+        self.max_moves = max_moves
+        self.workers = workers
+        self.seed = seed
+
+        # One whole-trip instance per distinct hotel; node i is the same
+        # attraction in all of them
+        self._inst = {h: TRPInstance(self.df, h) for h in dict.fromkeys(self.hotels)}
+        self.inst = [self._inst[h] for h in self.hotels]
+        self.day_budgets = [budget / days] * days
+
+    # Assignment of attractions to days
+    def assign(self):
+        """Initial split: list of node lists, one per day"""
+        inst = self.inst[0]
+        if self.split == 'tour':
+            return self._split_tour(inst)
+
+        rng = np.random.default_rng(self.seed)
+        labels, centers = balanced_clusters(inst.xy[1:], self.days, rng)
+        # Match clusters to hotels, closest pairs first
+        d = np.array([[np.hypot(*(np.asarray(h) - c)) for h in self.hotels] for c in centers])
+        day_of = {}
+        used = set()
+        for flat in np.argsort(d, axis=None, kind='stable'):
+            c, day = divmod(int(flat), self.days)
+            if c not in day_of and day not in used:
+                day_of[c] = day
+                used.add(day)
+        groups = [[] for _ in range(self.days)]
+        for node, c in enumerate(labels.tolist(), 1):
+            groups[day_of[c]].append(node)
+        return groups
+
+    def _split_tour(self, inst):
+        unvisited = inst.spatial_index().unvisited()
+        tour = []
+        current = 0
+        while unvisited:
+            current = unvisited.nearest(current)[0]
+            unvisited.remove(current)
+            tour.append(current)
+        load = inst.dur[tour] + inst.travel[[0] + tour[:-1], tour]
+        cum = np.cumsum(load)
+        cut = np.searchsorted(cum, cum[-1] * np.arange(1, self.days) / self.days)
+        return [part.tolist() for part in np.split(np.array(tour, dtype=np.int64), cut)]
+
+    def split_budget(self, routes):
+        """Per-day budgets: the trip budget in proportion to the cost of each
+        day's attractions (equal shares when nothing costs anything)"""
+        cost = self.inst[0].cost
+        day_cost = np.array([float(cost[route].sum()) for route in routes])
+        total = day_cost.sum()
+        if total <= 0:
+            return [self.budget / self.days] * self.days
+        return (self.budget * day_cost / total).tolist()
+
+    # Solving
+    def _tasks(self, routes, days, round_):
+        tasks = []
+        for day in days:
+            nodes = sorted(routes[day])
+            sub = self.df.iloc[[node - 1 for node in nodes]]
+            tasks.append((sub, self.hotels[day], self.day_budgets[day], self.algorithm,
+                          self.params, self.seed + 1000 * round_ + day))
+        return tasks
+
+    def _solve(self, pool, routes, days, round_):
+        """Re-solve `days`; keep a day's current order if the solver did worse"""
+        tasks = self._tasks(routes, days, round_)
+        solved = pool.map(_solve_day, tasks) if pool is not None else map(_solve_day, tasks)
+        for day, ids in zip(days, solved):
+            new = self.inst[day].to_index(ids)
+            if self._day_fitness(day, new) < self._day_fitness(day, routes[day]) - EPS:
+                routes[day] = new
+        # Solvers that may skip attractions change what each day costs
+        self.day_budgets = self.split_budget(routes)
+
+    def _day_fitness(self, day, route, budget=None):
+        budget = self.day_budgets[day] if budget is None else budget
+        return self.inst[day].fitness(route, budget)
+
+    # Inter-day relocation
+    def relocate(self, routes):
+        """Move single attractions between days while that lowers the summed
+        day fitness; returns the set of days that changed.
+
+        Moves are scored against the current day budgets; a move also moves
+        its attraction's share of the budget, so the best move is re-checked
+        with the re-split budgets before it is kept.
+        """
+        evs = [DeltaEvaluator(self.inst[day], self.day_budgets[day])
+               for day in range(self.days)]
+        fits = [evs[day].load(routes[day]) for day in range(self.days)]
+        changed = set()
+        for _ in range(self.max_moves):
+            # Fitness change of removing each attraction from its day
+            remove = {}
+            for day, route in enumerate(routes):
+                ev = evs[day]
+                ev.load(route)
+                for pos, node in enumerate(route):
+                    remove[node] = (day, pos, ev.replace(pos, pos + 1, []) - fits[day])
+
+            best = (-EPS, None)
+            for day, route in enumerate(routes):
+                items = [node for node in remove if remove[node][0] != day]
+                if not items:
+                    continue
+                table = InsertionTable(evs[day], route, items)
+                cost = table.costs() - fits[day]
+                pos = np.argmin(cost, axis=1)
+                gain = cost[np.arange(len(items)), pos] + np.array([remove[a][2] for a in items])
+                k = int(np.argmin(gain))
+                if gain[k] < best[0]:
+                    best = (gain[k], (items[k], day, int(pos[k])))
+            if best[1] is None:
+                break
+
+            node, to_day, to_pos = best[1]
+            from_day, from_pos, _ = remove[node]
+            routes[from_day].pop(from_pos)
+            routes[to_day].insert(to_pos, node)
+            budgets = self.split_budget(routes)
+            new_fits = [self._day_fitness(day, routes[day], budgets[day])
+                        for day in range(self.days)]
+            if sum(new_fits) >= sum(fits) - EPS:
+                routes[to_day].pop(to_pos)
+                routes[from_day].insert(from_pos, node)
+                break
+
+            self.day_budgets = budgets
+            for day in range(self.days):
+                evs[day].budget = budgets[day]
+                fits[day] = evs[day].load(routes[day])
+            changed.update((from_day, to_day))
+        return changed
+
+    def run(self):
+        start_time = time.time()
+        routes = self.assign()
+        self.day_budgets = self.split_budget(routes)
+        history = []
+        pool = (ProcessPoolExecutor(max_workers=self.workers)
+                if self.workers != 0 and self.days > 1 else None)
+        try:
+            self._solve(pool, routes, list(range(self.days)), 0)
+            history.append(self._total(routes))
+            rounds = 0
+            for round_ in range(1, self.rounds + 1):
+                changed = self.relocate(routes)
+                if not changed:
+                    break
+                self._solve(pool, routes, sorted(changed), round_)
+                history.append(self._total(routes))
+                rounds = round_
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return self._result(routes, history, rounds, start_time)
+
+    def _total(self, routes):
+        return sum(self._day_fitness(day, routes[day]) for day in range(self.days))
+
+    def _result(self, routes, history, rounds, start_time):
+        days = []
+        for day, route in enumerate(routes):
+            inst = self.inst[day]
+            details = inst.evaluate(route, self.day_budgets[day])
+            days.append({
+                'day': day + 1,
+                'hotel': self.hotels[day],
+                'budget': self.day_budgets[day],
+                'route': inst.to_ids(route),
+                'details': details
+            })
+        total_cost = sum(d['details']['total_cost'] for d in days)
+        return {
+            'days': days,
+            'total_fitness': sum(d['details']['fitness'] for d in days),
+            'total_dist': sum(d['details']['total_dist'] for d in days),
+            'total_cost': total_cost,
+            'feasible_days': sum(d['details']['feasible'] for d in days),
+            'within_budget': total_cost <= self.budget,
+            'fitness_history': history,
+            'rounds': rounds,
+            'execution_time': time.time() - start_time
+        }
@@ -0,0 +1,246 @@
+# Permutation crossover / mutation operators for the TRPTW solvers
+#
+# Individuals are routes of node indices 1..n (see TRPInstance), so every
+# operator can use flat position / membership tables indexed by node instead
+# of `in` / `.index()` scans: each child costs O(n).
+
+import numpy as np
+
+
+def _cut_points(size, rng):
+    """Two cut points cx1 < cx2, drawn the same way as the original PMX"""
+    cx1 = rng.randint(0, size - 2)
+    cx2 = rng.randint(cx1 + 1, size - 1)
+    return cx1, cx2
+
+
+def _emit(child, out):
+    if out is None:
+        return child
+    out[:] = child
+    return out
+
+
+def pmx(p1, p2, rng, out=None):
+    """Partially Mapped Crossover: p1's segment, the rest mapped from p2"""
+    p1 = list(p1)
+    p2 = list(p2)
+    size = len(p1)
+    if size < 2:
+        return _emit(p1, out)
+    cx1, cx2 = _cut_points(size, rng)
+
+    # partner[v] = value of p2 at the position v occupies in p1's segment
+    in_segment = [False] * (size + 1)
+    partner = [0] * (size + 1)
+    for i in range(cx1, cx2 + 1):
+        in_segment[p1[i]] = True
+        partner[p1[i]] = p2[i]
+
+    child = p2
+    child[cx1:cx2+1] = p1[cx1:cx2+1]
+    for i in range(size):
+        if cx1 <= i <= cx2:
+            continue
+        v = child[i]
+        if not in_segment[v]:
+            continue
+        chain = []
+        while in_segment[v]:
+            chain.append(v)
+            v = partner[v]
+        # Path compression keeps the whole child O(n)
+        for u in chain:
+            partner[u] = v
+        child[i] = v
+
+    return _emit(child, out)
+
+
+def ox(p1, p2, rng, out=None):
+    """Order Crossover: p1's segment, the rest in p2's order after cx2"""
+    p1 = list(p1)
+    p2 = list(p2)
+    size = len(p1)
+    if size < 2:
+        return _emit(p1, out)
+    cx1, cx2 = _cut_points(size, rng)
+
+    used = [False] * (size + 1)
+    for i in range(cx1, cx2 + 1):
+        used[p1[i]] = True
+
+    child = p1
+    pos = (cx2 + 1) % size
+    for k in range(size):
+        v = p2[(cx2 + 1 + k) % size]
+        if used[v]:
+            continue
+        child[pos] = v
+        pos = (pos + 1) % size
+
+    return _emit(child, out)
+
+
+def erx(p1, p2, rng, out=None, forbid=None):
+    """Edge Recombination: follow parent edges, preferring sparse neighbours.
+
+    `forbid` (a TimeWindowTable.forbid matrix) drops neighbours that cannot
+    follow the current node on time, unless no other neighbour is left.
+    """
+    p1 = list(p1)
+    p2 = list(p2)
+    size = len(p1)
+    if size < 2:
+        return _emit(p1, out)
+
+    # Union of (cyclic) neighbours in both parents, at most 4 per node
+    neighbours = [None] * (size + 1)
+    for v in p1:
+        neighbours[v] = set()
+    for parent in (p1, p2):
+        for i, v in enumerate(parent):
+            neighbours[v].add(parent[i - 1])
+            neighbours[v].add(parent[(i + 1) % size])
+
+    # Unvisited nodes with O(1) removal (swap with last)
+    remaining = p1.copy()
+    where = [0] * (size + 1)
+    for i, v in enumerate(remaining):
+        where[v] = i
+
+    def visit(v):
+        i = where[v]
+        last = remaining[-1]
+        remaining[i] = last
+        where[last] = i
+        remaining.pop()
+        for u in neighbours[v]:
+            neighbours[u].discard(v)
+
+    child = []
+    current = p1[0]
+    while True:
+        child.append(current)
+        visit(current)
+        if not remaining:
+            break
+        candidates = neighbours[current]
+        if forbid is not None and candidates:
+            row = forbid[current]
+            candidates = [u for u in candidates if not row[u]] or candidates
+        if candidates:
+            fewest = min(len(neighbours[u]) for u in candidates)
+            ties = sorted(u for u in candidates if len(neighbours[u]) == fewest)
+            current = ties[rng.randrange(len(ties))]
+        else:
+            current = remaining[rng.randrange(len(remaining))]
+
+    return _emit(child, out)
+
+
+CROSSOVER_OPERATORS = {
+    'pmx': pmx,
+    'ox': ox,
+    'erx': erx,
+}
+
+
+def swap_mutation(individual, rng):
+    """Swap two random positions in place"""
+    if len(individual) > 1:
+        a, b = rng.sample(range(len(individual)), 2)
+        individual[a], individual[b] = individual[b], individual[a]
+
+
+# Batch (whole generation) versions -----------------------------------------
+
+def _batch_cut_points(rows, size, np_rng):
+    cx1 = np_rng.integers(0, size - 1, size=rows)
+    cx2 = np_rng.integers(cx1 + 1, size)
+    cols = np.arange(size)
+    segment = (cols >= cx1[:, None]) & (cols <= cx2[:, None])
+    return cx1, cx2, segment
+
+
+def pmx_batch(P1, P2, np_rng):
+    """Row-wise PMX of two parent arrays (m x n) in one vectorized pass"""
+    P1 = np.asarray(P1)
+    P2 = np.asarray(P2)
+    rows, size = P1.shape
+    if size < 2:
+        return P1.copy()
+    _, _, segment = _batch_cut_points(rows, size, np_rng)
+    r = np.broadcast_to(np.arange(rows)[:, None], P1.shape)
+
+    in_segment = np.zeros((rows, size + 1), dtype=bool)
+    in_segment[r[segment], P1[segment]] = True
+    partner = np.zeros((rows, size + 1), dtype=P1.dtype)
+    partner[r[segment], P1[segment]] = P2[segment]
+
+    child = np.where(segment, P1, P2)
+    # Follow the mapping until no outside gene clashes with the segment;
+    # the number of sweeps is bounded by the segment length
+    clash = ~segment & in_segment[r, child]
+    while clash.any():
+        child[clash] = partner[r[clash], child[clash]]
+        clash[clash] = in_segment[r[clash], child[clash]]
+    return child
+
+
+def ox_batch(P1, P2, np_rng):
+    """Row-wise Order Crossover of two parent arrays (m x n)"""
+    P1 = np.asarray(P1)
+    P2 = np.asarray(P2)
+    rows, size = P1.shape
+    if size < 2:
+        return P1.copy()
+    _, cx2, segment = _batch_cut_points(rows, size, np_rng)
+    r = np.arange(rows)[:, None]
+
+    in_segment = np.zeros((rows, size + 1), dtype=bool)
+    in_segment[np.broadcast_to(r, P1.shape)[segment], P1[segment]] = True
+
+    # Positions and donor values, both read cyclically from cx2 + 1
+    order = (cx2[:, None] + 1 + np.arange(size)) % size
+    donor = P2[r, order]
+    free_pos = np.argsort(segment[r, order], axis=1, kind='stable')
+    free_val = np.argsort(in_segment[r, donor], axis=1, kind='stable')
+    fill = np.arange(size) < (size - segment.sum(axis=1))[:, None]
+
+    child = P1.copy()
+    pos = order[r, free_pos]
+    val = donor[r, free_val]
+    child[np.broadcast_to(r, P1.shape)[fill], pos[fill]] = val[fill]
+    return child
+
+
+def crossover_batch(P1, P2, kind, np_rng, rng=None):
+    """Offspring for a whole generation in one call.
+
+    PMX and OX are fully vectorized over rows; ERX has no natural
+    vectorization and falls back to one `erx` call per row (which needs
+    a `random.Random` as `rng`).
+    """
+    if kind == 'pmx':
+        return pmx_batch(P1, P2, np_rng)
+    if kind == 'ox':
+        return ox_batch(P1, P2, np_rng)
+    if kind == 'erx':
+        child = np.empty_like(np.asarray(P1))
+        for i in range(len(child)):
+            erx(P1[i], P2[i], rng, out=child[i])
+        return child
+    raise ValueError(f"Unknown crossover operator: {kind}")
+
+
+def swap_mutation_batch(pop, mask, np_rng):
+    """Swap two distinct random genes in every row selected by `mask`"""
+    rows = np.flatnonzero(mask)
+    size = pop.shape[1]
+    if len(rows) == 0 or size < 2:
+        return pop
+    a = np_rng.integers(0, size, size=len(rows))
+    b = (a + np_rng.integers(1, size, size=len(rows))) % size
+    pop[rows, a], pop[rows, b] = pop[rows, b], pop[rows, a]
+    return pop
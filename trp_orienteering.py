@@ -0,0 +1,462 @@
+# Orienteering (prize-collecting) mode: visit the subset that fits the day
+#
+# The permutation solvers order *all* attractions, so their routes run for
+# days and are never feasible. Here a route is a short list of node indices
+# (hotel = 0 implied at both ends) that must return to the hotel by
+# `day_end_min`, arrive everywhere before closing and stay within budget;
+# the solvers maximise the collected prize. Fitness is still minimised:
+#
+#   fitness = -prize + tie_break * (distance + hours)        (feasible)
+#   fitness += 5000 + 1000 * late arrivals + overtime + 0.01 * VND over budget
+#
+# Candidate insertions are scored for all unvisited nodes and route
+# positions at once from the route's schedule (arrival, wait and the
+# largest delay each position can absorb), so growing a route is O(q * m)
+# NumPy work instead of q * m trial evaluations.
+
+import math
+import random
+import time
+
+import numpy as np
+
+from trp_budget import SearchBudget
+from trp_history import ConvergenceHistory
+from trp_instance import TRPInstance
+
+# Latest return to the hotel, in minutes from 09:00 (21:00)
+DAY_END_MIN = 12 * 60
+
+# Weight of distance + hours next to the prize (breaks ties between routes
+# collecting the same prize)
+TIE_BREAK = 1e-3
+
+
+class Orienteering:
+    """Prize-collecting view of a TRPInstance for one budget and day length.
+
+    `prizes` gives the score of every attraction: a sequence in instance
+    order, a {attraction id: score} dict, or None for the DataFrame's
+    'score' column (1 per attraction when there is none).
+    """
+
+    def __init__(self, inst, budget, day_end_min=DAY_END_MIN, prizes=None,
+                 tie_break=TIE_BREAK):
+        if inst.time_slots is not None:
+            raise ValueError("Orienteering needs static travel times")
+        self.inst = inst
+        self.budget = budget
+        self.day_end = day_end_min
+        self.tie_break = tie_break
+
+        if prizes is None and inst.df is not None and 'score' in inst.df:
+            prizes = inst.df['score'].to_numpy(dtype=float)
+        if prizes is None:
+            prizes = np.ones(inst.n)
+        elif isinstance(prizes, dict):
+            prizes = [prizes.get(aid, 0.0) for aid in inst.ids]
+        prizes = np.asarray(prizes, dtype=float)
+        if len(prizes) != inst.n:
+            raise ValueError(f"Expected {inst.n} prizes, got {len(prizes)}")
+        self.prize = np.concatenate(([0.0], prizes))
+        self._prize = self.prize.tolist()
+
+    def evaluate(self, route, detailed=True):
+        """Instance evaluation of the (partial) route plus prize and day end"""
+        res = self.inst.evaluate(route, self.budget, detailed)
+        prize = 0.0
+        for node in route:
+            prize += self._prize[node]
+        overtime = max(0.0, res['total_time'] - self.day_end)
+        feasible = res['feasible'] and overtime == 0
+        fitness = -prize + self.tie_break * (res['total_dist'] + res['total_time'] / 60.0)
+        if not feasible:
+            fitness += 5000
+            fitness += res['violations']['time'] * 1000
+            fitness += overtime
+            fitness += max(0, res['violations']['budget']) * 0.01
+        res.update(fitness=fitness, feasible=feasible, prize=prize, overtime=overtime,
+                   visited=len(route))
+        return res
+
+    def fitness(self, route):
+        return self.evaluate(route, detailed=False)['fitness']
+
+    def schedule(self, route):
+        """Per position (route nodes, then the hotel return): arrival time,
+        departure of the previous stop and the largest arrival delay that
+        keeps the rest of the day feasible"""
+        inst = self.inst
+        m = len(route)
+        prev = [0] + route
+        legs = inst.travel[prev, route + [0]].tolist()
+        open_, close, dur = inst._open, inst._close, inst._dur
+
+        arrival = [0.0] * (m + 1)
+        depart = [0.0] * (m + 1)
+        t = 0.0
+        for k, node in enumerate(route):
+            depart[k] = t
+            t += legs[k]
+            arrival[k] = t
+            t = max(t, open_[node]) + dur[node]
+        depart[m] = t
+        arrival[m] = t + legs[m]
+
+        # Waiting absorbs delay, but cannot make up for a later stop that is
+        # already late (or an overtime return): a negative slack is passed
+        # on unchanged
+        slack = [0.0] * (m + 1)
+        slack[m] = self.day_end - arrival[m]
+        for k in range(m - 1, -1, -1):
+            node = route[k]
+            if slack[k + 1] < 0:
+                slack[k] = slack[k + 1]
+                continue
+            wait = max(0.0, open_[node] - arrival[k])
+            slack[k] = min(close[node] - arrival[k], wait + slack[k + 1])
+        return np.array(arrival), np.array(depart), np.array(slack)
+
+    def insertions(self, route, cand):
+        """Arrival delay caused by inserting each candidate before each
+        position (len(cand) x len(route)+1) and whether it stays feasible"""
+        inst = self.inst
+        cand = np.asarray(cand, dtype=np.intp)[:, None]
+        arrival, depart, slack = self.schedule(route)
+        prev = np.array([0] + route, dtype=np.intp)[None, :]
+        nxt = np.array(route + [0], dtype=np.intp)[None, :]
+
+        arr_u = depart[None, :] + inst.travel[prev, cand]
+        start_u = np.maximum(arr_u, inst.open_min[cand])
+        delay = start_u + inst.dur[cand] + inst.travel[cand, nxt] - arrival[None, :]
+        spent = int(inst.cost[route].sum()) if route else 0
+        ok = ((arr_u <= inst.close_min[cand]) & (delay <= slack[None, :])
+              & (spent + inst.cost[cand] <= self.budget))
+        return delay, ok
+
+    def fill(self, route, candidates, rng=None, noise=0.0):
+        """Insert candidates while any fits, best prize^2 / delay first.
+
+        With `noise` > 0 every ratio is scaled by U(1-noise, 1+noise) drawn
+        from the NumPy generator `rng` (randomised construction).
+        """
+        route = list(route)
+        visited = set(route)
+        pool = [c for c in candidates if c not in visited]
+        while pool:
+            delay, ok = self.insertions(route, pool)
+            if not ok.any():
+                break
+            gain = self.prize[pool][:, None] ** 2 / np.maximum(delay, 1e-6)
+            if noise:
+                gain = gain * rng.uniform(1 - noise, 1 + noise, gain.shape)
+            gain = np.where(ok, gain, -np.inf)
+            row, pos = np.unravel_index(int(np.argmax(gain)), gain.shape)
+            route.insert(int(pos), pool.pop(int(row)))
+        return route
+
+    def repair(self, route):
+        """Drop late stops, then the stops with the least prize per minute
+        saved, until the route is feasible"""
+        inst = self.inst
+        open_, close, dur = inst._open, inst._close, inst._dur
+        kept = []
+        t = 0.0
+        prev = 0
+        for node in route:
+            arr = t + inst.travel[prev, node]
+            if arr > close[node]:
+                continue
+            kept.append(node)
+            t = max(arr, open_[node]) + dur[node]
+            prev = node
+
+        while kept:
+            arrival, _, slack = self.schedule(kept)
+            over_budget = int(inst.cost[kept].sum()) > self.budget
+            if slack.min() >= 0 and not over_budget:
+                break
+            prev = np.array([0] + kept[:-1])
+            nxt = np.array(kept[1:] + [0])
+            node = np.array(kept)
+            saved = (inst.travel[prev, node] + inst.dur[node] + inst.travel[node, nxt]
+                     - inst.travel[prev, nxt])
+            worth = self.prize[node] / np.maximum(saved, 1e-6)
+            if over_budget:
+                worth = self.prize[node] / np.maximum(inst.cost[node], 1)
+            kept.pop(int(np.argmin(worth)))
+        # Individuals must be feasible: confirm the slack bookkeeping against
+        # the full evaluation
+        if not self.evaluate(kept, detailed=False)['feasible']:
+            raise RuntimeError(f"repair() returned an infeasible route: {kept}")
+        return kept
+
+
+def _problem(instance, df, hotel, budget, day_end_min, prizes):
+    inst = instance if instance is not None else TRPInstance(df, hotel)
+    return inst, Orienteering(inst, budget, day_end_min, prizes)
+
+
+def _result(problem, best, start_time, limits, **extra):
+    details = problem.evaluate(best)
+    result = {
+        'best_route': problem.inst.to_ids(best),
+        'best_details': details,
+        'prize': details['prize'],
+        'execution_time': time.time() - start_time,
+        'evaluations': limits.evaluations,
+        'budget_exhausted': limits.exhausted()
+    }
+    result.update(extra)
+    return result
+
+
+def _visit_diversity(pop, best):
+    """Mean Jaccard distance between the visited sets and the best route's"""
+    ref = set(best)
+    dist = 0.0
+    for route in pop:
+        union = len(ref.union(route))
+        dist += 1.0 - len(ref.intersection(route)) / union if union else 0.0
+    return dist / len(pop)
+
+
+class OrienteeringGA:
+    """GA over variable-length routes.
+
+    Individuals are feasible routes of any length. Crossover keeps a prefix
+    of one parent and continues in the other parent's order; mutation drops,
+    swaps out or reverses stops. Every child is repaired (stops dropped
+    until it fits the day) and refilled with the best insertions.
+    """
+
+    def __init__(self, df, city_name, budget, hotel=(0,0), population_size=40,
+                 generations=100, crossover_p=0.85, mutation_p=0.3, seed=42,
+                 instance=None, day_end_min=DAY_END_MIN, prizes=None, noise=0.2,
+                 patience=30, time_limit_ms=None, max_evaluations=None,
+                 on_incumbent=None, history_every=1, history_ring=None):
+        self.city_name = city_name
+        self.budget = budget
+        self.pop_size = population_size
+        self.generations = generations
+        self.cx_p = crossover_p
+        self.mut_p = mutation_p
+        self.noise = noise
+        self.patience = patience
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
+        self.inst, self.problem = _problem(instance, df, hotel, budget, day_end_min, prizes)
+        self.nodes = self.inst.nodes()
+        self.limits = SearchBudget(time_limit_ms, max_evaluations, on_incumbent)
+        if generations is None and patience is None and not self.limits.limited:
+            raise ValueError("generations=None needs patience, time_limit_ms or max_evaluations")
+        self.history = ConvergenceHistory(
+            capacity=generations + 1 if generations else 256,
+            every=history_every, ring=history_ring)
+
+    def initial_pop(self):
+        """One greedy route, the rest randomised greedy constructions"""
+        pop = [self.problem.fill([], self.nodes)]
+        while len(pop) < self.pop_size:
+            pop.append(self.problem.fill([], self.nodes, self.np_rng, self.noise))
+        return pop
+
+    def crossover(self, p1, p2):
+        cut = self.rng.randint(0, len(p1))
+        head = p1[:cut]
+        seen = set(head)
+        return head + [x for x in p2 if x not in seen]
+
+    def mutate(self, route):
+        route = list(route)
+        if not route:
+            return route
+        op = self.rng.randrange(3)
+        if op == 0:
+            # Drop a stop (the refill may pick something better)
+            route.pop(self.rng.randrange(len(route)))
+        elif op == 1:
+            # Swap a stop for a random unvisited attraction
+            visited = set(route)
+            fresh = [x for x in self.nodes if x not in visited]
+            if fresh:
+                route[self.rng.randrange(len(route))] = self.rng.choice(fresh)
+        else:
+            a, b = sorted(self.rng.sample(range(len(route) + 1), 2)) if len(route) > 1 else (0, 1)
+            route[a:b] = route[a:b][::-1]
+        return route
+
+    def tournament_selection(self, pop, scores, k=3):
+        chosen = self.rng.sample(range(len(pop)), min(k, len(pop)))
+        return pop[min(chosen, key=lambda i: scores[i])]
+
+    def run(self):
+        start_time = time.time()
+        limits = self.limits
+        limits.start()
+        problem = self.problem
+        pop = self.initial_pop()
+        best, best_score = None, float('inf')
+        stale = 0
+        generation = 0
+        self.history.reset()
+
+        while self.generations is None or generation < self.generations:
+            scores = [problem.fitness(r) for r in pop]
+            limits.count(len(scores))
+            i = min(range(len(pop)), key=scores.__getitem__)
+            improved = scores[i] < best_score
+            if improved:
+                best, best_score = list(pop[i]), scores[i]
+                stale = 0
+                limits.improved(best_score, self.inst.to_ids(best))
+            else:
+                stale += 1
+            if self.history.wants(generation, improved):
+                self.history.record(generation, best_score, float(np.mean(scores)), max(scores),
+                                    _visit_diversity(pop, best), improved)
+            generation += 1
+            if (self.patience is not None and stale > self.patience) or limits.exhausted():
+                break
+
+            # Elitism - keep best 2
+            order = sorted(range(len(pop)), key=scores.__getitem__)
+            new_pop = [pop[order[0]], pop[order[1 % len(pop)]]]
+            while len(new_pop) < self.pop_size:
+                p1 = self.tournament_selection(pop, scores)
+                p2 = self.tournament_selection(pop, scores)
+                child = self.crossover(p1, p2) if self.rng.random() < self.cx_p else list(p1)
+                if self.rng.random() < self.mut_p:
+                    child = self.mutate(child)
+                child = problem.fill(problem.repair(child), self.nodes, self.np_rng, self.noise)
+                new_pop.append(child)
+            pop = new_pop
+
+        return _result(problem, best, start_time, limits, generations=generation,
+                       fitness_history=self.history.to_records())
+
+
+class OrienteeringALNS:
+    """ALNS with drop / add operators over the visited subset.
+
+    Drop: random, worst (least prize per minute saved) and cluster (a stop
+    and its nearest visited neighbours). Add: greedy insertion by
+    prize^2 / delay, or a noisy version of it. Dropped stops may only come
+    back after every other candidate has had its chance.
+    """
+
+    def __init__(self, df, city_name, budget, hotel=(0,0), iters=500, rnd_seed=42,
+                 w_scores=(6,3,1), decay=0.8, destroy_rate=(0.1,0.4), instance=None,
+                 day_end_min=DAY_END_MIN, prizes=None, noise=0.2, time_limit_ms=None,
+                 max_evaluations=None, on_incumbent=None):
+        self.city = city_name
+        self.budget = budget
+        self.iters = iters
+        self.rng = random.Random(rnd_seed)
+        self.np_rng = np.random.default_rng(rnd_seed)
+        self.w1, self.w2, self.w3 = w_scores
+        self.decay = decay
+        self.destroy_rate = destroy_rate
+        self.noise = noise
+        self.inst, self.problem = _problem(instance, df, hotel, budget, day_end_min, prizes)
+        self.nodes = self.inst.nodes()
+        self.drop_ops = ['random', 'worst', 'cluster']
+        self.add_ops = ['greedy', 'noisy']
+        self.w_drop = {op: 1.0 for op in self.drop_ops}
+        self.w_add = {op: 1.0 for op in self.add_ops}
+        self.limits = SearchBudget(time_limit_ms, max_evaluations, on_incumbent)
+        if iters is None and not self.limits.limited:
+            raise ValueError("iters=None needs time_limit_ms or max_evaluations")
+
+    # Drop operators
+    def op_random_drop(self, route, q):
+        removed = self.rng.sample(route, q)
+        gone = set(removed)
+        return [x for x in route if x not in gone], removed
+
+    def op_worst_drop(self, route, q):
+        inst = self.inst
+        node = np.array(route)
+        prev = np.array([0] + route[:-1])
+        nxt = np.array(route[1:] + [0])
+        saved = (inst.travel[prev, node] + inst.dur[node] + inst.travel[node, nxt]
+                 - inst.travel[prev, nxt])
+        worth = self.problem.prize[node] / np.maximum(saved, 1e-6)
+        removed = node[np.argsort(worth, kind='stable')[:q]].tolist()
+        gone = set(removed)
+        return [x for x in route if x not in gone], removed
+
+    def op_cluster_drop(self, route, q):
+        seed = self.rng.choice(route)
+        rest = np.array(route, dtype=np.int64)
+        removed = rest[np.argsort(self.inst.dist[seed, rest], kind='stable')[:q]].tolist()
+        gone = set(removed)
+        return [x for x in route if x not in gone], removed
+
+    # Add operators
+    def op_add(self, partial, removed, noisy):
+        rng, noise = (self.np_rng, self.noise) if noisy else (None, 0.0)
+        gone = set(removed)
+        route = self.problem.fill(partial, [x for x in self.nodes if x not in gone], rng, noise)
+        return self.problem.fill(route, removed, rng, noise)
+
+    # Adaptive selection
+    def select_op(self, weights):
+        ops = list(weights.keys())
+        x = self.rng.random() * sum(weights.values())
+        c = 0
+        for op in ops:
+            c += weights[op]
+            if x <= c:
+                return op
+        return ops[-1]
+
+    def update_weights(self, w, op, outcome):
+        reward = {1: self.w1, 2: self.w2, 3: self.w3}.get(outcome, 0)
+        w[op] = self.decay * w[op] + (1 - self.decay) * reward
+
+    def run(self):
+        start_time = time.time()
+        limits = self.limits
+        limits.start()
+        problem = self.problem
+        cur = problem.fill([], self.nodes)
+        cur_fit = problem.fitness(cur)
+        limits.count()
+        best, best_fit = list(cur), cur_fit
+        limits.improved(best_fit, self.inst.to_ids(best))
+
+        it = 0
+        while (self.iters is None or it < self.iters) and not limits.exhausted():
+            d_op = self.select_op(self.w_drop)
+            a_op = self.select_op(self.w_add)
+            if cur:
+                q = max(1, int(len(cur) * self.rng.uniform(*self.destroy_rate)))
+                drop = {'random': self.op_random_drop, 'worst': self.op_worst_drop,
+                        'cluster': self.op_cluster_drop}[d_op]
+                partial, removed = drop(cur, min(q, len(cur)))
+            else:
+                partial, removed = [], []
+            cand = self.op_add(partial, removed, a_op == 'noisy')
+            cand_fit = problem.fitness(cand)
+            limits.count()
+
+            accept = False
+            if cand_fit < cur_fit:
+                accept = True; outcome = 2
+            else:
+                T = max(0.01, 1.0 - limits.progress(it, self.iters))
+                if self.rng.random() < math.exp(-(cand_fit - cur_fit) / (1e-6 + T)):
+                    accept = True; outcome = 3
+            if accept:
+                cur, cur_fit = cand, cand_fit
+                self.update_weights(self.w_drop, d_op, outcome)
+                self.update_weights(self.w_add, a_op, outcome)
+                if cur_fit < best_fit:
+                    best, best_fit = list(cur), cur_fit
+                    self.update_weights(self.w_drop, d_op, 1)
+                    self.update_weights(self.w_add, a_op, 1)
+                    limits.improved(best_fit, self.inst.to_ids(best))
+            it += 1
+
+        return _result(problem, best, start_time, limits, iterations=it)
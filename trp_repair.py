@@ -0,0 +1,252 @@
+# Insertion-table repair for ALNS: greedy and regret-k insertion
+#
+# The fitness of inserting pending node a at position c of a partial route
+# splits into edge terms that depend only on (a, route[c-1], route[c]) and
+# schedule terms read from the DeltaEvaluator's prefix / suffix arrays. The
+# table keeps the edge terms as item x position matrices; inserting a node
+# shifts the columns after it and recomputes only the two columns whose
+# neighbours changed. The schedule terms are O(m) per route and are combined
+# with the table in one vectorized pass, exactly as DeltaEvaluator.replace
+# would score each entry one at a time.
+#
+# With a TimeWindowTable, insertions certain to make a node late are not
+# scored at all (their cost is inf) as long as the item has another
+# position left.
+
+import numpy as np
+
+from trp_instance import LATE_PENALTY_MIN
+
+# Below this many (item, position) entries the scalar DeltaEvaluator path is
+# faster than the vectorized pass
+SCALAR_ENTRIES = 128
+
+
+class InsertionTable:
+    """Fitness of inserting each pending node at each position of a route.
+
+    Column c means "insert before route[c]" (c == len(route) appends).
+    Entries whose insertion pushes a suffix node across a time-window
+    boundary walk their suffixes as DeltaEvaluator.replace does, all such
+    entries together. `windows` (a TimeWindowTable) skips hopeless entries.
+    """
+
+    def __init__(self, ev, route, items, windows=None):
+        self.ev = ev
+        self.windows = windows if windows is not None and windows.active else None
+        inst = ev.inst
+        self.dist, self.travel = inst.dist, inst.travel
+        self.route = list(route)
+        self.items = list(items)
+        q, m = len(self.items), len(self.route)
+
+        a = np.asarray(self.items, dtype=np.intp)
+        self.open_ = inst.open_min[a][:, None]
+        self.close = inst.close_min[a][:, None]
+        self.dur = inst.dur[a][:, None]
+        self.cost = inst.cost[a][:, None]
+
+        # Edge terms with room for every pending insertion
+        cap = m + q + 1
+        self.d_in = np.empty((q, cap))
+        self.t_in = np.empty((q, cap))
+        self.d_out = np.empty((q, cap))
+        self.t_out = np.empty((q, cap))
+        prev = np.array([0] + self.route, dtype=np.intp)
+        nxt = np.array(self.route + [0], dtype=np.intp)
+        self._fill(slice(0, m + 1), prev, nxt)
+        ev.load(self.route)
+
+    def __len__(self):
+        return len(self.items)
+
+    def _fill(self, cols, prev, nxt):
+        a = np.asarray(self.items, dtype=np.intp)[:, None]
+        self.d_in[:len(self.items), cols] = self.dist[prev[None, :], a]
+        self.t_in[:len(self.items), cols] = self.travel[prev[None, :], a]
+        self.d_out[:len(self.items), cols] = self.dist[a, nxt[None, :]]
+        self.t_out[:len(self.items), cols] = self.travel[a, nxt[None, :]]
+
+    def costs(self, rows=None):
+        """Fitness matrix (len(rows) x len(route)+1); all pending items by default"""
+        ev = self.ev
+        m = len(self.route)
+        w = m + 1
+        rows = slice(0, len(self.items)) if rows is None else rows
+        skip = (self.windows.skip(self.items[rows], self.route)
+                if self.windows is not None else None)
+        if len(self.items[rows]) * w < SCALAR_ENTRIES:
+            if skip is None:
+                return np.array([[ev.insert(a, c) for c in range(w)]
+                                 for a in self.items[rows]]).reshape(-1, w)
+            return np.array([[np.inf if s else ev.insert(a, c) for c, s in enumerate(row)]
+                             for a, row in zip(self.items[rows], skip.tolist())]).reshape(-1, w)
+        d_in, t_in = self.d_in[rows, :w], self.t_in[rows, :w]
+        d_out, t_out = self.d_out[rows, :w], self.t_out[rows, :w]
+        open_, close = self.open_[rows], self.close[rows]
+        dur, cost = self.dur[rows], self.cost[rows]
+
+        T = np.asarray(ev.T)
+        D = np.asarray(ev.D)
+        V = np.asarray(ev.V)
+        C = np.asarray(ev.C)
+
+        # The inserted node itself
+        d = D + d_in
+        t = np.maximum(T + t_in, open_)
+        late = t > close
+        viol = V + late
+        t = t + np.where(late, LATE_PENALTY_MIN, 0) + dur
+        node_cost = C + cost
+
+        total_dist = np.empty_like(d)
+        total_time = np.empty_like(t)
+        total_viol = viol.copy()
+        total_cost = node_cost.copy()
+        fallback = np.zeros(d.shape, dtype=bool)
+
+        # Appending: the route closes at the hotel
+        total_dist[:, m] = d[:, m] + d_out[:, m]
+        total_time[:, m] = t[:, m] + t_out[:, m]
+
+        # Inserting before route[c]: shift the suffix by the arrival change
+        if m:
+            arrival = np.asarray(ev.arrival)
+            S, W = np.asarray(ev.S[:m]), np.asarray(ev.W[:m])
+            E, L = np.asarray(ev.E[:m]), np.asarray(ev.L[:m])
+            delta = t[:, :m] + t_out[:, :m] - arrival
+            fallback[:, :m] = ((delta > 0) & (delta > S)) | ((delta < 0) & (-delta >= L))
+            shift = np.where(delta > 0, np.maximum(0.0, delta - W),
+                             np.where(delta < 0, np.maximum(delta, -E), 0.0))
+            total_dist[:, :m] = d[:, :m] + (d_out[:, :m] + (ev.end_dist - D[1:]))
+            total_time[:, :m] = ev.end_time + shift
+            total_viol[:, :m] += V[m] - V[:m]
+            total_cost[:, :m] += C[m] - C[:m]
+
+        fit = _fitness(total_dist, total_time, total_viol, total_cost, ev.budget)
+        if skip is not None:
+            fit[skip] = np.inf
+            fallback &= ~skip
+        ev.delta_evaluations += fit.size - int(fallback.sum()) - (int(skip.sum()) if skip is not None else 0)
+        if fallback.any():
+            r, c = np.nonzero(fallback)
+            items = np.asarray(self.items)[rows][r]
+            fit[r, c] = self._walk(items, c, d[r, c], t[r, c], viol[r, c],
+                                   node_cost[r, c])
+        return fit
+
+    def _walk(self, prev, j, d, t, viol, total_cost):
+        """Entries whose shift crosses a time-window boundary: simulate their
+        suffixes in lockstep until the remaining shift is O(1) again"""
+        ev = self.ev
+        inst = ev.inst
+        m = len(self.route)
+        route = np.asarray(self.route + [0])
+        arrival = np.asarray(ev.arrival + [0.0])
+        S, W, E, L = (np.asarray(x) for x in (ev.S, ev.W, ev.E, ev.L))
+        D, V, C = np.asarray(ev.D), np.asarray(ev.V), np.asarray(ev.C)
+        ev.full_evaluations += len(j)
+
+        out = np.empty(len(j))
+        live = np.arange(len(j))
+        while live.size:
+            end = j >= m
+            if end.any():
+                e = live[end]
+                out[e] = _fitness(d[end] + self.dist[prev[end], 0],
+                                  t[end] + self.travel[prev[end], 0],
+                                  viol[end], total_cost[end], ev.budget)
+                keep = ~end
+                live, prev, j, d, t, viol, total_cost = (
+                    x[keep] for x in (live, prev, j, d, t, viol, total_cost))
+                if not live.size:
+                    break
+
+            nxt = route[j]
+            delta = t + self.travel[prev, nxt] - arrival[j]
+            ok = np.where(delta > 0, delta <= S[j], np.where(delta < 0, -delta < L[j], True))
+            if ok.any():
+                k, jk, nk = live[ok], j[ok], nxt[ok]
+                dk = delta[ok]
+                shift = np.where(dk > 0, np.maximum(0.0, dk - W[jk]),
+                                 np.where(dk < 0, np.maximum(dk, -E[jk]), 0.0))
+                out[k] = _fitness(d[ok] + (self.dist[prev[ok], nk] + (ev.end_dist - D[jk + 1])),
+                                  ev.end_time + shift,
+                                  viol[ok] + (V[m] - V[jk]),
+                                  total_cost[ok] + (C[m] - C[jk]), ev.budget)
+                keep = ~ok
+                live, prev, j, d, t, viol, total_cost, nxt = (
+                    x[keep] for x in (live, prev, j, d, t, viol, total_cost, nxt))
+
+            # Visit route[j] on the shifted clock and move on
+            d = d + self.dist[prev, nxt]
+            t = np.maximum(t + self.travel[prev, nxt], inst.open_min[nxt])
+            late = t > inst.close_min[nxt]
+            viol = viol + late
+            t = t + np.where(late, LATE_PENALTY_MIN, 0) + inst.dur[nxt]
+            total_cost = total_cost + inst.cost[nxt]
+            prev = nxt
+            j = j + 1
+        return out
+
+    def insert(self, row, pos):
+        """Insert pending item `row` before route[pos] and update the table"""
+        node = self.items.pop(row)
+        q = len(self.items)
+        m = len(self.route)
+        for arr in (self.d_in, self.t_in, self.d_out, self.t_out):
+            arr[row:q] = arr[row + 1:q + 1]
+            # Columns after pos keep their neighbours, one place to the right
+            arr[:q, pos + 2:m + 2] = arr[:q, pos + 1:m + 1]
+        self.route.insert(pos, node)
+        for name in ('open_', 'close', 'dur', 'cost'):
+            setattr(self, name, np.delete(getattr(self, name), row, axis=0))
+
+        # Only the two positions next to the new node see new neighbours
+        route = self.route
+        prev = np.array([route[pos - 1] if pos > 0 else 0, node], dtype=np.intp)
+        nxt = np.array([node, route[pos + 1] if pos + 1 < len(route) else 0], dtype=np.intp)
+        if q:
+            self._fill(slice(pos, pos + 2), prev, nxt)
+            self.ev.load(route)
+        return node
+
+
+def greedy_insert(ev, route, items, windows=None):
+    """Insert `items` in the given order, each at its cheapest position"""
+    table = InsertionTable(ev, route, items, windows)
+    while len(table):
+        table.insert(0, int(np.argmin(table.costs(slice(0, 1))[0])))
+    return table.route
+
+
+def regret_insert(ev, route, items, k=2, windows=None):
+    """Regret-k insertion: repeatedly insert the item whose k-1 next-best
+    positions lose the most against its best one (ties go to the earlier item).
+    k=1 reduces to choosing the globally cheapest insertion; an item with a
+    single position left (see `windows`) has infinite regret."""
+    table = InsertionTable(ev, route, items, windows)
+    while len(table):
+        fit = table.costs()
+        best_pos = np.argmin(fit, axis=1)
+        h = min(k, fit.shape[1])
+        if h > 1:
+            nearest = np.sort(np.partition(fit, h - 1, axis=1)[:, :h], axis=1)
+            regret = (nearest[:, 1:] - nearest[:, :1]).sum(axis=1)
+        else:
+            regret = np.zeros(len(fit))
+        best = fit[np.arange(len(fit)), best_pos]
+        gain = -best + 0.01 * regret
+        row = int(np.argmax(gain))
+        table.insert(row, int(best_pos[row]))
+    return table.route
+
+
+def _fitness(total_dist, total_time, time_violations, total_cost, budget):
+    """Vectorized DeltaEvaluator._fitness (same penalty formula and order)"""
+    fit = total_dist + total_time / 60.0
+    over_budget = total_cost - budget
+    penalized = (time_violations > 0) | (over_budget > 0)
+    return np.where(penalized,
+                    fit + 5000 + time_violations * 1000 + np.maximum(0, over_budget) * 0.01,
+                    fit)
@@ -0,0 +1,490 @@
+# Batch route-planning service: JSON over HTTP (TCP or Unix socket)
+#
+# A long-running asyncio server accepts planning requests, queues them and
+# hands them to a pool of warm worker processes. Each worker loads the
+# registered instance files once at start-up (np.memmap, so all workers
+# share the pages) and keeps an LRU cache of instances built from inline
+# attraction lists, so repeated requests never rebuild their matrices.
+#
+#   python trp_service.py --port 8765 --workers 4 --instance hanoi=hanoi.trpi
+#   python trp_service.py --unix /tmp/trp.sock --workers 4
+#
+#   POST /plan    {"instance": "hanoi", "budget": 400000, "time_limit_ms": 500}
+#                 {"attractions": [{"id": 1, "x": 0.4, "y": -1.2, "open_min": 0,
+#                   "close_min": 480, "duration": 60, "cost": 20000}, ...],
+#                  "hotel": [0, 0], "budget": 400000, "algorithm": "ALNS",
+#                  "params": {"iters": 500}, "seed": 7}
+#   GET  /stats   queue depth, in-flight and finished requests, and
+#                 p50/p90/p99 of queue wait, solve time and total latency
+#   GET  /health
+#
+# Requests wait in a bounded queue in this process, so the queue depth is
+# exact and a full queue is answered with 503 at once instead of growing
+# without bound; one dispatcher per worker feeds the pool.
+# Instance files are written with trp_data.save_instance.
+
+import argparse
+import asyncio
+import hashlib
+import http.client
+import json
+import math
+import os
+import socket
+import stat
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+DEFAULT_ALGORITHM = 'ALNS'
+QUEUE_SIZE = 1000
+# Inline-attraction instances kept per worker
+INSTANCE_CACHE = 32
+# Finished requests the latency percentiles are computed over
+LATENCY_WINDOW = 10000
+# Largest request body accepted (bytes)
+MAX_BODY = 16 * 1024 * 1024
+ATTRACTION_FIELDS = ('id', 'x', 'y', 'open_min', 'close_min', 'duration', 'cost')
+
+
+class RequestError(ValueError):
+    """A planning request that cannot be served; `status` is the HTTP code"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+    def __reduce__(self):
+        # Raised in workers too: keep the status across the process boundary
+        return type(self), (str(self), self.status)
+
+
+# Worker process state: registered instances loaded by the initializer,
+# inline-attraction instances cached on first use
+_REGISTERED = {}
+_CACHE = OrderedDict()
+
+
+def _init_worker(instance_files):
+    from trp_data import load_instance
+    import trp_experiments  # noqa: F401  (import the solvers while warming up)
+
+    _REGISTERED.clear()
+    _CACHE.clear()
+    for name, path in instance_files.items():
+        _REGISTERED[name] = load_instance(path)
+
+
+def _ping():
+    return os.getpid()
+
+
+def _instance(request):
+    """(TRPInstance, cache hit) for a validated request"""
+    from trp_instance import TRPInstance
+
+    if 'instance' in request:
+        return _REGISTERED[request['instance']], True
+    key = request['_key']
+    inst = _CACHE.get(key)
+    if inst is not None:
+        _CACHE.move_to_end(key)
+        return inst, True
+    import pandas as pd
+    df = pd.DataFrame(request['attractions'], columns=list(ATTRACTION_FIELDS))
+    inst = _CACHE[key] = TRPInstance(df, tuple(request['hotel']))
+    if len(_CACHE) > INSTANCE_CACHE:
+        _CACHE.popitem(last=False)
+    return inst, False
+
+
+def _solve(request):
+    """Worker entry point: solve one request, returns the JSON response"""
+    from trp_experiments import ALGORITHMS
+
+    start = time.perf_counter()
+    inst, cached = _instance(request)
+    params = dict(request.get('params') or {})
+    if request.get('time_limit_ms') is not None:
+        params['time_limit_ms'] = request['time_limit_ms']
+    try:
+        solver = ALGORITHMS[request['algorithm']](inst, request.get('city'), request['budget'],
+                                                  request.get('seed', 42), params)
+    except (TypeError, ValueError) as exc:
+        # Unknown or invalid solver params are the client's mistake
+        raise RequestError(f"Invalid params for {request['algorithm']}: {exc}") from None
+    result = solver.run()
+    details = result['best_details'] or {}
+    return _jsonable({
+        'id': request.get('id'),
+        'route': result['best_route'],
+        'fitness': details.get('fitness'),
+        'feasible': details.get('feasible'),
+        'total_dist': details.get('total_dist'),
+        'total_cost': details.get('total_cost'),
+        'total_time': details.get('total_time'),
+        'violations': details.get('violations'),
+        'schedule': details.get('route_times'),
+        'algorithm': request['algorithm'],
+        'evaluations': result.get('evaluations'),
+        'instance_cached': cached,
+        'worker': os.getpid(),
+        'solve_ms': (time.perf_counter() - start) * 1000.0
+    })
+
+
+def _jsonable(value):
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _number(value, what):
+    """`value` as a finite float (RequestError otherwise; bools are refused)"""
+    try:
+        if isinstance(value, bool):
+            raise TypeError
+        value = float(value)
+    except (TypeError, ValueError):
+        raise RequestError(f"{what} must be a number, got {value!r}") from None
+    if not math.isfinite(value):
+        raise RequestError(f"{what} must be finite, got {value!r}")
+    return value
+
+
+def validate(request, instances):
+    """Check a decoded request and fill in defaults; raises RequestError"""
+    from trp_experiments import ALGORITHMS
+
+    if not isinstance(request, dict):
+        raise RequestError("The request body must be a JSON object")
+    request = dict(request)
+    if ('instance' in request) == ('attractions' in request):
+        raise RequestError("Give exactly one of 'instance' and 'attractions'")
+    if 'instance' in request:
+        if request['instance'] not in instances:
+            raise RequestError(f"Unknown instance: {request['instance']!r}", 404)
+        if 'hotel' in request:
+            raise RequestError("The hotel of a registered instance is fixed")
+    else:
+        attractions = request['attractions']
+        if not isinstance(attractions, list) or not attractions:
+            raise RequestError("'attractions' must be a non-empty list")
+        clean = []
+        for a in attractions:
+            if not isinstance(a, dict):
+                raise RequestError("Every attraction must be an object")
+            missing = [f for f in ATTRACTION_FIELDS if f not in a]
+            if missing:
+                raise RequestError(f"Attraction {a.get('id')!r} lacks {', '.join(missing)}")
+            row = {f: _number(a[f], f"Attraction {a['id']!r} field {f!r}")
+                   for f in ATTRACTION_FIELDS}
+            if not row['id'].is_integer():
+                raise RequestError(f"Attraction id must be an integer, got {a['id']!r}")
+            row['id'] = int(row['id'])
+            clean.append(row)
+        request['attractions'] = attractions = clean
+        hotel = request.get('hotel', [0, 0])
+        if not isinstance(hotel, (list, tuple)) or len(hotel) != 2:
+            raise RequestError("'hotel' must be [x, y]")
+        request['hotel'] = hotel = [_number(c, "'hotel'") for c in hotel]
+        key = json.dumps([hotel, [[a[f] for f in ATTRACTION_FIELDS] for a in attractions]])
+        request['_key'] = hashlib.sha1(key.encode()).hexdigest()
+    if 'budget' not in request:
+        raise RequestError("'budget' (a number) is required")
+    request['budget'] = _number(request['budget'], "'budget'")
+    if request['budget'] < 0:
+        raise RequestError("'budget' must not be negative")
+    request.setdefault('algorithm', DEFAULT_ALGORITHM)
+    if request['algorithm'] not in ALGORITHMS:
+        raise RequestError(f"Unknown algorithm: {request['algorithm']!r}")
+    if request.get('params') is not None and not isinstance(request['params'], dict):
+        raise RequestError("'params' must be an object")
+    limit = request.get('time_limit_ms')
+    if limit is not None and (not isinstance(limit, (int, float)) or limit <= 0):
+        raise RequestError("'time_limit_ms' must be a positive number")
+    return request
+
+
+class LatencyWindow:
+    """Latencies of the last `size` finished requests, as a ring of arrays"""
+
+    FIELDS = ('queue_ms', 'solve_ms', 'total_ms')
+
+    def __init__(self, size=LATENCY_WINDOW):
+        self.data = np.zeros((size, len(self.FIELDS)))
+        self.count = 0
+
+    def add(self, queue_ms, solve_ms, total_ms):
+        self.data[self.count % len(self.data)] = (queue_ms, solve_ms, total_ms)
+        self.count += 1
+
+    def percentiles(self, qs=(50, 90, 99)):
+        held = self.data[:min(self.count, len(self.data))]
+        if not len(held):
+            return {}
+        table = np.percentile(held, qs, axis=0)
+        return {name: dict({f'p{q}': float(table[i, j]) for i, q in enumerate(qs)},
+                           mean=float(held[:, j].mean()), max=float(held[:, j].max()))
+                for j, name in enumerate(self.FIELDS)}
+
+
+class PlanningService:
+    """Queue + warm worker pool; `plan()` is the in-process entry point.
+
+    instance_files maps instance ids to files written by save_instance.
+    workers=None uses one process per core.
+    """
+
+    def __init__(self, instance_files=None, workers=None, queue_size=QUEUE_SIZE):
+        self.instance_files = dict(instance_files or {})
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.latency = LatencyWindow()
+        # invalid: requests a worker refused (e.g. unknown solver params);
+        # failed: requests that crashed in the worker
+        self.counters = {'accepted': 0, 'completed': 0, 'invalid': 0, 'failed': 0,
+                         'rejected': 0}
+        self.in_flight = 0
+        self.pool = None
+
+    async def start(self):
+        from trp_data import instance_meta
+
+        # Fail here, not in every worker's initializer, on a bad instance file
+        for path in self.instance_files.values():
+            instance_meta(path)
+        self.started = time.time()
+        self.queue = asyncio.Queue(self.queue_size)
+        self.pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                        initargs=(self.instance_files,))
+        # Start (and warm) every worker before the first request arrives
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _ping)
+                               for _ in range(self.workers)))
+        self.dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self.dispatchers:
+            task.cancel()
+        await asyncio.gather(*self.dispatchers, return_exceptions=True)
+        self.pool.shutdown(cancel_futures=True)
+
+    async def plan(self, request):
+        """Validate, queue and solve one request; returns the JSON response"""
+        request = validate(request, self.instance_files)
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((request, time.perf_counter(), future))
+        except asyncio.QueueFull:
+            self.counters['rejected'] += 1
+            raise RequestError("Queue full, retry later", 503) from None
+        self.counters['accepted'] += 1
+        return await future
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            request, queued, future = await self.queue.get()
+            started = time.perf_counter()
+            self.in_flight += 1
+            try:
+                response = await loop.run_in_executor(self.pool, _solve, request)
+            except RequestError as exc:
+                self.counters['invalid'] += 1
+                if not future.done():
+                    future.set_exception(exc)
+            except Exception as exc:
+                self.counters['failed'] += 1
+                if not future.done():
+                    future.set_exception(exc)
+            else:
+                done = time.perf_counter()
+                response['queue_ms'] = (started - queued) * 1000.0
+                response['latency_ms'] = (done - queued) * 1000.0
+                self.latency.add(response['queue_ms'], response['solve_ms'], response['latency_ms'])
+                self.counters['completed'] += 1
+                if not future.done():
+                    future.set_result(response)
+            finally:
+                self.in_flight -= 1
+                self.queue.task_done()
+
+    def stats(self):
+        uptime = time.time() - self.started
+        return dict(self.counters,
+                    queue_depth=self.queue.qsize(),
+                    queue_size=self.queue_size,
+                    in_flight=self.in_flight,
+                    workers=self.workers,
+                    instances=sorted(self.instance_files),
+                    uptime_s=uptime,
+                    completed_per_hour=self.counters['completed'] / uptime * 3600 if uptime else 0.0,
+                    latency=self.latency.percentiles())
+
+
+# Minimal HTTP/1.1 front end (keep-alive, Content-Length bodies)
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+async def _read_request(reader):
+    """(method, path, headers, body) of the next request, None at EOF"""
+    line = await reader.readline()
+    if not line:
+        return None
+    method, path, _ = line.decode('latin-1').split(' ', 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    if length > MAX_BODY:
+        raise RequestError("Request body too large", 413)
+    body = await reader.readexactly(length) if length else b''
+    return method, path, headers, body
+
+
+def _write_response(writer, status, payload, keep_alive):
+    body = json.dumps(payload).encode()
+    head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    writer.write(head.encode('latin-1') + body)
+
+
+async def _route(service, method, path, body):
+    """(status, payload) for one HTTP request"""
+    path = path.split('?', 1)[0]
+    if path == '/plan':
+        if method != 'POST':
+            return 405, {'error': "Use POST /plan"}
+        try:
+            request = json.loads(body or b'null')
+        except ValueError as exc:
+            return 400, {'error': f"Invalid JSON: {exc}"}
+        return 200, await service.plan(request)
+    if path == '/stats' and method == 'GET':
+        return 200, service.stats()
+    if path == '/health' and method == 'GET':
+        return 200, {'status': 'ok'}
+    return 404, {'error': f"No route for {method} {path}"}
+
+
+def _handler(service):
+    async def handle(reader, writer):
+        try:
+            while True:
+                try:
+                    parsed = await _read_request(reader)
+                except (ValueError, asyncio.IncompleteReadError) as exc:
+                    status = exc.status if isinstance(exc, RequestError) else 400
+                    _write_response(writer, status, {'error': str(exc)}, False)
+                    break
+                if parsed is None:
+                    break
+                method, path, headers, body = parsed
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                try:
+                    status, payload = await _route(service, method, path, body)
+                except RequestError as exc:
+                    status, payload = exc.status, {'error': str(exc)}
+                except Exception as exc:
+                    status, payload = 500, {'error': f"{type(exc).__name__}: {exc}"}
+                _write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+    return handle
+
+
+async def serve(service, host='127.0.0.1', port=8765, unix_path=None, ready=None):
+    """Run the HTTP front end until cancelled; `ready` (an asyncio.Event)
+    is set once the socket accepts connections"""
+    await service.start()
+    try:
+        if unix_path is not None:
+            # A socket file left behind by a killed server blocks the bind
+            if os.path.exists(unix_path) and stat.S_ISSOCK(os.stat(unix_path).st_mode):
+                os.unlink(unix_path)
+            server = await asyncio.start_unix_server(_handler(service), unix_path)
+        else:
+            server = await asyncio.start_server(_handler(service), host, port)
+        async with server:
+            if ready is not None:
+                ready.set()
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout=None):
+        super().__init__('localhost', timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+def call(method, path, payload=None, host='127.0.0.1', port=8765, unix_path=None,
+         timeout=None):
+    """Client helper: one request to a running service, returns
+    (status, decoded JSON)"""
+    conn = (_UnixConnection(unix_path, timeout) if unix_path is not None
+            else http.client.HTTPConnection(host, port, timeout=timeout))
+    try:
+        body = json.dumps(payload).encode() if payload is not None else None
+        conn.request(method, path, body, {'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TRP route-planning service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help="serve on this Unix socket instead of TCP")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE)
+    parser.add_argument('--instance', action='append', default=[], metavar='ID=PATH',
+                        help="register an instance file written by save_instance")
+    args = parser.parse_args(argv)
+
+    instance_files = {}
+    for spec in args.instance:
+        name, sep, path = spec.partition('=')
+        if not sep:
+            parser.error(f"--instance expects ID=PATH, got {spec!r}")
+        instance_files[name] = path
+    service = PlanningService(instance_files, args.workers, args.queue_size)
+    where = args.unix or f"http://{args.host}:{args.port}"
+    print(f"🚀 Serving on {where} with {service.workers} workers")
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,72 @@
+# Hand a TRPInstance to worker processes through shared memory
+#
+# The parent copies each instance array into a SharedMemory block once; the
+# workers receive only a small picklable spec (block names, shapes, dtypes)
+# and map the same memory, so the matrices are never pickled per task.
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from trp_instance import TRPInstance
+
+
+def share_instance(inst):
+    """Copy the instance arrays into shared memory.
+
+    Returns (spec, handles). Send `spec` to the workers; keep `handles`
+    alive in the parent and pass them to `release(handles, unlink=True)`
+    once the workers are done.
+    """
+    handles = []
+    fields = {}
+    for name, arr in inst.arrays().items():
+        arr = np.ascontiguousarray(arr)
+        shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+        handles.append(shm)
+        fields[name] = (shm.name, arr.shape, arr.dtype.str)
+    spec = {
+        'ids': list(inst.ids),
+        'hotel': tuple(inst.hotel),
+        'minutes_per_unit': inst.minutes_per_unit,
+        'euclidean': inst.euclidean,
+        'time_slots': inst.time_slots,
+        'fields': fields
+    }
+    return spec, handles
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        # Older versions register the block again on attach. Workers started
+        # by multiprocessing share the parent's resource tracker, for which
+        # that is a no-op, so the parent's unlink stays the only cleanup.
+        return shared_memory.SharedMemory(name=name)
+
+
+def attach_instance(spec):
+    """Worker side: build a TRPInstance over the shared blocks (no copies).
+
+    Returns (instance, handles); the handles must outlive the instance.
+    """
+    handles = []
+    arrays = {}
+    for name, (shm_name, shape, dtype) in spec['fields'].items():
+        shm = _attach(shm_name)
+        handles.append(shm)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    inst = TRPInstance.from_arrays(spec['ids'], arrays, spec['hotel'],
+                                   spec['minutes_per_unit'], euclidean=spec['euclidean'],
+                                   time_slots=spec['time_slots'])
+    return inst, handles
+
+
+def release(handles, unlink=False):
+    """Close shared blocks; the parent also unlinks them"""
+    for shm in handles:
+        shm.close()
+        if unlink:
+            shm.unlink()
@@ -0,0 +1,174 @@
+# Spatial index over attraction coordinates for nearest-neighbour queries
+#
+# Construction heuristics (Greedy, the GA's nearest-neighbour seeding, the
+# ALNS initial solution) repeatedly ask for the few nearest attractions not
+# yet visited. Scanning and sorting every unvisited node makes one
+# construction O(n^2 log n); with a uniform grid, precomputed k-nearest
+# candidate lists and per-query deletion, most queries touch O(k) nodes.
+#
+# Neighbours are ranked by (inst.dist, node index), which is exactly the
+# order a stable sort of the unvisited list by distance produces, so the
+# heuristics build the same routes as before.
+#
+# The grid search prunes with straight-line distances, so it is only used
+# when inst.dist is Euclidean; with road-network matrices (asymmetric,
+# detours) queries rank the unvisited nodes by their inst.dist row instead.
+
+import math
+
+import numpy as np
+
+# Precomputed neighbours per node
+CANDIDATES = 16
+
+# Target number of nodes per grid cell
+CELL_LOAD = 2
+
+
+class SpatialIndex:
+    """Uniform grid over the attractions (nodes 1..n) of one instance.
+
+    Queries may start from any node, including the hotel (node 0). Build it
+    once per instance with `TRPInstance.spatial_index()`; per-construction
+    state (what is still unvisited) lives in `Unvisited` views.
+    """
+
+    def __init__(self, inst, candidates=CANDIDATES):
+        self.inst = inst
+        self.dist = inst.dist
+        self.euclidean = inst.euclidean
+        n = inst.n
+        xy = inst.xy[1:]
+        self.lo = xy.min(axis=0) if n else np.zeros(2)
+        span = float((xy.max(axis=0) - self.lo).max()) if n else 0.0
+        side = max(1, int(math.ceil(math.sqrt(n / CELL_LOAD))))
+        self.side = side
+        self.cell = span / side if span > 0 else 1.0
+
+        # Cell of every node (the hotel may lie outside the attraction box)
+        self.cell_of = self._cells(inst.xy)
+        flat = self.cell_of[1:, 0] * side + self.cell_of[1:, 1]
+        order = np.argsort(flat, kind='stable')
+        bounds = np.searchsorted(flat[order], np.arange(side * side + 1))
+        nodes = order + 1
+        self.members = [nodes[bounds[c]:bounds[c + 1]] for c in range(side * side)]
+
+        self.k = min(candidates, n)
+        self._candidates = None
+        self._candidate_lists = None
+
+    def _cells(self, xy):
+        c = np.floor((np.asarray(xy) - self.lo) / self.cell).astype(np.int64)
+        return np.clip(c, 0, self.side - 1)
+
+    def _rank(self, node, cand):
+        """Sort candidate nodes by (distance from node, index)"""
+        d = self.dist[node, cand]
+        order = np.lexsort((cand, d))
+        return cand[order], d[order]
+
+    def candidates(self):
+        """(n+1) x k array: the k nearest attractions of every node"""
+        if self._candidates is None:
+            everything = Unvisited(self, use_candidates=False)
+            cand = np.zeros((self.inst.n + 1, self.k), dtype=np.int64)
+            for node in range(self.inst.n + 1):
+                near = everything.nearest(node, self.k + 1)
+                near = [x for x in near if x != node][:self.k]
+                cand[node, :len(near)] = near
+            self._candidates = cand
+        return self._candidates
+
+    def candidate_lists(self):
+        """`candidates()` as plain lists (fast to scan from Python)"""
+        if self._candidate_lists is None:
+            self._candidate_lists = self.candidates().tolist()
+        return self._candidate_lists
+
+    def unvisited(self, nodes=None):
+        """Fresh view with `nodes` (default: all attractions) unvisited"""
+        return Unvisited(self, nodes)
+
+
+class Unvisited:
+    """The unvisited attractions of one construction, with deletion and
+    k-nearest queries"""
+
+    def __init__(self, index, nodes=None, use_candidates=True):
+        self.index = index
+        n = index.inst.n
+        # One buffer, seen as bytes for scalar checks and as an array for masks
+        self._flags = bytearray(n + 1)
+        self.alive = np.frombuffer(self._flags, dtype=bool)
+        if nodes is None:
+            self.alive[1:] = True
+        else:
+            self.alive[np.asarray(list(nodes), dtype=np.int64)] = True
+        self.count = int(self.alive.sum())
+        self._cand = index.candidate_lists() if use_candidates else None
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, node):
+        return bool(self._flags[node])
+
+    def remove(self, node):
+        if self._flags[node]:
+            self._flags[node] = 0
+            self.count -= 1
+
+    def retain(self, mask):
+        """Drop every unvisited node where the boolean `mask` is False"""
+        self.alive &= mask
+        self.count = int(self.alive.sum())
+
+    def nodes(self):
+        """Unvisited nodes in index order"""
+        return np.flatnonzero(self.alive).tolist()
+
+    def nearest(self, node, k=1):
+        """Up to k unvisited attractions nearest to `node`, closest first"""
+        index = self.index
+        k = min(k, self.count)
+        if k <= 0:
+            return []
+
+        # Fast path: the precomputed neighbour list is a prefix of the full
+        # ranking, so its first k unvisited entries are the answer
+        if self._cand is not None:
+            flags = self._flags
+            hit = [c for c in self._cand[node] if flags[c]]
+            if len(hit) >= k:
+                return hit[:k]
+
+        # Few nodes left, a sparse grid or non-Euclidean distances: rank them all
+        side = index.side
+        if not index.euclidean or self.count * self.count <= 64 * k * side * side:
+            cand, _ = index._rank(node, np.flatnonzero(self.alive))
+            return cand[:k].tolist()
+
+        # Grid search in growing square rings around the node's cell
+        cx, cy = index.cell_of[node]
+        found = []
+        best = None
+        r = 0
+        while True:
+            for x in range(cx - r, cx + r + 1):
+                if x < 0 or x >= side:
+                    continue
+                ys = range(cy - r, cy + r + 1) if x in (cx - r, cx + r) else (cy - r, cy + r)
+                for y in ys:
+                    if 0 <= y < side:
+                        members = index.members[x * side + y]
+                        if len(members):
+                            found.append(members[self.alive[members]])
+            if found:
+                best, d = index._rank(node, np.concatenate(found))
+                # Anything outside ring r is at least r cells away
+                if len(best) >= k and d[k - 1] < r * index.cell * (1 - 1e-9):
+                    break
+            if r >= side:
+                break
+            r += 1
+        return best[:k].tolist()
@@ -0,0 +1,243 @@
+# Travel-time providers: where an instance's distance / travel matrices come from
+#
+# A provider turns the node coordinates (hotel at row 0) and attraction ids
+# into the dense (n+1)x(n+1) `dist` and `travel` matrices of a TRPInstance.
+# Solvers never call a provider; they keep reading the instance matrices, so
+# every lookup stays a single array access whatever the source.
+#
+#   EuclideanTravel    straight-line distance x minutes per unit (the default)
+#   DenseTravel        a full, possibly asymmetric matrix (.npy / .csv)
+#   SparseTravel       travel times for some pairs only, e.g. the k nearest
+#                      neighbours of each node from a routing engine; other
+#                      pairs fall back to Euclidean x minutes per unit
+#   TimeDependentTravel another provider's times scaled by a piecewise-constant
+#                      factor of the departure time (rush hours)
+#
+#   inst = TRPInstance(df, hotel, travel=DenseTravel.load('osm_minutes.npy'))
+#
+# Matrices are indexed [from, to]; nothing assumes dist or travel to be
+# symmetric. Files label the hotel with `hotel_id` (0 by default).
+#
+# Time-dependent travel is applied by TRPInstance.evaluate / evaluate_batch,
+# so every solver that scores routes with them (GA, Random, Greedy, island
+# GA) plans with it. The instance matrices hold the free-flow times, a lower
+# bound for every slot, which keeps the time-window pruning of trp_windows
+# sound. Incremental scoring (DeltaEvaluator, and with it ALNS, the memetic
+# GA and the multi-day relocation) and the orienteering slack tables assume
+# static times and refuse time-dependent instances for now.
+
+import abc
+from bisect import bisect_right
+
+import numpy as np
+
+MINUTES_PER_UNIT = 30   # travel minutes per unit of Euclidean distance
+
+
+def euclidean(xy):
+    """(n+1)x(n+1) straight-line distances between all nodes"""
+    dx = xy[:, 0][:, None] - xy[:, 0][None, :]
+    dy = xy[:, 1][:, None] - xy[:, 1][None, :]
+    return np.hypot(dx, dy)
+
+
+class TravelProvider(abc.ABC):
+    """Base class: build (dist, travel) for the nodes of one instance.
+
+    `euclidean` tells the spatial index whether dist is the straight-line
+    distance of the coordinates (needed for its grid pruning).
+    """
+
+    euclidean = False
+
+    @abc.abstractmethod
+    def matrices(self, xy, ids, minutes_per_unit):
+        """(dist, travel) matrices, (n+1)x(n+1), hotel at row / column 0"""
+
+    def time_slots(self):
+        """(slot starts, travel-time factors) for time-dependent travel, or None"""
+        return None
+
+
+class EuclideanTravel(TravelProvider):
+    """Straight-line distance; travel = dist x minutes_per_unit"""
+
+    euclidean = True
+
+    def matrices(self, xy, ids, minutes_per_unit):
+        dist = euclidean(xy)
+        return dist, dist * minutes_per_unit
+
+
+def _positions(labels, ids, hotel_id):
+    """Node index of every file label (-1 for labels not in the instance)"""
+    index_of = {aid: i + 1 for i, aid in enumerate(ids)}
+    index_of[hotel_id] = 0
+    return np.array([index_of.get(label, -1) for label in labels], dtype=np.int64)
+
+
+class DenseTravel(TravelProvider):
+    """Full travel-time matrix (minutes) with an optional distance matrix.
+
+    `labels[i]` is the attraction id of row/column i (hotel_id for the
+    hotel); without labels the matrix must already be in node order. Rows
+    may list more places than the instance uses. Without `dist`, distances
+    stay Euclidean.
+    """
+
+    def __init__(self, travel, dist=None, labels=None, hotel_id=0):
+        self.travel = np.asarray(travel, dtype=float)
+        self.dist = None if dist is None else np.asarray(dist, dtype=float)
+        if self.travel.ndim != 2 or self.travel.shape[0] != self.travel.shape[1]:
+            raise ValueError("Travel-time matrix must be square")
+        if self.dist is not None and self.dist.shape != self.travel.shape:
+            raise ValueError("Distance and travel-time matrices differ in shape")
+        self.labels = None if labels is None else list(labels)
+        self.hotel_id = hotel_id
+
+    @classmethod
+    def load(cls, travel_path, dist_path=None, labels=None, hotel_id=0):
+        """Read .npy or headerless .csv square matrices"""
+        return cls(_read_matrix(travel_path),
+                   _read_matrix(dist_path) if dist_path is not None else None,
+                   labels, hotel_id)
+
+    def matrices(self, xy, ids, minutes_per_unit):
+        n = len(ids)
+        if self.labels is None:
+            if self.travel.shape[0] != n + 1:
+                raise ValueError(f"Matrix is {self.travel.shape[0]}x{self.travel.shape[0]}, "
+                                 f"instance has {n + 1} nodes")
+            order = np.arange(n + 1)
+        else:
+            pos = _positions(self.labels, ids, self.hotel_id)
+            order = np.full(n + 1, -1, dtype=np.int64)
+            order[pos[pos >= 0]] = np.flatnonzero(pos >= 0)
+            if (order < 0).any():
+                missing = [([self.hotel_id] + list(ids))[i] for i in np.flatnonzero(order < 0)[:5]]
+                raise ValueError(f"Travel-time matrix has no row for {missing}")
+
+        travel = self.travel[np.ix_(order, order)]
+        dist = self.dist[np.ix_(order, order)] if self.dist is not None else euclidean(xy)
+        np.fill_diagonal(travel, 0.0)
+        np.fill_diagonal(dist, 0.0)
+        return dist, travel
+
+
+class SparseTravel(TravelProvider):
+    """Travel times for a subset of (from, to) pairs; the rest fall back to
+    Euclidean distance x minutes_per_unit x `detour`.
+
+    `pairs` is a (from_label, to_label, minutes[, distance]) table, e.g. the
+    k nearest neighbours of every place from a routing engine. Entries are
+    scattered into the dense instance matrices, so lookups stay O(1).
+    """
+
+    def __init__(self, pairs, hotel_id=0, detour=1.0):
+        pairs = np.asarray(pairs, dtype=float)
+        if pairs.ndim != 2 or pairs.shape[1] not in (3, 4):
+            raise ValueError("pairs must have columns (from, to, minutes[, distance])")
+        self.pairs = pairs
+        self.hotel_id = hotel_id
+        self.detour = detour
+
+    @classmethod
+    def load(cls, path, hotel_id=0, detour=1.0):
+        """Read a from,to,minutes[,distance] table (.npy or .csv with a header)"""
+        if path.endswith('.npy'):
+            return cls(np.load(path), hotel_id, detour)
+        return cls(np.loadtxt(path, delimiter=',', skiprows=1, ndmin=2), hotel_id, detour)
+
+    def matrices(self, xy, ids, minutes_per_unit):
+        dist = euclidean(xy) * self.detour
+        travel = dist * minutes_per_unit
+        src = _positions(self.pairs[:, 0].astype(np.int64).tolist(), ids, self.hotel_id)
+        dst = _positions(self.pairs[:, 1].astype(np.int64).tolist(), ids, self.hotel_id)
+        keep = (src >= 0) & (dst >= 0) & (src != dst)
+        travel[src[keep], dst[keep]] = self.pairs[keep, 2]
+        if self.pairs.shape[1] == 4:
+            dist[src[keep], dst[keep]] = self.pairs[keep, 3]
+        return dist, travel
+
+
+class TimeDependentTravel(TravelProvider):
+    """Travel times that depend on the departure time, piecewise constant.
+
+    A leg that departs at minute t (instance clock, 0 = leaving the hotel)
+    in slot s, starts[s] <= t < starts[s + 1], takes `factors[s]` times the
+    `base` provider's travel time (Euclidean by default). Slots start at 0
+    and factors are at least 1, so the base times are the free-flow times:
+
+        # 09:00-10:00 rush hour, 12:00-13:00 lunch traffic
+        TimeDependentTravel([0, 60, 180, 240], [1.5, 1.0, 1.3, 1.0])
+    """
+
+    def __init__(self, starts, factors, base=None):
+        starts = [float(s) for s in starts]
+        factors = [float(f) for f in factors]
+        if not starts or len(starts) != len(factors):
+            raise ValueError("Expected one factor per slot start")
+        if starts[0] != 0 or any(a >= b for a, b in zip(starts, starts[1:])):
+            raise ValueError("Slot starts must begin at 0 and increase")
+        if min(factors) < 1:
+            raise ValueError("Travel-time factors must be at least 1")
+        self.starts = starts
+        self.factors = factors
+        self.base = base if base is not None else EuclideanTravel()
+        self.euclidean = self.base.euclidean
+
+    def matrices(self, xy, ids, minutes_per_unit):
+        return self.base.matrices(xy, ids, minutes_per_unit)
+
+    def time_slots(self):
+        return self.starts, self.factors
+
+
+def slot_factor(time_slots, t):
+    """Travel-time factor for a departure at minute t"""
+    starts, factors = time_slots
+    return factors[max(bisect_right(starts, t) - 1, 0)]
+
+
+def _read_matrix(path):
+    if path.endswith('.npy'):
+        return np.load(path)
+    return np.loadtxt(path, delimiter=',', ndmin=2)
+
+
+def knn_pairs(travel, k, labels=None, dist=None):
+    """Sparse (from, to, minutes[, distance]) table keeping the k fastest
+    destinations of every row of a dense matrix (stand-in for a routing
+    engine's k-nearest export)"""
+    travel = np.asarray(travel, dtype=float)
+    n = len(travel)
+    labels = np.arange(n) if labels is None else np.asarray(labels)
+    k = min(k, n - 1)
+    masked = travel.copy()
+    np.fill_diagonal(masked, np.inf)
+    cols = np.argpartition(masked, k - 1, axis=1)[:, :k] if k > 0 else np.empty((n, 0), dtype=int)
+    rows = np.repeat(np.arange(n), cols.shape[1])
+    cols = cols.ravel()
+    table = [labels[rows], labels[cols], travel[rows, cols]]
+    if dist is not None:
+        table.append(np.asarray(dist, dtype=float)[rows, cols])
+    return np.column_stack(table)
+
+
+def synthetic_road_times(xy, minutes_per_unit=MINUTES_PER_UNIT, detour=(1.2, 1.6),
+                         one_way=0.15, seed=0):
+    """Asymmetric stand-in for road-network travel times.
+
+    Every ordered pair gets a detour factor in `detour` over the straight
+    line; direction a->b additionally costs up to `one_way` more than b->a.
+    Returns (dist, travel) in node order.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(xy)
+    base = euclidean(np.asarray(xy, dtype=float))
+    factor = rng.uniform(detour[0], detour[1], (n, n))
+    factor = np.triu(factor) + np.triu(factor, 1).T
+    dist = base * factor
+    travel = dist * minutes_per_unit * (1 + rng.uniform(0, one_way, (n, n)))
+    np.fill_diagonal(travel, 0.0)
+    return dist, travel
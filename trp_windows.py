@@ -0,0 +1,106 @@
+# Time-window feasibility pre-filter
+#
+# The evaluators only notice a late arrival once it has happened, and the
+# 300-minute penalty then pushes every later stop out of its window too.
+# Many such failures can be ruled out before any evaluation from bounds
+# alone: leaving the hotel at 09:00, node i cannot be started before
+# max(travel[0, i], open_i), so j can never follow i directly without
+# arriving late when
+#
+#   earliest_start_i + dur_i + travel[i, j] > close_j
+#
+# and i is unreachable when even the direct trip from the hotel arrives
+# after close_i. Operators use the table to steer away from positions that
+# are certain to produce a violation, but only when some other choice is
+# left: in the all-attractions TRPTW every node must be placed somewhere.
+# On instances without such pairs the table is empty and the operators
+# behave exactly as before.
+
+import numpy as np
+
+from trp_instance import LATE_PENALTY_MIN
+
+# Rows of the (n+1)x(n+1) table computed per NumPy pass
+ROW_CHUNK = 1024
+
+
+class TimeWindowTable:
+    """Pairwise "j cannot follow i" incompatibilities of one instance.
+
+    Build it once per instance with `TRPInstance.time_windows()`.
+    `forbid[i, j]` is True when visiting j right after i makes j late in
+    every route; row 0 is the hotel, so `forbid[0, j]` marks attractions
+    that are late even as the first stop.
+    """
+
+    def __init__(self, inst):
+        self.inst = inst
+        travel = inst.travel
+        close = inst.close_min
+        first = travel[0]
+
+        # Earliest possible start at every node (a late node also pays the
+        # penalty), then the earliest departure; the hotel departs at 0
+        start = np.maximum(first, inst.open_min)
+        start = np.where(first > close, start + LATE_PENALTY_MIN, start)
+        depart = start + inst.dur
+        depart[0] = 0.0
+        self.earliest_depart = depart
+
+        n1 = inst.n + 1
+        self.forbid = np.empty((n1, n1), dtype=bool)
+        for lo in range(0, n1, ROW_CHUNK):
+            hi = min(lo + ROW_CHUNK, n1)
+            self.forbid[lo:hi] = depart[lo:hi, None] + travel[lo:hi] > close[None, :]
+        np.fill_diagonal(self.forbid, False)
+        self.unreachable = self.forbid[0].copy()
+        self.active = bool(self.forbid.any())
+
+    def summary(self):
+        """Counts for reports: unreachable attractions and forbidden pairs"""
+        n = self.inst.n
+        return {
+            'attractions': n,
+            'unreachable': int(self.unreachable[1:].sum()),
+            'forbidden_pairs': int(self.forbid[1:, 1:].sum()),
+            'forbidden_share': float(self.forbid[1:, 1:].sum()) / max(1, n * (n - 1))
+        }
+
+    def compatible(self, node, candidates):
+        """The candidates that may follow `node`; all of them if none may"""
+        if not self.active:
+            return candidates
+        row = self.forbid[node]
+        ok = [c for c in candidates if not row[c]]
+        return ok or candidates
+
+    def hopeless(self, items, route):
+        """len(items) x len(route)+1 mask of insertions certain to make the
+        item or its new successor late (column c = before route[c])"""
+        a = np.asarray(items, dtype=np.intp)[:, None]
+        prev = np.array([0] + list(route), dtype=np.intp)[None, :]
+        nxt = np.array(list(route) + [0], dtype=np.intp)[None, :]
+        return self.forbid[prev, a] | self.forbid[a, nxt]
+
+    def skip(self, items, route):
+        """`hopeless` restricted to items that still have another position"""
+        mask = self.hopeless(items, route)
+        return mask & ~mask.all(axis=1, keepdims=True)
+
+    def swap_delta(self, route, a, b):
+        """Change in forbidden adjacencies when swapping route[a] and route[b]"""
+        m = len(route)
+        f = self.forbid
+
+        def node(k, swapped):
+            if k < 0 or k >= m:
+                return 0
+            if swapped:
+                k = b if k == a else a if k == b else k
+            return route[k]
+
+        delta = 0
+        for k in {a, a + 1, b, b + 1}:
+            if k <= m:
+                delta += int(f[node(k - 1, True), node(k, True)]) - int(f[node(k - 1, False), node(k, False)])
+        return delta